@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+逐个响应执行链式断言与预编译断言计划批量执行的耗时对比
+
+    python benchmarks/bench_assertion_plan.py --responses 5000
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import requests
+from core.http_client import ResponseWrapper
+from core.assertions import AssertionChain
+from core.assertion_plan import AssertionPlan
+
+
+SCHEMA = {
+    "type": "object",
+    "required": ["success", "code", "data"],
+    "properties": {"success": {"type": "boolean"}, "code": {"type": "integer"}, "data": {"type": "object"}}
+}
+
+
+def build_response(seed: int) -> ResponseWrapper:
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.url = "http://127.0.0.1/djgroupon/outerUser/info.do"
+    response.headers["Content-Type"] = "application/json;charset=UTF-8"
+    response.elapsed = datetime.timedelta(milliseconds=20)
+    response._content = json.dumps({
+        "success": True, "code": 100000, "data": {"fid": f"user-{seed}", "fname": "测试用户"}
+    }).encode("utf-8")
+    return ResponseWrapper(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='断言计划基准测试')
+    parser.add_argument('--responses', type=int, default=5000, help='响应数')
+    args = parser.parse_args()
+
+    responses = [build_response(seed) for seed in range(args.responses)]
+    # 预先解码，两种方式只比较断言本身的开销
+    for response in responses:
+        response.json
+
+    start = time.perf_counter()
+    for response in responses:
+        AssertionChain(response).status_code(200)\
+            .header_equals("Content-Type", "application/json;charset=UTF-8")\
+            .json_contains({"success": True, "code": 100000})\
+            .json_schema(SCHEMA)\
+            .text_matches(r'"fid": "user-\d+"')\
+            .response_time_less_than(1000)
+    chain_time = time.perf_counter() - start
+
+    plan = AssertionPlan().status_code(200)\
+        .header_equals("Content-Type", "application/json;charset=UTF-8")\
+        .json_contains({"success": True, "code": 100000})\
+        .json_schema(SCHEMA)\
+        .text_matches(r'"fid": "user-\d+"')\
+        .response_time_less_than(1000)
+    start = time.perf_counter()
+    result = plan.evaluate(responses)
+    plan_time = time.perf_counter() - start
+    assert result.all_passed, result.first_failure
+
+    print(f"响应数: {args.responses}, 断言数: {len(plan)}")
+    print(f"AssertionChain : {chain_time / args.responses * 1e6:.1f}us/响应")
+    print(f"AssertionPlan  : {plan_time / args.responses * 1e6:.1f}us/响应 (加速比 {chain_time / plan_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+同步 HTTPClient 与 AsyncHTTPClient 的吞吐对比
+
+    python benchmarks/bench_async_client.py --requests 500 --delay 0.02
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.http_client import HTTPClient
+from core.async_http_client import AsyncHTTPClient
+from benchmarks.stub_server import start_stub_server
+
+
+def bench_sync(base_url: str, total: int) -> float:
+    client = HTTPClient(base_url)
+    start = time.perf_counter()
+    for _ in range(total):
+        client.post("/djgroupon/outerUser/usernameLogin.do", json={"username": "stub"})
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed
+
+
+async def bench_async(base_url: str, total: int, limit_per_host: int) -> float:
+    client = AsyncHTTPClient(base_url, limit=limit_per_host, limit_per_host=limit_per_host)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client.post("/djgroupon/outerUser/usernameLogin.do", json={"username": "stub"})
+        for _ in range(total)
+    ])
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTPClient / AsyncHTTPClient 基准测试')
+    parser.add_argument('--requests', type=int, default=500, help='请求总数')
+    parser.add_argument('--delay', type=float, default=0.02, help='桩服务每个请求的处理耗时(秒)')
+    parser.add_argument('--limit-per-host', type=int, default=100, help='异步客户端每个主机的连接上限')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.delay)
+    try:
+        sync_time = bench_sync(base_url, args.requests)
+        async_time = asyncio.run(bench_async(base_url, args.requests, args.limit_per_host))
+    finally:
+        server.shutdown()
+
+    print(f"请求总数: {args.requests}, 服务端耗时: {args.delay * 1000:.0f}ms")
+    print(f"HTTPClient      : {sync_time:.2f}秒, {args.requests / sync_time:.0f} req/s")
+    print(f"AsyncHTTPClient : {async_time:.2f}秒, {args.requests / async_time:.0f} req/s")
+    print(f"加速比: {sync_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
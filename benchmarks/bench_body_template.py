@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+每次 json.dumps 整个 payload 与 BodyTemplate 只填充槽位的序列化耗时对比
+
+    python benchmarks/bench_body_template.py --iterations 50000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.body_template import BodyTemplate
+from config.config import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='请求体模板基准测试')
+    parser.add_argument('--iterations', type=int, default=50000, help='序列化次数')
+    args = parser.parse_args()
+
+    cart_data = config.get_test_data("cart_data.dongjing_group_valid_cart")
+    template = BodyTemplate(cart_data, slots=["fuserId", "famount"])
+
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        payload = dict(cart_data)
+        payload["fuserId"] = f"user-{i}"
+        payload["famount"] = str(i)
+        json.dumps(payload)
+    dumps_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        template.render(fuserId=f"user-{i}", famount=str(i))
+    template_time = time.perf_counter() - start
+
+    print(f"序列化次数: {args.iterations}, payload字段数: {len(cart_data)}")
+    print(f"json.dumps     : {dumps_time / args.iterations * 1e6:.2f}us/次")
+    print(f"BodyTemplate   : {template_time / args.iterations * 1e6:.2f}us/次")
+    print(f"加速比: {dumps_time / template_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+每次 jsonschema.validate 与按指纹缓存编译后的验证器的单响应验证耗时对比
+
+    python benchmarks/bench_json_schema.py --iterations 2000 --items 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from jsonschema import validate
+from core.schema import SchemaCache
+
+
+# 东经团购商品列表接口的响应结构
+PRODUCT_LIST_SCHEMA = {
+    "type": "object",
+    "required": ["success", "code", "data"],
+    "properties": {
+        "success": {"type": "boolean"},
+        "code": {"type": "integer"},
+        "msg": {"type": ["string", "null"]},
+        "data": {
+            "type": "object",
+            "required": ["list", "total"],
+            "properties": {
+                "total": {"type": "integer", "minimum": 0},
+                "list": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["fid", "fname", "fprice"],
+                        "properties": {
+                            "fid": {"type": "string"},
+                            "fname": {"type": "string", "minLength": 1},
+                            "fprice": {"type": "number", "minimum": 0},
+                            "fstock": {"type": "integer"},
+                            "ftags": {"type": "array", "items": {"type": "string"}}
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+def build_response(items: int, seed: int) -> dict:
+    return {
+        "success": True,
+        "code": 100000,
+        "msg": None,
+        "data": {
+            "total": items,
+            "list": [
+                {"fid": f"P{seed}-{i}", "fname": f"商品{i}", "fprice": 9.9 + i, "fstock": i, "ftags": ["新品", "团购"]}
+                for i in range(items)
+            ]
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON Schema 验证器缓存基准测试')
+    parser.add_argument('--iterations', type=int, default=2000, help='验证的响应数')
+    parser.add_argument('--items', type=int, default=20, help='每个响应中的商品数')
+    args = parser.parse_args()
+
+    responses = [build_response(args.items, seed) for seed in range(args.iterations)]
+
+    start = time.perf_counter()
+    for response in responses:
+        validate(instance=response, schema=PRODUCT_LIST_SCHEMA)
+    validate_time = time.perf_counter() - start
+
+    cache = SchemaCache()
+    start = time.perf_counter()
+    for response in responses:
+        error = cache.get(PRODUCT_LIST_SCHEMA).first_error(response)
+        assert error is None
+    cached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    failures = cache.get(PRODUCT_LIST_SCHEMA).validate_many(responses)
+    batch_time = time.perf_counter() - start
+    assert not failures
+
+    print(f"响应数: {args.iterations}, 每个响应商品数: {args.items}, 缓存: {cache.stats()}")
+    print(f"jsonschema.validate : {validate_time / args.iterations * 1e6:.1f}us/响应")
+    print(f"缓存的验证器        : {cached_time / args.iterations * 1e6:.1f}us/响应 "
+          f"(加速比 {validate_time / cached_time:.1f}x)")
+    print(f"validate_many       : {batch_time / args.iterations * 1e6:.1f}us/响应 "
+          f"(加速比 {validate_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+压测模式吞吐基准：虚拟用户反复执行一个两步的测试用例
+
+    python benchmarks/bench_load.py --vus 32 --duration 10 --processes 4
+
+桩服务运行在独立进程中，避免与压测客户端争用 GIL；吞吐上限取决于 CPU 核数，
+单核机器上客户端和桩服务共享同一个核。
+"""
+import argparse
+import functools
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.test_case import TestCase
+from core.load import LoadTest
+from benchmarks.stub_server import start_stub_server
+
+
+def serve(delay: float, address):
+    server, base_url = start_stub_server(delay)
+    address.put(base_url)
+    while True:
+        time.sleep(3600)
+
+
+def scenario(base_url: str) -> TestCase:
+    case = TestCase("登录并查询", base_url)
+
+    @case.step("登录")
+    def login():
+        response = case.post("/djgroupon/outerUser/usernameLogin.do", json={"username": "stub"})
+        case.assert_that(response).status_code(200).json_has_key("data")
+
+    @case.step("查询用户")
+    def query():
+        response = case.get("/djgroupon/outerUser/info.do")
+        case.assert_that(response).status_code(200)
+
+    return case
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压测模式基准测试')
+    parser.add_argument('--vus', type=int, default=32, help='虚拟用户数')
+    parser.add_argument('--duration', type=float, default=10, help='压测时长(秒)')
+    parser.add_argument('--ramp-up', type=float, default=0, help='爬坡时长(秒)')
+    parser.add_argument('--client', choices=['async', 'sync'], default='async', help='客户端类型')
+    parser.add_argument('--no-trust-env', action='store_true',
+                        help='sync 客户端不读取环境变量中的代理/netrc/CA 配置')
+    parser.add_argument('--processes', type=int, default=1, help='压测进程数')
+    parser.add_argument('--delay', type=float, default=0.0, help='桩服务每个请求的处理耗时(秒)')
+    args = parser.parse_args()
+
+    address = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.delay, address), daemon=True)
+    server.start()
+    base_url = address.get()
+    try:
+        load_test = LoadTest(functools.partial(scenario, base_url), vus=args.vus, duration=args.duration,
+                             ramp_up=args.ramp_up, client=args.client, processes=args.processes,
+                             trust_env=not args.no_trust_env)
+        result = load_test.run().to_dict()
+    finally:
+        server.terminate()
+
+    print(f"\n虚拟用户: {args.vus}, 进程: {args.processes}, 客户端: {args.client}, CPU 核数: {multiprocessing.cpu_count()}"
+          f"{', 不读取环境变量代理配置' if not result['trust_env'] else ''}")
+    print(f"迭代: {result['iterations']} (失败 {result['failed_iterations']}), "
+          f"请求: {result['requests']}, 吞吐: {result['rps']:.0f} req/s, 错误率: {result['error_rate'] * 100:.2f}%")
+    for name, stats in result['endpoints'].items():
+        print(f"  {name}: {stats['rps']:.0f} req/s, p50 {stats['p50_ms']:.1f}ms, "
+              f"p90 {stats['p90_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+黄金文件比较：加载完整快照后深度比较与快照断言（原始字节哈希 / 结构哈希）的耗时对比
+
+    python benchmarks/bench_snapshot.py --items 5000 --iterations 20
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import requests
+from core.http_client import ResponseWrapper
+from core.assertions import AssertionChain
+from core.snapshot import SnapshotStore, diff
+
+IGNORE = ["data.list[*].uuid", "**.updateTime"]
+
+
+def build_document(items: int, seed: int) -> dict:
+    return {
+        "success": True,
+        "code": 100000,
+        "data": {
+            "total": items,
+            "list": [
+                {"fid": f"P{i}", "uuid": f"{seed}-{i}", "fname": f"商品{i}", "fprice": 9.9 + i,
+                 "ftags": ["新品", "团购"], "meta": {"updateTime": seed, "fstock": i}}
+                for i in range(items)
+            ]
+        }
+    }
+
+
+def build_response(body: bytes) -> ResponseWrapper:
+    """每次比较使用新的响应对象，解析响应体的开销计入比较耗时"""
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.elapsed = datetime.timedelta(milliseconds=20)
+    response._content = body
+    return ResponseWrapper(response)
+
+
+def timed(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='快照比较基准测试')
+    parser.add_argument('--items', type=int, default=5000, help='响应中的列表项数')
+    parser.add_argument('--iterations', type=int, default=20, help='比较次数')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="snapshots-")
+    golden = build_document(args.items, 1)
+    golden_path = os.path.join(directory, "golden.json")
+    with open(golden_path, "w", encoding="utf-8") as f:
+        json.dump(golden, f, ensure_ascii=False)
+    body = json.dumps(golden, ensure_ascii=False).encode("utf-8")
+    volatile_body = json.dumps(build_document(args.items, 2), ensure_ascii=False).encode("utf-8")
+    store = SnapshotStore(directory)
+    AssertionChain(build_response(body)).matches_snapshot("list", store=store)
+    AssertionChain(build_response(body)).matches_snapshot("volatile", IGNORE, store=store)
+
+    def load_and_compare(response_body, ignore=None):
+        with open(golden_path, "r", encoding="utf-8") as f:
+            AssertionChain(build_response(response_body)).json_equals(json.load(f), ignore)
+
+    load_time = timed(lambda: load_and_compare(body), args.iterations)
+    load_ignore_time = timed(lambda: load_and_compare(volatile_body, IGNORE), args.iterations)
+    # 快照头在第一次读取后缓存，与真实测试中同一快照被反复比较的情况一致
+    raw_time = timed(lambda: AssertionChain(build_response(body)).matches_snapshot("list", store=store),
+                     args.iterations)
+    ignore_time = timed(lambda: AssertionChain(build_response(volatile_body)).matches_snapshot("volatile",
+                                                                                               store=store),
+                        args.iterations)
+
+    changed = build_document(args.items, 1)
+    changed["data"]["list"][args.items // 2]["fprice"] = 0
+    diff_time = timed(lambda: diff(golden, changed), args.iterations)
+
+    print(f"列表项数: {args.items}, 快照大小: {os.path.getsize(store.path('list')) / 1024:.0f}KB")
+    print(f"加载快照 + json_equals             : {load_time * 1000:.2f}ms/次")
+    print(f"matches_snapshot (字节相同)        : {raw_time * 1000:.2f}ms/次 (加速比 {load_time / raw_time:.1f}x)")
+    print(f"加载快照 + json_equals (忽略字段)  : {load_ignore_time * 1000:.2f}ms/次")
+    print(f"matches_snapshot (忽略字段)        : {ignore_time * 1000:.2f}ms/次 "
+          f"(加速比 {load_ignore_time / ignore_time:.1f}x)")
+    print(f"不一致时的差异计算                 : {diff_time * 1000:.2f}ms/次, {[str(d) for d in diff(golden, changed)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # 模拟服务端处理耗时（秒）
+    delay = 0.0
+    body = json.dumps({"success": True, "code": 100000, "data": {"fid": "stub"}}).encode("utf-8")
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_PUT = _reply
+    do_DELETE = _reply
+    do_PATCH = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(delay: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """启动本地桩服务，返回 (server, base_url)"""
+    handler = type("DelayedStubHandler", (StubHandler,), {"delay": delay})
+    server_class = type("StubServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -1,7 +1,7 @@
 import os
 import yaml
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Tuple
 
 
 class Config:
@@ -13,6 +13,8 @@ class Config:
         self.config_data = {}
         self.environments = {}
         self.test_data = {}
+        self.framework = {}
+        self._body_templates: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
         self.load_config()
     
     def load_config(self):
@@ -28,6 +30,10 @@ class Config:
         
         # 加载测试数据
         self.test_data = self.config_data.get('test_data', {})
+        
+        # 加载框架配置
+        self.framework = self.config_data.get('framework', {}) or {}
+        self._body_templates.clear()
     
     def get_environment(self, env_name: str) -> Dict[str, Any]:
         """获取指定环境的配置"""
@@ -62,6 +68,33 @@ class Config:
         
         return value if value is not None else default
     
+    def get_body_template(self, data_key: str, slots: Iterable[str]) -> Any:
+        """把测试数据编译为请求体模板（core.body_template.BodyTemplate），同一数据和槽位只编译一次"""
+        from core.body_template import BodyTemplate
+
+        key = (data_key, tuple(slots))
+        template = self._body_templates.get(key)
+        if template is None:
+            data = self.get_test_data(data_key)
+            if data is None:
+                raise KeyError(f"测试数据不存在: {data_key}")
+            template = self._body_templates[key] = BodyTemplate(data, key[1])
+        return template
+    
+    def get_framework_config(self, key: str = None, default: Any = None) -> Any:
+        """获取框架配置，支持嵌套key（如 connection_pool.pool_maxsize），不传key返回全部"""
+        if key is None:
+            return self.framework
+        
+        value = self.framework
+        for part in key.split('.'):
+            if isinstance(value, dict):
+                value = value.get(part)
+            else:
+                return default
+        
+        return value if value is not None else default
+    
     def set_environment(self, env_name: str, config: Dict[str, Any]):
         """设置环境配置"""
         self.environments[env_name] = config
@@ -69,6 +102,7 @@ class Config:
     def set_test_data(self, data_key: str, data: Any):
         """设置测试数据"""
         self.test_data[data_key] = data
+        self._body_templates.clear()
     
     def save_config(self):
         """保存配置到文件"""
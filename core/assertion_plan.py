@@ -0,0 +1,302 @@
+import base64
+import json
+import re
+from datetime import timedelta
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from requests.structures import CaseInsensitiveDict
+from .assertions import AssertionError
+from .schema import compile_schema
+from .jsonpath import MISSING, compile_path
+from .snapshot import StructuralHasher
+from .retention import CompactResult
+
+
+# 检查函数：通过时返回 None，失败时返回错误信息
+Check = Callable[[Any], Optional[str]]
+
+# 执行顺序：先做只读状态码/响应头的廉价检查，再做需要解码响应体的检查
+_STATUS, _HEADERS, _TEXT, _JSON, _SCHEMA = range(5)
+
+
+class RecordedResponse:
+    """录制文件（Cassette）中的一次交互，提供断言计划需要的响应字段"""
+
+    __slots__ = ("status_code", "headers", "url", "elapsed", "_text", "_json")
+
+    def __init__(self, interaction: Dict[str, Any]):
+        self.status_code = interaction["status"]
+        self.headers = CaseInsensitiveDict(interaction.get("headers") or [])
+        self.url = interaction.get("url")
+        self.elapsed = timedelta(seconds=interaction.get("elapsed") or 0.0)
+        if "body_b64" in interaction:
+            self._text = base64.b64decode(interaction["body_b64"]).decode("utf-8", errors="replace")
+        else:
+            self._text = interaction.get("body", "")
+        self._json = MISSING
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def json(self) -> Any:
+        if self._json is MISSING:
+            try:
+                self._json = json.loads(self._text)
+            except ValueError:
+                raise ValueError("响应内容不是有效的JSON格式")
+        return self._json
+
+
+class PlanResult:
+    """批量执行的结果：每个响应一位的通过位图（1 为通过）和第一个失败的详情"""
+
+    __slots__ = ("total", "bitmap", "failed", "first_failure")
+
+    def __init__(self, total: int):
+        self.total = total
+        self.bitmap = bytearray((total + 7) // 8)
+        self.failed = 0
+        self.first_failure: Optional[Dict[str, Any]] = None
+
+    def passed(self, index: int) -> bool:
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def all_passed(self) -> bool:
+        return self.failed == 0
+
+    def failed_indices(self) -> List[int]:
+        return [index for index in range(self.total) if not self.passed(index)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "passed": self.total - self.failed,
+            "failed": self.failed,
+            "first_failure": self.first_failure
+        }
+
+
+class AssertionPlan:
+    """
+    声明式、可复用的断言计划
+
+    断言方法与 AssertionChain 同名，只登记不执行；首次使用时编译一次（状态码转为集合、正则预编译、
+    路径表达式预编译、JSON Schema 验证器取自缓存），之后可以对大量 ResponseWrapper、录制的交互或
+    按保留策略压缩的 CompactResult（只能检查状态码）反复执行。每个响应在第一个失败的断言处停止。
+    """
+
+    def __init__(self, name: str = "断言计划"):
+        self.name = name
+        self._declared: List[Tuple[int, str, Callable[[], Check]]] = []
+        self._compiled: Optional[List[Tuple[int, str, Check]]] = None
+
+    def _add(self, tier: int, description: str, build: Callable[[], Check]) -> 'AssertionPlan':
+        self._declared.append((tier, description, build))
+        self._compiled = None
+        return self
+
+    # 状态码
+    def status_code(self, expected_code: int) -> 'AssertionPlan':
+        return self._status(frozenset([expected_code]), f"状态码断言失败: 期望 {expected_code}", f"status_code({expected_code})")
+
+    def status_code_in(self, expected_codes: List[int]) -> 'AssertionPlan':
+        return self._status(frozenset(expected_codes), f"状态码断言失败: 期望在 {list(expected_codes)} 中",
+                            f"status_code_in({list(expected_codes)})")
+
+    def is_success(self) -> 'AssertionPlan':
+        return self.status_code_in([200, 201, 202, 204])
+
+    def is_client_error(self) -> 'AssertionPlan':
+        return self._status(frozenset(range(400, 500)), "状态码断言失败: 期望 4xx", "is_client_error()")
+
+    def is_server_error(self) -> 'AssertionPlan':
+        return self._status(frozenset(range(500, 600)), "状态码断言失败: 期望 5xx", "is_server_error()")
+
+    def _status(self, codes: frozenset, message: str, description: str) -> 'AssertionPlan':
+        def build() -> Check:
+            def check(response):
+                if response.status_code not in codes:
+                    return f"{message}, 实际 {response.status_code}"
+                return None
+            return check
+        return self._add(_STATUS, description, build)
+
+    # 响应头和响应时间
+    def header_exists(self, header_name: str) -> 'AssertionPlan':
+        def build() -> Check:
+            def check(response):
+                return None if header_name in response.headers else f"响应头中缺少: {header_name}"
+            return check
+        return self._add(_HEADERS, f"header_exists({header_name!r})", build)
+
+    def header_equals(self, header_name: str, expected_value: str) -> 'AssertionPlan':
+        def build() -> Check:
+            def check(response):
+                actual_value = response.headers.get(header_name)
+                if actual_value != expected_value:
+                    return f"响应头断言失败: {header_name} 期望 '{expected_value}', 实际 '{actual_value}'"
+                return None
+            return check
+        return self._add(_HEADERS, f"header_equals({header_name!r})", build)
+
+    def response_time_less_than(self, max_time_ms: int) -> 'AssertionPlan':
+        max_seconds = max_time_ms / 1000.0
+
+        def build() -> Check:
+            def check(response):
+                actual = response.elapsed.total_seconds()
+                if actual > max_seconds:
+                    return f"响应时间断言失败: 期望小于 {max_time_ms}ms, 实际 {actual * 1000:.2f}ms"
+                return None
+            return check
+        return self._add(_HEADERS, f"response_time_less_than({max_time_ms})", build)
+
+    # 文本
+    def text_contains(self, expected_text: str) -> 'AssertionPlan':
+        def build() -> Check:
+            def check(response):
+                return None if expected_text in response.text else f"文本断言失败: 期望包含 '{expected_text}'"
+            return check
+        return self._add(_TEXT, f"text_contains({expected_text!r})", build)
+
+    def text_matches(self, pattern: str) -> 'AssertionPlan':
+        def build() -> Check:
+            search = re.compile(pattern).search
+
+            def check(response):
+                return None if search(response.text) else f"正则表达式断言失败: 文本不匹配模式 '{pattern}'"
+            return check
+        return self._add(_TEXT, f"text_matches({pattern!r})", build)
+
+    # JSON
+    def json_equals(self, expected: Any, ignore: Optional[List[str]] = None) -> 'AssertionPlan':
+        """ignore 为不参与比较的路径，期望文档去掉忽略字段只在编译时进行一次"""
+        def build() -> Check:
+            hasher = StructuralHasher(ignore)
+            stripped = hasher.strip(expected)
+
+            def check(response):
+                actual = response.json
+                if hasher.strip(actual) == stripped:
+                    return None
+                differences = hasher.diff(expected, actual, limit=1)
+                detail = f": {differences[0]}" if differences else ""
+                return f"JSON响应断言失败: 响应内容不匹配{detail}"
+            return check
+        return self._add(_JSON, "json_equals(...)", build)
+
+    def json_contains(self, expected: Dict[str, Any]) -> 'AssertionPlan':
+        items = list(expected.items())
+
+        def build() -> Check:
+            def check(response):
+                actual = response.json
+                if not isinstance(actual, dict):
+                    return "响应不是字典类型，无法进行包含断言"
+                for key, value in items:
+                    if key not in actual:
+                        return f"响应中缺少键: {key}"
+                    if actual[key] != value:
+                        return f"键 '{key}' 的值不匹配: 期望 {value}, 实际 {actual[key]}"
+                return None
+            return check
+        return self._add(_JSON, f"json_contains({sorted(expected)})", build)
+
+    def json_has_key(self, key: str) -> 'AssertionPlan':
+        def build() -> Check:
+            def check(response):
+                actual = response.json
+                if not isinstance(actual, dict):
+                    return "响应不是字典类型"
+                return None if key in actual else f"响应中缺少键: {key}"
+            return check
+        return self._add(_JSON, f"json_has_key({key!r})", build)
+
+    def json_path_exists(self, path: str) -> 'AssertionPlan':
+        """嵌套路径（core.jsonpath 语法），如 data.list[0].fid"""
+        def build() -> Check:
+            exists = compile_path(path).exists
+
+            def check(response):
+                return None if exists(response.json) else f"响应中不存在路径: {path}"
+            return check
+        return self._add(_JSON, f"json_path_exists({path!r})", build)
+
+    def json_path_equals(self, path: str, expected: Any) -> 'AssertionPlan':
+        def build() -> Check:
+            json_path = compile_path(path)
+            lookup = json_path.lookup
+
+            def check(response):
+                actual = lookup(response.json)
+                if actual is MISSING or (json_path.wildcard and not actual):
+                    return f"响应中不存在路径: {path}"
+                for value in (actual if json_path.wildcard else (actual,)):
+                    if value != expected:
+                        return f"路径 '{path}' 的值不匹配: 期望 {expected}, 实际 {value}"
+                return None
+            return check
+        return self._add(_JSON, f"json_path_equals({path!r})", build)
+
+    def json_schema(self, schema: Dict[str, Any]) -> 'AssertionPlan':
+        def build() -> Check:
+            compiled = compile_schema(schema)
+
+            def check(response):
+                error = compiled.first_error(response.json)
+                return None if error is None else f"JSON Schema验证失败: {error.message}"
+            return check
+        return self._add(_SCHEMA, "json_schema(...)", build)
+
+    def compile(self) -> 'AssertionPlan':
+        if self._compiled is None:
+            ordered = sorted(enumerate(self._declared), key=lambda item: (item[1][0], item[0]))
+            self._compiled = [(tier, description, build()) for _, (tier, description, build) in ordered]
+        return self
+
+    def check(self, response: Any) -> Optional[Tuple[str, str]]:
+        """执行计划，返回第一个失败的 (断言, 错误信息)，全部通过时返回 None"""
+        if self._compiled is None:
+            self.compile()
+        # CompactResult 不保留响应头和响应体，只能检查状态码
+        compact = isinstance(response, CompactResult)
+        for tier, description, check in self._compiled:
+            if compact and tier != _STATUS:
+                return description, "响应头和响应体未保留，无法执行该断言"
+            try:
+                message = check(response)
+            except ValueError as e:
+                message = str(e)
+            if message is not None:
+                return description, message
+        return None
+
+    def assert_response(self, response: Any) -> Any:
+        """对单个响应执行计划，失败时抛出 AssertionError，可在测试步骤中代替链式断言"""
+        failure = self.check(response)
+        if failure is not None:
+            raise AssertionError(failure[1])
+        return response
+
+    def evaluate(self, responses: Iterable[Any]) -> PlanResult:
+        """对一批响应执行计划；录制文件中的交互（dict）自动转换为 RecordedResponse"""
+        responses = list(responses)
+        result = PlanResult(len(responses))
+        bitmap = result.bitmap
+        check = self.compile().check
+        for index, response in enumerate(responses):
+            if isinstance(response, dict):
+                response = RecordedResponse(response)
+            failure = check(response)
+            if failure is None:
+                bitmap[index >> 3] |= 1 << (index & 7)
+                continue
+            result.failed += 1
+            if result.first_failure is None:
+                result.first_failure = {"index": index, "assertion": failure[0], "message": failure[1]}
+        return result
+
+    def __len__(self) -> int:
+        return len(self._declared)
@@ -1,7 +1,10 @@
 import json
 import re
-from typing import Any, Dict, List, Optional, Union
-from jsonschema import validate, ValidationError
+from typing import Any, Callable, Dict, List, Optional, Union
+from .http_client import ResponseWrapper
+from .schema import compile_schema, validate_many
+from .jsonpath import MISSING, compile_path
+from .snapshot import StructuralHasher, SnapshotStore, default_store, format_diff
 
 
 class AssertionError(Exception):
@@ -34,12 +37,39 @@ class Assertions:
             )
         return self
     
-    def json_equals(self, expected: Any) -> 'Assertions':
+    def json_equals(self, expected: Any, ignore: Optional[List[str]] = None) -> 'Assertions':
+        """
+        ignore 为不参与比较的路径（如 data.list[*].uuid、**.updateTime）
+
+        失败时只给出差异所在的子树（最多 20 处），不在异常中保留两个完整文档。
+        """
         actual = self.response.json
-        if actual != expected:
+        hasher = StructuralHasher(ignore)
+        if not hasher.equal(expected, actual):
+            differences = hasher.diff(expected, actual)
+            first = differences[0] if differences else None
             raise AssertionError(
-                "JSON响应断言失败: 响应内容不匹配",
-                actual, expected
+                f"JSON响应断言失败: 响应内容不匹配\n{format_diff(differences)}",
+                first.actual if first else None, first.expected if first else None
+            )
+        return self
+    
+    def matches_snapshot(self, name: str, ignore: Optional[List[str]] = None,
+                         store: Optional[SnapshotStore] = None) -> 'Assertions':
+        """
+        与黄金快照（snapshots/<name>.snap）比较，快照不存在时以当前响应创建
+
+        响应体字节与快照相同时不解析响应；结构哈希相同时不加载快照文档；不一致时只展开不同的子树给出差异。
+        """
+        store = store if store is not None else default_store
+        content = getattr(self.response, "content", None)
+        if content is not None and store.matches_content(name, content):
+            return self
+        differences = store.compare(name, self.response.json, ignore, content)
+        if differences:
+            raise AssertionError(
+                f"快照断言失败: 响应与快照 '{name}' 不一致\n{format_diff(differences)}",
+                differences[0].actual, differences[0].expected
             )
         return self
     
@@ -67,12 +97,59 @@ class Assertions:
             raise AssertionError(f"响应中缺少键: {key}")
         return self
     
+    def json_path_exists(self, path: str) -> 'Assertions':
+        """嵌套路径存在，如 data.fboxModel.defaultValue；含通配符时至少匹配一个值"""
+        if not compile_path(path).exists(self.response.json):
+            raise AssertionError(f"响应中不存在路径: {path}")
+        return self
+    
+    def json_path_equals(self, path: str, expected: Any) -> 'Assertions':
+        """路径上的值等于 expected；含通配符（data.list[*].fstatus）时每个匹配值都要相等"""
+        json_path = compile_path(path)
+        actual = json_path.lookup(self.response.json)
+        if actual is MISSING or (json_path.wildcard and not actual):
+            raise AssertionError(f"响应中不存在路径: {path}")
+        values = actual if json_path.wildcard else [actual]
+        for value in values:
+            if value != expected:
+                raise AssertionError(
+                    f"路径 '{path}' 的值不匹配: 期望 {expected}, 实际 {value}",
+                    value, expected
+                )
+        return self
+    
+    def json_path_contains(self, path: str, expected: Dict[str, Any]) -> 'Assertions':
+        """路径上的对象包含 expected 中的键值（嵌套对象上的 json_contains）"""
+        actual = compile_path(path).get(self.response.json, None)
+        if not isinstance(actual, dict):
+            raise AssertionError(f"路径 '{path}' 不是字典类型，无法进行包含断言")
+        for key, value in expected.items():
+            if key not in actual:
+                raise AssertionError(f"路径 '{path}' 中缺少键: {key}")
+            if actual[key] != value:
+                raise AssertionError(
+                    f"路径 '{path}.{key}' 的值不匹配: 期望 {value}, 实际 {actual[key]}",
+                    actual[key], value
+                )
+        return self
+    
+    def json_path_every(self, path: str, predicate: Callable[[Any], bool],
+                        description: str = "自定义条件") -> 'Assertions':
+        """通配符路径匹配的每个值都满足 predicate，如 ("data.list[*].fprice", lambda p: p > 0)"""
+        for index, value in enumerate(compile_path(path).find(self.response.json)):
+            if not predicate(value):
+                raise AssertionError(
+                    f"路径 '{path}' 的第 {index} 个值不满足{description}: {value}",
+                    value, description
+                )
+        return self
+    
     def json_schema(self, schema: Dict[str, Any]) -> 'Assertions':
         actual = self.response.json
-        try:
-            validate(instance=actual, schema=schema)
-        except ValidationError as e:
-            raise AssertionError(f"JSON Schema验证失败: {str(e)}")
+        # 编译后的验证器按 schema 指纹缓存，元 schema 检查只在首次使用时进行
+        error = compile_schema(schema).first_error(actual)
+        if error is not None:
+            raise AssertionError(f"JSON Schema验证失败: {str(error)}")
         return self
     
     def text_contains(self, expected_text: str) -> 'Assertions':
@@ -131,11 +208,25 @@ class Assertions:
         return self.status_code_in(list(range(500, 600)))
 
 
+def assert_all_match_schema(responses: List[Any], schema: Dict[str, Any]):
+    """用同一个编译后的验证器检查一批响应（ResponseWrapper 或已解析的 JSON），列出所有未通过的下标"""
+    instances = [response.json if isinstance(response, ResponseWrapper) else response for response in responses]
+    failures = validate_many(schema, instances)
+    if failures:
+        # 只列出前 5 个错误
+        details = "; ".join(f"[{index}] {error.message}" for index, error in failures[:5])
+        raise AssertionError(
+            f"JSON Schema批量验证失败: {len(failures)}/{len(instances)} 个响应不符合: {details}",
+            [index for index, _ in failures], schema
+        )
+
+
 class AssertionChain:
     def __init__(self, response):
         self.assertions = Assertions(response)
     
     def __getattr__(self, name):
+        # 子类或运行时添加的断言方法；Assertions 自带的方法已在类上生成，不经过这里
         method = getattr(self.assertions, name)
         
         def wrapper(*args, **kwargs):
@@ -148,4 +239,20 @@ class AssertionChain:
         return self
     
     def then(self):
-        return self
\ No newline at end of file
+        return self
+
+
+def _chained(name: str, method):
+    def chained(self, *args, **kwargs):
+        # 按名称查找，assertions 替换为 Assertions 子类时使用子类的实现
+        getattr(self.assertions, name)(*args, **kwargs)
+        return self
+    chained.__name__ = name
+    chained.__doc__ = method.__doc__
+    return chained
+
+
+# 在类上生成链式方法，每次断言调用不再经过 __getattr__ 创建闭包
+for _name, _method in list(vars(Assertions).items()):
+    if not _name.startswith("_") and callable(_method):
+        setattr(AssertionChain, _name, _chained(_name, _method))
\ No newline at end of file
@@ -0,0 +1,434 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Any, List, Optional, Union
+
+import aiohttp
+import requests
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from .timing import RequestTimings
+from .retry import RetryPolicy, RetryRecord, HTTPRequestError
+from .rate_limiter import RateLimiter
+from .deadline import current_deadline, budget_timeout, run_within_deadline
+
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "APITestFramework/1.0"
+}
+
+
+class AsyncHTTPClient:
+    def __init__(self, base_url: str = "", timeout: int = 30, retries: int = 3,
+                 limit: int = 100, limit_per_host: int = 10,
+                 connector: Optional[aiohttp.TCPConnector] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries=retries)
+        self.rate_limiter = rate_limiter
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        # 传入的 connector 由调用方共享和关闭，这里只负责自己创建的
+        self._connector = connector
+        self._connector_owner = connector is None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.headers: Dict[str, str] = dict(DEFAULT_HEADERS)
+        # CookieJar 必须在事件循环内创建，之前设置的Cookie先暂存
+        self.cookie_jar: Optional[aiohttp.CookieJar] = None
+        self._pending_cookies: Dict[str, str] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.cookie_jar is None:
+            self.cookie_jar = aiohttp.CookieJar(unsafe=True)
+            self.cookie_jar.update_cookies(self._pending_cookies)
+            self._pending_cookies.clear()
+        if self._session is None or self._session.closed:
+            if self._connector is None or self._connector.closed:
+                self._connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+                self._connector_owner = True
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                connector_owner=self._connector_owner,
+                cookie_jar=self.cookie_jar,
+                trace_configs=[self._create_trace_config()]
+            )
+        return self._session
+
+    @staticmethod
+    def _create_trace_config() -> aiohttp.TraceConfig:
+        # aiohttp 的建连阶段包含 TLS 握手，因此 tls 耗时计入 connect
+        trace_config = aiohttp.TraceConfig()
+
+        def timings_of(ctx) -> Optional[RequestTimings]:
+            request_ctx = ctx.trace_request_ctx
+            return request_ctx.get("timings") if isinstance(request_ctx, dict) else None
+
+        async def on_dns_start(session, ctx, params):
+            ctx.dns_start = time.perf_counter()
+
+        async def on_dns_end(session, ctx, params):
+            timings = timings_of(ctx)
+            if timings is not None:
+                timings.dns = time.perf_counter() - ctx.dns_start
+
+        async def on_connection_start(session, ctx, params):
+            ctx.connection_start = time.perf_counter()
+
+        async def on_connection_end(session, ctx, params):
+            timings = timings_of(ctx)
+            if timings is not None:
+                timings.connect = max(time.perf_counter() - ctx.connection_start - timings.dns, 0.0)
+                timings.new_connection = True
+
+        async def on_chunk_sent(session, ctx, params):
+            timings = timings_of(ctx)
+            if timings is not None:
+                timings.bytes_sent += len(params.chunk)
+                timings.request_sent = time.perf_counter()
+
+        async def on_headers_sent(session, ctx, params):
+            timings = timings_of(ctx)
+            if timings is not None:
+                header_bytes = sum(len(k) + len(v) + 4 for k, v in params.headers.items())
+                timings.bytes_sent += len(params.method) + len(str(params.url)) + 12 + header_bytes + 2
+                timings.request_sent = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            timings = timings_of(ctx)
+            if timings is not None:
+                timings.first_byte = time.perf_counter()
+                timings.ttfb = timings.first_byte - (timings.request_sent or timings.start)
+
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connection_start)
+        trace_config.on_connection_create_end.append(on_connection_end)
+        trace_config.on_request_headers_sent.append(on_headers_sent)
+        trace_config.on_request_chunk_sent.append(on_chunk_sent)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    def set_headers(self, headers: Dict[str, str]):
+        self.headers.update(headers)
+
+    def clear_headers(self):
+        self.headers.clear()
+        self.headers.update(DEFAULT_HEADERS)
+
+    def get_cookies(self) -> Dict[str, str]:
+        if self.cookie_jar is None:
+            return dict(self._pending_cookies)
+        return {cookie.key: cookie.value for cookie in self.cookie_jar}
+
+    def set_cookies(self, cookies: Dict[str, str]):
+        if self.cookie_jar is None:
+            self._pending_cookies.update(cookies)
+        else:
+            self.cookie_jar.update_cookies(cookies)
+
+    def clear_cookies(self):
+        if self.cookie_jar is None:
+            self._pending_cookies.clear()
+        else:
+            self.cookie_jar.clear()
+
+    def _build_url(self, endpoint: str) -> str:
+        if endpoint.startswith("http"):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _prepare_data(self, data: Any) -> Optional[Union[str, bytes]]:
+        if data is None:
+            return None
+        if isinstance(data, (dict, list)):
+            return json.dumps(data)
+        if isinstance(data, (bytes, bytearray)):
+            # 已序列化的请求体（如 BodyTemplate.render 的结果）原样发送
+            return data
+        return str(data)
+
+    def set_retry_policy(self, retry_policy: RetryPolicy):
+        self.retry_policy = retry_policy
+
+    def set_rate_limiter(self, rate_limiter: Optional[RateLimiter]):
+        self.rate_limiter = rate_limiter
+
+    async def _to_response(self, resp: aiohttp.ClientResponse, elapsed: float,
+                           timings: RequestTimings) -> requests.Response:
+        # 转换为 requests.Response，使 ResponseWrapper 和断言无需区分同步/异步
+        response = requests.Response()
+        response.status_code = resp.status
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.reason = resp.reason
+        response.encoding = resp.get_encoding() if resp.charset else None
+        response._content = await resp.read()
+        response.elapsed = timedelta(seconds=elapsed)
+        response.cookies = cookiejar_from_dict({key: morsel.value for key, morsel in resp.cookies.items()})
+
+        end = time.perf_counter()
+        timings.total = end - timings.start
+        if timings.first_byte:
+            timings.transfer = end - timings.first_byte
+        header_bytes = sum(len(k) + len(v) + 4 for k, v in resp.raw_headers)
+        timings.bytes_received = 17 + header_bytes + 2 + len(response._content)
+        response.timings = timings
+        return response
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        url = self._build_url(endpoint)
+        method = method.upper()
+
+        # 处理请求数据
+        if 'data' in kwargs and kwargs['data'] is not None:
+            if kwargs.get('json') is None:
+                kwargs['data'] = self._prepare_data(kwargs['data'])
+            else:
+                kwargs.pop('data')
+        if kwargs.get('json') is None:
+            kwargs.pop('json', None)
+        if kwargs.get('params') is None:
+            kwargs.pop('params', None)
+        # 异步客户端在连接释放前已读完响应体，stream 仅对同步客户端有意义
+        kwargs.pop('stream', None)
+
+        # 设置超时；同步外观从调用线程传入时间预算，协程中直接调用时从 contextvars 读取
+        deadline = kwargs.pop('deadline', None) or current_deadline()
+        timeout = kwargs.pop('timeout', self.timeout)
+        if not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+
+        headers = dict(self.headers)
+        headers.update(kwargs.pop('headers', None) or {})
+
+        session = await self._get_session()
+        loop = asyncio.get_running_loop()
+        policy = self.retry_policy
+        breaker = policy.breakers.get(method, url)
+        policy.budget.deposit()
+        retries: List[RetryRecord] = []
+        attempt = 0
+        delay = 0.0
+
+        while True:
+            # 熔断打开时快速失败，不再发出请求
+            breaker.before_request()
+            attempt_timeout = timeout
+            if deadline is not None:
+                if deadline.expired():
+                    raise deadline.exceeded(retries)
+                attempt_timeout = aiohttp.ClientTimeout(total=budget_timeout(timeout.total, deadline))
+
+            # 本地限流排队，重试同样受限
+            queue_wait = await self.rate_limiter.acquire_async(url) if self.rate_limiter is not None else 0.0
+
+            start = loop.time()
+            timings = RequestTimings()
+            timings.start = time.perf_counter()
+            timings.queue_wait = queue_wait
+            try:
+                async with session.request(method, url, headers=headers, timeout=attempt_timeout,
+                                           trace_request_ctx={"timings": timings}, **kwargs) as resp:
+                    if resp.status in policy.retry_status_codes:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if not policy.should_retry_response(method, headers, _StatusView(resp), attempt):
+                        response = await self._to_response(resp, loop.time() - start, timings)
+                        response.retries = retries
+                        return response
+                    reason = f"HTTP {resp.status}"
+                    status_code = resp.status
+                    retry_after = policy.get_retry_after(_StatusView(resp))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if deadline is not None and deadline.expired():
+                    # 超时是因为预算耗尽，不计入熔断，也不再重试
+                    raise deadline.exceeded(retries) from e
+                breaker.record_failure()
+                if not policy.should_retry_error(method, headers, bool(timings.request_sent), attempt):
+                    raise HTTPRequestError(f"HTTP请求失败: {str(e)}", retries)
+                reason = type(e).__name__
+                status_code = None
+                retry_after = None
+            finally:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.release(url)
+
+            attempt += 1
+            delay = retry_after if retry_after is not None else policy.next_delay(delay)
+            retries.append(RetryRecord(attempt, reason, delay, status_code))
+            if deadline is not None and delay >= deadline.remaining():
+                raise deadline.exceeded(retries)
+            await asyncio.sleep(delay)
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        return await self.request("GET", endpoint, params=params, **kwargs)
+
+    async def post(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return await self.request("POST", endpoint, data=data, json=json, **kwargs)
+
+    async def put(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return await self.request("PUT", endpoint, data=data, json=json, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request("DELETE", endpoint, **kwargs)
+
+    async def patch(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return await self.request("PATCH", endpoint, data=data, json=json, **kwargs)
+
+    async def head(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request("HEAD", endpoint, **kwargs)
+
+    async def options(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request("OPTIONS", endpoint, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        elif self._connector_owner and self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+
+
+class _StatusView:
+    """让 RetryPolicy 以 requests.Response 的方式读取 aiohttp 响应的状态码和响应头"""
+
+    def __init__(self, resp: aiohttp.ClientResponse):
+        self.status_code = resp.status
+        self.headers = resp.headers
+
+
+class EventLoopThread:
+    """在后台线程中运行事件循环，供同步代码提交协程"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-http-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def create_connector(self, limit: int = 100, limit_per_host: int = 10) -> aiohttp.TCPConnector:
+        async def _create():
+            return aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+        return self.run(_create())
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+        self.loop.close()
+
+
+class SyncAsyncHTTPClient:
+    """
+    AsyncHTTPClient 的同步外观，可直接替换 TestCase.client
+
+    请求、请求头、Cookie、认证、重试策略和限流器的接口与 HTTPClient 相同；响应缓存和录制回放
+    基于 requests 实现，这里不支持，enable_cache/use_cassette 会抛出 ValueError。
+    """
+
+    def __init__(self, async_client: AsyncHTTPClient, loop_thread: EventLoopThread):
+        self.async_client = async_client
+        self.loop_thread = loop_thread
+        self.authenticator = None
+        self.cache = None
+
+    @property
+    def base_url(self) -> str:
+        return self.async_client.base_url
+
+    @property
+    def timeout(self) -> int:
+        return self.async_client.timeout
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return self.async_client.retry_policy
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        return self.async_client.rate_limiter
+
+    def set_retry_policy(self, retry_policy: RetryPolicy):
+        self.async_client.set_retry_policy(retry_policy)
+
+    def set_rate_limiter(self, rate_limiter: Optional[RateLimiter]):
+        self.async_client.set_rate_limiter(rate_limiter)
+
+    def enable_cache(self, cache: Any = None):
+        raise ValueError("响应缓存不支持异步客户端")
+
+    def disable_cache(self):
+        self.cache = None
+
+    def use_cassette(self, cassette: Any):
+        raise ValueError("录制回放不支持异步客户端")
+
+    def set_headers(self, headers: Dict[str, str]):
+        self.async_client.set_headers(headers)
+
+    def clear_headers(self):
+        self.async_client.clear_headers()
+
+    def get_cookies(self) -> Dict[str, str]:
+        return self.async_client.get_cookies()
+
+    def set_cookies(self, cookies: Dict[str, str]):
+        self.async_client.set_cookies(cookies)
+
+    def clear_cookies(self):
+        self.async_client.clear_cookies()
+
+    def _build_url(self, endpoint: str) -> str:
+        return self.async_client._build_url(endpoint)
+
+    def set_authenticator(self, authenticator: Any):
+        self.authenticator = authenticator
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        authenticator = self.authenticator if kwargs.pop('authenticate', True) else None
+        if authenticator is None:
+            return self._run(method, endpoint, kwargs)
+        authenticator.before_request(self)
+        response = self._run(method, endpoint, dict(kwargs))
+        if response.status_code == 401 and authenticator.on_unauthorized(self):
+            response = self._run(method, endpoint, kwargs)
+        return response
+
+    def _run(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
+        # 事件循环线程读不到调用线程的 contextvars，时间预算需要显式传入；超出预算时取消协程
+        deadline = current_deadline()
+        if deadline is None:
+            return self.loop_thread.run(self.async_client.request(method, endpoint, **kwargs))
+        coro = self.async_client.request(method, endpoint, deadline=deadline, **kwargs)
+        return self.loop_thread.run(run_within_deadline(coro, deadline))
+
+    def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        return self.request("GET", endpoint, params=params, **kwargs)
+
+    def post(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return self.request("POST", endpoint, data=data, json=json, **kwargs)
+
+    def put(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return self.request("PUT", endpoint, data=data, json=json, **kwargs)
+
+    def delete(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def patch(self, endpoint: str, data: Any = None, json: Any = None, **kwargs) -> requests.Response:
+        return self.request("PATCH", endpoint, data=data, json=json, **kwargs)
+
+    def head(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", endpoint, **kwargs)
+
+    def options(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("OPTIONS", endpoint, **kwargs)
+
+    def close(self):
+        self.loop_thread.run(self.async_client.close())
@@ -0,0 +1,89 @@
+import copy
+import json
+import uuid
+from typing import Dict, Any, Iterable, List, Optional
+
+# 可选的高性能JSON编码后端，未安装时使用标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _encode_value(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class BodyTemplate:
+    """
+    预编译的请求体模板：整个 payload 只序列化一次，之后每次请求只编码槽位字段
+
+        template = BodyTemplate(cart_data, slots=["fuserId", "famount", "uuid"])
+        client.post(endpoint, data=template.render(fuserId=user_id, famount="200"))
+
+    槽位支持嵌套路径（如 "address.fid"），未传入的槽位使用编译时 payload 中的值，
+    传入未声明的槽位名抛出 ValueError。
+    """
+
+    def __init__(self, payload: Any, slots: Iterable[str]):
+        self.slots: List[str] = list(slots)
+        self._defaults: Dict[str, bytes] = {}
+        self._parts: List[bytes] = []
+        self._order: List[str] = []
+        self._compile(payload)
+
+    def _compile(self, payload: Any):
+        payload = copy.deepcopy(payload)
+        markers = {}
+        for slot in self.slots:
+            container, key = self._locate(payload, slot)
+            self._defaults[slot] = _encode_value(container[key])
+            marker = f"__body_slot_{uuid.uuid4().hex}__"
+            markers[marker] = slot
+            container[key] = marker
+
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        # 按槽位标记切分，得到固定片段和槽位的交替序列
+        parts = [text]
+        order = []
+        for marker, slot in markers.items():
+            token = f'"{marker}"'
+            for i, part in enumerate(parts):
+                if token in part:
+                    before, after = part.split(token, 1)
+                    parts[i:i + 1] = [before, after]
+                    order.insert(i, slot)
+                    break
+        self._parts = [part.encode("utf-8") for part in parts]
+        self._order = order
+
+    @staticmethod
+    def _locate(payload: Any, path: str):
+        keys = path.split(".")
+        container = payload
+        for key in keys[:-1]:
+            container = container[int(key)] if isinstance(container, list) else container[key]
+        last = keys[-1]
+        if isinstance(container, list):
+            last = int(last)
+        elif last not in container:
+            raise KeyError(f"模板中不存在字段: {path}")
+        return container, last
+
+    def render(self, values: Optional[Dict[str, Any]] = None, **kwargs) -> bytes:
+        if values:
+            kwargs.update(values)
+        unknown = kwargs.keys() - self._defaults.keys()
+        if unknown:
+            raise ValueError(f"模板中没有这些槽位: {', '.join(sorted(unknown))}")
+        parts = self._parts
+        chunks = [parts[0]]
+        for i, slot in enumerate(self._order):
+            if slot in kwargs:
+                chunks.append(_encode_value(kwargs[slot]))
+            else:
+                chunks.append(self._defaults[slot])
+            chunks.append(parts[i + 1])
+        return b"".join(chunks)
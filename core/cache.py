@@ -0,0 +1,223 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlsplit
+import requests
+from .cassette import normalize_url, normalize_body
+from .timing import RequestTimings
+
+
+# 登录态相关的请求头：值不同的请求（不同用户）不共享缓存
+CREDENTIAL_HEADERS = ("Authorization", "Cookie")
+
+
+def parse_vary(value: Optional[str]) -> List[str]:
+    return [name.strip().lower() for name in (value or "").split(",") if name.strip()]
+
+
+class CacheEntry:
+    __slots__ = ("response", "expires_at", "etag", "last_modified", "size", "must_revalidate", "vary")
+
+    def __init__(self, response: requests.Response, expires_at: float, size: int, must_revalidate: bool,
+                 vary: Optional[Dict[str, Optional[str]]] = None):
+        self.response = response
+        self.expires_at = expires_at
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.size = size
+        self.must_revalidate = must_revalidate
+        # 响应 Vary 列出的请求头 -> 缓存时请求中的值
+        self.vary = vary or {}
+
+    def matches(self, headers: Any) -> bool:
+        """请求中 Vary 列出的请求头与缓存时相同"""
+        return all(headers.get(name) == value for name, value in self.vary.items())
+
+    def is_fresh(self) -> bool:
+        return not self.must_revalidate and time.monotonic() < self.expires_at
+
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, arg = item.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+class ResponseCache:
+    """
+    按 LRU 和总字节数淘汰的响应缓存，支持 ETag / Last-Modified 条件请求
+
+    默认只缓存 GET/HEAD；只读的 POST 接口（如 loadGrouponList.do）需要在 cacheable_post 中显式声明。
+    Authorization/Cookie 的值计入缓存键，响应 Vary 列出的请求头不同时视为未命中，Vary: * 的响应不缓存。
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024,
+                 default_ttl: float = 0, endpoint_ttl: Optional[Dict[str, float]] = None,
+                 cacheable_post: Optional[Iterable[str]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.endpoint_ttl = endpoint_ttl or {}
+        self.cacheable_post = set(cacheable_post or [])
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, framework_config: Optional[Dict[str, Any]] = None) -> 'ResponseCache':
+        """根据 config.yaml 中 framework.cache 配置创建缓存"""
+        cache_config = (framework_config or {}).get('cache') or {}
+        return cls(
+            max_entries=cache_config.get('max_entries', 256),
+            max_bytes=cache_config.get('max_bytes', 16 * 1024 * 1024),
+            default_ttl=cache_config.get('default_ttl', 0),
+            endpoint_ttl=cache_config.get('ttl') or {},
+            cacheable_post=cache_config.get('cacheable_post') or []
+        )
+
+    def is_cacheable(self, method: str, url: str) -> bool:
+        if method in ("GET", "HEAD"):
+            return True
+        return method == "POST" and urlsplit(url).path in self.cacheable_post
+
+    @staticmethod
+    def make_key(method: str, url: str, body: Any, headers: Any = None) -> str:
+        key = f"{method} {normalize_url(url)} {normalize_body(body)}"
+        credentials = [headers.get(name) or "" for name in CREDENTIAL_HEADERS] if headers is not None else []
+        if any(credentials):
+            # 只保存摘要，缓存键中不出现 token/Cookie 原文
+            key += " " + hashlib.sha1("\n".join(credentials).encode("utf-8")).hexdigest()
+        return key
+
+    def _ttl_for(self, url: str, cache_control: Dict[str, Optional[str]], headers: Any) -> Optional[float]:
+        # 配置中的接口级TTL优先于服务端的缓存指令
+        path = urlsplit(url).path
+        if path in self.endpoint_ttl:
+            return float(self.endpoint_ttl[path])
+        if "max-age" in cache_control:
+            try:
+                return float(cache_control["max-age"])
+            except (TypeError, ValueError):
+                return 0.0
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                return max(parsedate_to_datetime(expires).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                return 0.0
+        return None
+
+    def lookup(self, key: str, headers: Any = None) -> Optional[CacheEntry]:
+        """headers 为本次请求的请求头，与缓存条目的 Vary 不符时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (headers is not None and not entry.matches(headers)):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _serve(self, entry: CacheEntry, timings: Optional[RequestTimings] = None) -> requests.Response:
+        response = copy.copy(entry.response)
+        response.timings = timings if timings is not None else RequestTimings()
+        response.retries = []
+        response.from_cache = True
+        return response
+
+    def hit(self, entry: CacheEntry) -> requests.Response:
+        with self._lock:
+            self.hits += 1
+        return self._serve(entry)
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def revalidated(self, key: str, entry: CacheEntry, response: requests.Response) -> requests.Response:
+        """304 响应：沿用缓存的响应体，更新有效期和验证字段"""
+        cache_control = parse_cache_control(response.headers.get("Cache-Control"))
+        ttl = self._ttl_for(response.url or entry.response.url, cache_control, response.headers)
+        ttl = ttl if ttl is not None else self.default_ttl
+        with self._lock:
+            self.revalidations += 1
+            entry.expires_at = time.monotonic() + ttl
+            entry.must_revalidate = "no-cache" in cache_control
+            entry.etag = response.headers.get("ETag", entry.etag)
+            entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return self._serve(entry, getattr(response, "timings", None))
+
+    def store(self, key: str, response: requests.Response):
+        if response.status_code != 200:
+            return
+        cache_control = parse_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in cache_control:
+            return
+        vary = parse_vary(response.headers.get("Vary"))
+        if "*" in vary:
+            return
+        request_headers = getattr(response.request, "headers", None) or {}
+        ttl = self._ttl_for(response.url, cache_control, response.headers)
+        ttl = ttl if ttl is not None else self.default_ttl
+        must_revalidate = "no-cache" in cache_control
+        entry = CacheEntry(response, time.monotonic() + ttl, len(response.content or b""), must_revalidate,
+                           {name: request_headers.get(name) for name in vary})
+        # 既不能直接复用又无法条件请求的响应没有缓存价值
+        if (ttl <= 0 or must_revalidate) and not entry.has_validators():
+            return
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self.stores += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
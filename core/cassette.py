@@ -0,0 +1,202 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from http.client import HTTPMessage
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from urllib3.response import HTTPResponse
+from .timing import current_timings
+
+
+# 回放时需要去掉的响应头：响应体已解码，长度由回放内容决定
+_SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+class CassetteMissError(Exception):
+    def __init__(self, method: str, url: str):
+        super().__init__(f"录制文件中没有匹配的请求: {method} {url}")
+        self.method = method
+        self.url = url
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+def normalize_body(body: Any) -> str:
+    """请求体摘要：JSON 请求体按键排序后再计算，字段顺序不同的相同请求可以匹配"""
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, (bytes, bytearray)):
+        return ""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    return hashlib.sha1(body).hexdigest()
+
+
+class _RecordedOriginalResponse:
+    """提供 requests 提取 Set-Cookie 所需的最小接口"""
+
+    def __init__(self, headers: List[Tuple[str, str]]):
+        self.msg = HTTPMessage()
+        for key, value in headers:
+            self.msg[key] = value
+
+    def isclosed(self) -> bool:
+        return True
+
+
+class Cassette:
+    RECORD = "record"
+    REPLAY = "replay"
+    # 回放速度：尽快回放，或者按录制时的响应耗时回放
+    FAST = "fast"
+    RECORDED = "recorded"
+
+    def __init__(self, path: str, mode: str = REPLAY, speed: str = FAST):
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"不支持的录制模式: {mode}")
+        if speed not in (self.FAST, self.RECORDED):
+            raise ValueError(f"不支持的回放速度: {speed}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.interactions: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        # 同一请求多次出现时（如重试、轮询）按录制顺序依次回放
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == self.REPLAY:
+            self.load()
+
+    @staticmethod
+    def make_key(method: str, url: str, body: Any) -> str:
+        return f"{method.upper()} {normalize_url(url)} {normalize_body(body)}"
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"录制文件不存在: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.interactions = data.get("interactions", [])
+        self._index.clear()
+        self._cursor.clear()
+        for interaction in self.interactions:
+            self._index.setdefault(interaction["key"], []).append(interaction)
+
+    def save(self):
+        if self.mode != self.RECORD:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {"version": 1, "interactions": self.interactions}
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float):
+        content = response.content or b""
+        try:
+            body = {"body": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"body_b64": base64.b64encode(content).decode("ascii")}
+
+        timings = current_timings()
+        interaction = {
+            "key": self.make_key(request.method, request.url, request.body),
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": [[k, v] for k, v in response.raw.headers.items() if k.lower() not in _SKIPPED_HEADERS],
+            "elapsed": round(elapsed, 6),
+            "timings": {
+                "dns": timings.dns,
+                "connect": timings.connect,
+                "tls": timings.tls,
+                "ttfb": timings.ttfb
+            } if timings is not None else None
+        }
+        interaction.update(body)
+        with self._lock:
+            self.interactions.append(interaction)
+            self._index.setdefault(interaction["key"], []).append(interaction)
+
+    def find(self, request: requests.PreparedRequest) -> Dict[str, Any]:
+        key = self.make_key(request.method, request.url, request.body)
+        with self._lock:
+            candidates = self._index.get(key)
+            if not candidates:
+                raise CassetteMissError(request.method, request.url)
+            position = self._cursor.get(key, 0)
+            self._cursor[key] = position + 1
+            return candidates[position % len(candidates)]
+
+
+class CassetteAdapter(HTTPAdapter):
+    """录制时包装真实适配器并保存交互，回放时直接由录制内容构造响应，不发生网络IO"""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.cassette.mode == Cassette.RECORD:
+            start = time.perf_counter()
+            response = self.inner.send(request, **kwargs)
+            # 读取响应体以便保存，录制耗时包含传输时间
+            response.content
+            self.cassette.record(request, response, time.perf_counter() - start)
+            return response
+        return self._replay(request)
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        interaction = self.cassette.find(request)
+        if "body_b64" in interaction:
+            content = base64.b64decode(interaction["body_b64"])
+        else:
+            content = interaction["body"].encode("utf-8")
+
+        timings = current_timings()
+        recorded_timings = interaction.get("timings") or {}
+        if self.cassette.speed == Cassette.RECORDED:
+            time.sleep(interaction.get("elapsed", 0))
+            if timings is not None:
+                timings.dns = recorded_timings.get("dns", 0.0)
+                timings.connect = recorded_timings.get("connect", 0.0)
+                timings.tls = recorded_timings.get("tls", 0.0)
+                timings.ttfb = recorded_timings.get("ttfb", 0.0)
+        if timings is not None:
+            timings.first_byte = time.perf_counter()
+
+        headers = [(k, v) for k, v in interaction["headers"]]
+        headers.append(("Content-Length", str(len(content))))
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=headers,
+            status=interaction["status"],
+            reason=interaction.get("reason"),
+            preload_content=False,
+            decode_content=False,
+            original_response=_RecordedOriginalResponse(headers)
+        )
+        return self.build_response(request, raw)
+
+    def close(self):
+        self.inner.close()
+        super().close()
@@ -0,0 +1,105 @@
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from .http_client import HTTPClient
+from .timing import TimedHTTPAdapter
+
+
+class ConnectionPool:
+    """按 base_url 共享的连接池，同一主机的用例复用 TCP/TLS 连接"""
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, keep_alive: bool = True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        # 已关闭适配器的计数，保证运行结束后统计仍然完整
+        self._closed_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, framework_config: Optional[Dict[str, Any]] = None) -> 'ConnectionPool':
+        """根据 config.yaml 中 framework 配置创建连接池"""
+        framework_config = framework_config or {}
+        pool_config = framework_config.get('connection_pool') or {}
+        return cls(
+            pool_connections=pool_config.get('pool_connections', 10),
+            pool_maxsize=pool_config.get('pool_maxsize', 10),
+            pool_block=pool_config.get('pool_block', False),
+            keep_alive=pool_config.get('keep_alive', True)
+        )
+
+    @staticmethod
+    def _pool_key(base_url: str) -> str:
+        parts = urlsplit(base_url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_adapter(self, base_url: str) -> HTTPAdapter:
+        key = self._pool_key(base_url)
+        with self._lock:
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = TimedHTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                    max_retries=0
+                )
+                self._adapters[key] = adapter
+            return adapter
+
+    def attach(self, client: HTTPClient):
+        """让客户端从连接池借用连接"""
+        if not isinstance(client, HTTPClient) or not client.base_url.startswith("http"):
+            return
+        key = self._pool_key(client.base_url)
+        client.use_adapter(key, self.get_adapter(client.base_url))
+        if not self.keep_alive:
+            client.set_headers({"Connection": "close"})
+
+    @staticmethod
+    def _adapter_stats(adapter: HTTPAdapter) -> Dict[str, int]:
+        new_connections = 0
+        requests_count = 0
+        pools = adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            new_connections += pool.num_connections
+            requests_count += pool.num_requests
+        return {"new_connections": new_connections, "requests": requests_count}
+
+    def stats(self) -> Dict[str, Any]:
+        hosts = {}
+        with self._lock:
+            for key, counters in self._closed_stats.items():
+                hosts[key] = dict(counters)
+            for key, adapter in self._adapters.items():
+                counters = self._adapter_stats(adapter)
+                host = hosts.setdefault(key, {"new_connections": 0, "requests": 0})
+                host["new_connections"] += counters["new_connections"]
+                host["requests"] += counters["requests"]
+
+        for host in hosts.values():
+            host["reused"] = max(host["requests"] - host["new_connections"], 0)
+
+        return {
+            "hosts": hosts,
+            "new_connections": sum(h["new_connections"] for h in hosts.values()),
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "reused": sum(h["reused"] for h in hosts.values())
+        }
+
+    def close(self):
+        with self._lock:
+            for key, adapter in self._adapters.items():
+                counters = self._adapter_stats(adapter)
+                closed = self._closed_stats.setdefault(key, {"new_connections": 0, "requests": 0})
+                closed["new_connections"] += counters["new_connections"]
+                closed["requests"] += counters["requests"]
+                adapter.close()
+            self._adapters.clear()
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple, Union
+
+
+class DeadlineExceeded(Exception):
+    """时间预算耗尽（套件/用例/步骤的超时），报告中与断言失败分开统计"""
+
+    def __init__(self, scope: str, budget: float, retries: Optional[list] = None):
+        super().__init__(f"{scope} 超出时间预算 {budget:.3f}秒")
+        self.scope = scope
+        self.budget = budget
+        self.retries = retries or []
+
+
+class Deadline:
+    """一个作用域的截止时刻（monotonic），不会晚于外层作用域的截止时刻"""
+
+    __slots__ = ("scope", "budget", "expires_at", "parent")
+
+    def __init__(self, scope: str, budget: float, parent: Optional['Deadline'] = None):
+        self.scope = scope
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.parent = parent
+
+    def effective(self) -> 'Deadline':
+        """决定剩余时间的作用域：自身与各外层中最早到期的一个"""
+        deadline = self
+        parent = self.parent
+        while parent is not None:
+            if parent.expires_at < deadline.expires_at:
+                deadline = parent
+            parent = parent.parent
+        return deadline
+
+    def remaining(self) -> float:
+        return self.effective().expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self):
+        if self.expired():
+            raise self.exceeded()
+
+    def exceeded(self, retries: Optional[list] = None) -> DeadlineExceeded:
+        """决定截止时刻的作用域对应的异常"""
+        deadline = self.effective()
+        return DeadlineExceeded(deadline.scope, deadline.budget, retries)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float], scope: str):
+    """
+    在代码块内设置时间预算，嵌套时取内外层中较早的截止时刻；budget 为 None 时只继承外层
+
+    使用 contextvars 传递，同一线程和 asyncio 任务内自动生效；线程池中执行时需要
+    contextvars.copy_context().run 把当前预算带到工作线程。
+    """
+    if budget is None:
+        yield current_deadline()
+        return
+    deadline = Deadline(scope, budget, current_deadline())
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """临时解除时间预算（如清理动作）"""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def check_deadline(deadline: Optional[Deadline] = None):
+    """协作式取消点：预算已耗尽时抛出 DeadlineExceeded"""
+    deadline = deadline if deadline is not None else current_deadline()
+    if deadline is not None:
+        deadline.check()
+
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+def budget_timeout(timeout: Timeout, deadline: Optional[Deadline] = None) -> Timeout:
+    """请求超时取配置的超时与剩余预算中较小的一个；预算已耗尽时抛出 DeadlineExceeded"""
+    deadline = deadline if deadline is not None else current_deadline()
+    if deadline is None:
+        return timeout
+    deadline.check()
+    remaining = deadline.remaining()
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+    return min(timeout, remaining)
+
+
+async def run_within_deadline(coro, deadline: Optional[Deadline] = None) -> Any:
+    """asyncio 模式：超出剩余预算时取消协程并抛出 DeadlineExceeded"""
+    deadline = deadline if deadline is not None else current_deadline()
+    if deadline is None:
+        return await coro
+    try:
+        return await asyncio.wait_for(coro, max(deadline.remaining(), 0.0))
+    except asyncio.TimeoutError:
+        raise deadline.exceeded() from None
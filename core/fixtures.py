@@ -0,0 +1,194 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from .http_client import ResponseWrapper
+from .assertions import AssertionError
+from .jsonpath import MISSING, compile_path
+
+
+class LoginSession:
+    """一次登录的结果：Cookie、token 和登录响应中提取的变量"""
+
+    def __init__(self, cookies: Dict[str, str], token: Optional[str], variables: Dict[str, Any],
+                 expires_at: float):
+        self.cookies = cookies
+        self.token = token
+        self.variables = variables
+        self.expires_at = expires_at
+        self.created_at = time.monotonic()
+
+    def is_expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class FixtureCache:
+    """按键缓存登录结果；同一个键同时只有一个线程执行登录，其它线程等待并复用结果"""
+
+    def __init__(self):
+        self._sessions: Dict[Tuple, LoginSession] = {}
+        self._locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: Tuple) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: Tuple) -> Optional[LoginSession]:
+        session = self._sessions.get(key)
+        return session if session is not None and not session.is_expired() else None
+
+    def get_or_create(self, key: Tuple, factory, stale: Optional[LoginSession] = None) -> Tuple[LoginSession, bool]:
+        """
+        返回 (登录结果, 是否新登录)
+
+        stale 为调用方正在使用的已失效登录：缓存中的仍是它时重新登录，
+        已被其它线程刷新过时直接复用新的结果。
+        """
+        session = self.get(key)
+        if session is not None and session is not stale:
+            return session, False
+        with self._key_lock(key):
+            session = self.get(key)
+            if session is not None and session is not stale:
+                return session, False
+            session = factory()
+            self._sessions[key] = session
+            return session, True
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+# 进程内共享的登录缓存（session 作用域）
+SESSION_CACHE = FixtureCache()
+
+SCOPES = ("session", "suite")
+
+
+class LoginFixture:
+    """
+    登录夹具：同一组凭据只登录一次，登录得到的 Cookie/token 在有效期内共享给所有用例
+
+    scope="session" 时进程内所有夹具共享缓存；scope="suite" 时缓存属于该夹具实例，
+    每个测试套件创建自己的夹具即为套件作用域。应用到客户端后，请求前发现登录过期或
+    收到 401 时会自动重新登录并重试一次。
+    """
+
+    def __init__(self, endpoint: str, credentials: Dict[str, Any], ttl: float = 1800,
+                 scope: str = "session", token_cookie: str = "token", token_field: str = "token",
+                 variables: Optional[Dict[str, str]] = None, extra_payload: Optional[Dict[str, Any]] = None):
+        if scope not in SCOPES:
+            raise ValueError(f"不支持的夹具作用域: {scope}")
+        self.endpoint = endpoint
+        self.credentials = credentials
+        self.ttl = ttl
+        self.scope = scope
+        self.token_cookie = token_cookie
+        self.token_field = token_field
+        # 变量名 -> 登录响应JSON中的路径（如 "data.fid"）
+        self.variables = variables or {}
+        self.extra_payload = extra_payload or {}
+        self.cache = SESSION_CACHE if scope == "session" else FixtureCache()
+        self._fingerprint = self._digest()
+        self.logins = 0
+        self.reuses = 0
+        self.refreshes = 0
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, env: str, credentials_key: str, **kwargs) -> 'LoginFixture':
+        """使用 config.yaml 中环境的 login 接口、测试数据中的凭据和 framework.login 配置创建夹具"""
+        from config.config import config
+        credentials = config.get_test_data(credentials_key)
+        if credentials is None:
+            raise ValueError(f"找不到登录凭据: {credentials_key}")
+        kwargs.setdefault("ttl", config.get_framework_config("login.ttl", 1800))
+        return cls(
+            config.get_api_endpoint(env, "login"),
+            {"username": credentials["username"], "password": credentials["password"]},
+            **kwargs
+        )
+
+    def _digest(self) -> str:
+        """凭据（含密码）、附加请求体和变量提取规则的摘要：任何一项不同的夹具都不共享登录结果"""
+        material = [self.credentials, self.extra_payload, self.variables, self.token_cookie, self.token_field]
+        return hashlib.sha1(json.dumps(material, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+    def _cache_key(self, client: Any) -> Tuple:
+        return (client.base_url, self.endpoint, self.credentials.get("username"), self._fingerprint)
+
+    @staticmethod
+    def _lookup(data: Any, path: str) -> Any:
+        value = compile_path(path).lookup(data)
+        return None if value is MISSING else value
+
+    def _login(self, client: Any) -> LoginSession:
+        response = ResponseWrapper(client.request(
+            "POST", self.endpoint, json=dict(self.credentials, **self.extra_payload), authenticate=False
+        ))
+        try:
+            body = response.json
+        except ValueError:
+            body = None
+        if response.status_code != 200 or not isinstance(body, dict) or body.get("success") is False:
+            message = body.get("msg") if isinstance(body, dict) else response.text[:200]
+            raise AssertionError(f"登录失败: 状态码 {response.status_code}, {message}")
+
+        # 以登录响应写入的Cookie为准
+        cookies = client.get_cookies()
+        cookies.update({cookie.name: cookie.value for cookie in response.response.cookies})
+        token = cookies.get(self.token_cookie) or self._lookup(body, self.token_field)
+        variables = {name: self._lookup(body, path) for name, path in self.variables.items()}
+        with self._stats_lock:
+            self.logins += 1
+        return LoginSession(cookies, token, variables, time.monotonic() + self.ttl)
+
+    def _install(self, client: Any, session: LoginSession):
+        client.set_cookies(session.cookies)
+        if session.token and session.token != session.cookies.get(self.token_cookie):
+            # token 只在响应体中返回时使用 Bearer 头
+            client.set_headers({"Authorization": f"Bearer {session.token}"})
+        client.login_session = session
+        client.set_authenticator(self)
+
+    def session_for(self, client: Any, stale: Optional[LoginSession] = None) -> LoginSession:
+        session, created = self.cache.get_or_create(self._cache_key(client), lambda: self._login(client), stale)
+        if not created:
+            with self._stats_lock:
+                self.reuses += 1
+        return session
+
+    def apply(self, test_case: Any) -> LoginSession:
+        """把登录态应用到用例的客户端和变量（需要时才登录），可直接作为用例的前置钩子"""
+        session = self.session_for(test_case.client)
+        self._install(test_case.client, session)
+        for name, value in session.variables.items():
+            test_case.set_variable(name, value)
+        if session.token:
+            test_case.set_variable("auth_token", session.token)
+        return session
+
+    def before_request(self, client: Any):
+        session = getattr(client, "login_session", None)
+        if session is not None and session.is_expired():
+            self._refresh(client, session)
+
+    def on_unauthorized(self, client: Any) -> bool:
+        """收到 401 时换用新的登录态，返回 True 表示已安装了不同于本次请求所用的登录态、值得重试"""
+        return self._refresh(client, getattr(client, "login_session", None))
+
+    def _refresh(self, client: Any, stale: Optional[LoginSession]) -> bool:
+        session = self.session_for(client, stale=stale)
+        if session is stale:
+            return False
+        with self._stats_lock:
+            self.refreshes += 1
+        self._install(client, session)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"logins": self.logins, "reuses": self.reuses, "refreshes": self.refreshes}
@@ -0,0 +1,242 @@
+import functools
+import math
+import re
+import threading
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+PERCENTILES = (50, 90, 99)
+
+# 路径中的 ID 段（数字、UUID、长十六进制串）归并为同一个模板，避免每个 ID 一个直方图
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def endpoint_template(endpoint: str) -> str:
+    """接口路径模板：去掉协议、主机和查询参数，ID 段替换为 {id}"""
+    path = urlsplit(endpoint).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def endpoint_key(method: str, endpoint: str) -> str:
+    return f"{method.upper()} {endpoint_template(endpoint)}"
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数-线性直方图（纳秒）
+
+    值按 2 的幂分桶，每个桶再线性分成若干子桶，significant_digits 位有效数字内的值可区分
+    （2 位时相对误差 < 1%）。计数数组的长度只取决于范围和精度，与样本数无关；参数相同的
+    直方图可以按计数直接相加合并。不加锁，多线程写入时由调用方（HistogramSet）加锁。
+    """
+
+    def __init__(self, lowest: int = 1_000, highest: int = 3_600_000_000_000, significant_digits: int = 2):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError(f"有效数字位数需在 1~5 之间: {significant_digits}")
+        if lowest < 1 or highest < 2 * lowest:
+            raise ValueError(f"直方图范围无效: {lowest} ~ {highest}")
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._unit_magnitude = int(math.log2(lowest))
+        self._sub_bucket_half_count_magnitude = int(math.log2(sub_bucket_count)) - 1
+        self._sub_bucket_half_count = sub_bucket_count // 2
+        self._sub_bucket_mask = (sub_bucket_count - 1) << self._unit_magnitude
+        bucket_count = 1
+        smallest_untrackable = sub_bucket_count << self._unit_magnitude
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = [0] * ((bucket_count + 1) * self._sub_bucket_half_count)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        bucket_index = ((value | self._sub_bucket_mask).bit_length()
+                        - self._unit_magnitude - self._sub_bucket_half_count_magnitude - 1)
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket_index \
+            - self._sub_bucket_half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        """计数下标对应区间内的最大值"""
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        shift = bucket_index + self._unit_magnitude
+        return ((sub_bucket_index + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        """记录一个耗时（纳秒），超出范围的值计入最高的桶，min/max 仍为精确值"""
+        value = max(int(value), 0)
+        self.counts[self._index(min(value, self.highest))] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def compatible(self, other: 'LatencyHistogram') -> bool:
+        return (self.lowest, self.highest, self.significant_digits) == \
+            (other.lowest, other.highest, other.significant_digits)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        if not self.compatible(other):
+            raise ValueError("直方图的范围或精度不同，无法合并")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self._merge_totals(other.count, other.total, other.min, other.max)
+        return self
+
+    def _merge_totals(self, count: int, total: int, minimum: Optional[int], maximum: Optional[int]):
+        self.count += count
+        self.total += total
+        if minimum is not None and (self.min is None or minimum < self.min):
+            self.min = minimum
+        if maximum is not None and (self.max is None or maximum > self.max):
+            self.max = maximum
+
+    def value_at_percentile(self, q: float) -> int:
+        """最近秩百分位数（纳秒），取所在区间的最大值并限制在 [min, max] 内"""
+        if not self.count:
+            return 0
+        rank = min(max(int(self.count * q / 100.0 + 0.5), 1), self.count)
+        if rank == self.count:
+            return self.max
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(self._highest_equivalent(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self, percentiles: Tuple[float, ...] = PERCENTILES) -> Dict[str, Any]:
+        """毫秒为单位的统计：count、mean、max 和各百分位（pXX_ms）"""
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.mean / 1e6, 3),
+            "min_ms": round((self.min or 0) / 1e6, 3),
+            "max_ms": round((self.max or 0) / 1e6, 3)
+        }
+        for q in percentiles:
+            summary[f"p{q:g}_ms"] = round(self.value_at_percentile(q) / 1e6, 3)
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        """可 JSON 序列化的快照，计数只保存非零项 [下标, 计数]"""
+        return {
+            "lowest": self.lowest,
+            "highest": self.highest,
+            "significant_digits": self.significant_digits,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": [[index, count] for index, count in enumerate(self.counts) if count]
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls(snapshot["lowest"], snapshot["highest"], snapshot["significant_digits"])
+        histogram.merge_snapshot(snapshot)
+        return histogram
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> 'LatencyHistogram':
+        if (snapshot["lowest"], snapshot["highest"], snapshot["significant_digits"]) != \
+                (self.lowest, self.highest, self.significant_digits):
+            raise ValueError("直方图的范围或精度不同，无法合并")
+        for index, count in snapshot["counts"]:
+            self.counts[index] += count
+        self._merge_totals(snapshot["count"], snapshot["total"], snapshot["min"], snapshot["max"])
+        return self
+
+
+class HistogramSet:
+    """按接口（方法 + 路径模板）分组的延迟直方图，线程安全，可合并其他进程的快照"""
+
+    def __init__(self, lowest: int = 1_000, highest: int = 3_600_000_000_000, significant_digits: int = 2):
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, key: str) -> LatencyHistogram:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram(self.lowest, self.highest, self.significant_digits)
+        return histogram
+
+    def record(self, key: str, value: int):
+        with self._lock:
+            self._histogram(key).record(value)
+
+    def get(self, key: str) -> Optional[LatencyHistogram]:
+        return self._histograms.get(key)
+
+    def keys(self) -> List[str]:
+        return sorted(self._histograms)
+
+    def items(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        with self._lock:
+            items = sorted(self._histograms.items())
+        return iter(items)
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    def merge(self, other: 'HistogramSet') -> 'HistogramSet':
+        for key, histogram in other.items():
+            with self._lock:
+                self._histogram(key).merge(histogram)
+        return self
+
+    def merge_snapshot(self, snapshot: Dict[str, Dict[str, Any]]) -> 'HistogramSet':
+        with self._lock:
+            for key, data in snapshot.items():
+                self._histogram(key).merge_snapshot(data)
+        return self
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: histogram.snapshot() for key, histogram in sorted(self._histograms.items())}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Dict[str, Any]]) -> 'HistogramSet':
+        histograms = cls()
+        if snapshot:
+            first = next(iter(snapshot.values()))
+            histograms = cls(first["lowest"], first["highest"], first["significant_digits"])
+        return histograms.merge_snapshot(snapshot)
+
+    def summary(self, percentiles: Tuple[float, ...] = PERCENTILES) -> Dict[str, Dict[str, Any]]:
+        return {key: histogram.summary(percentiles) for key, histogram in self.items()}
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """合并多个 HistogramSet 快照（如多个进程、多个套件的结果）"""
+    merged: Optional[HistogramSet] = None
+    for snapshot in snapshots:
+        if not snapshot:
+            continue
+        if merged is None:
+            merged = HistogramSet.from_snapshot(snapshot)
+        else:
+            merged.merge_snapshot(snapshot)
+    return merged.snapshot() if merged is not None else {}
@@ -1,25 +1,53 @@
 import requests
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Union
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests.cookies import RequestsCookieJar, merge_cookies
+from requests.sessions import merge_setting
+from requests.structures import CaseInsensitiveDict
+from .timing import RequestTimings, TimedHTTPAdapter, start_recording, finish_recording, stop_recording
+from .retry import RetryPolicy, RetryRecord, HTTPRequestError
+from .cassette import Cassette, CassetteAdapter
+from .cache import ResponseCache
+from .rate_limiter import RateLimiter
+from .deadline import current_deadline, budget_timeout
+from .jsonpath import MISSING, compile_path
+
+# 可选的高性能JSON解码后端，未安装时使用标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+_UNSET = object()
 
 
 class HTTPClient:
-    def __init__(self, base_url: str = "", timeout: int = 30, retries: int = 3):
+    def __init__(self, base_url: str = "", timeout: int = 30, retries: int = 3,
+                 retry_policy: Optional[RetryPolicy] = None):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.session = requests.Session()
+        # 从共享连接池借用的适配器，关闭客户端时不能关闭
+        self._shared_prefixes = set()
+        self.cassette: Optional[Cassette] = None
+        self.cache: Optional[ResponseCache] = None
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.authenticator = None
         
-        # 设置重试策略
-        retry_strategy = Retry(
-            total=retries,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "POST"],
-            backoff_factor=1
-        )
+        # 设置重试策略，重试由客户端自行控制，适配器层不再重试
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries=retries)
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = TimedHTTPAdapter(max_retries=0)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
@@ -29,6 +57,28 @@ class HTTPClient:
             "User-Agent": "APITestFramework/1.0"
         })
     
+    def set_retry_policy(self, retry_policy: RetryPolicy):
+        self.retry_policy = retry_policy
+    
+    def set_rate_limiter(self, rate_limiter: Optional[RateLimiter]):
+        """按主机限流，同一个限流器可以在多个客户端（包括异步客户端）之间共享"""
+        self.rate_limiter = rate_limiter
+    
+    def use_adapter(self, prefix: str, adapter: HTTPAdapter):
+        """为指定URL前缀挂载共享适配器，Cookie和请求头仍由本客户端独立维护"""
+        if self.cassette is not None:
+            adapter = CassetteAdapter(self.cassette, adapter)
+        self.session.mount(prefix, adapter)
+        self._shared_prefixes.add(prefix)
+    
+    def use_cassette(self, cassette: Cassette):
+        """录制或回放请求，回放模式下不发生任何网络IO"""
+        for prefix, adapter in list(self.session.adapters.items()):
+            if isinstance(adapter, CassetteAdapter):
+                adapter = adapter.inner
+            self.session.mount(prefix, CassetteAdapter(cassette, adapter))
+        self.cassette = cassette
+    
     def set_headers(self, headers: Dict[str, str]):
         self.session.headers.update(headers)
     
@@ -40,10 +90,13 @@ class HTTPClient:
         })
     
     def get_cookies(self) -> Dict[str, str]:
-        return dict(self.session.cookies)
+        return {cookie.name: cookie.value for cookie in self.session.cookies}
     
     def set_cookies(self, cookies: Dict[str, str]):
-        self.session.cookies.update(cookies)
+        for name, value in cookies.items():
+            # 先移除服务端按域名写入的同名Cookie，避免同名Cookie重复发送
+            requests.cookies.remove_cookie_by_name(self.session.cookies, name)
+            self.session.cookies.set(name, value)
     
     def clear_cookies(self):
         self.session.cookies.clear()
@@ -53,14 +106,33 @@ class HTTPClient:
             return endpoint
         return f"{self.base_url}/{endpoint.lstrip('/')}"
     
-    def _prepare_data(self, data: Any) -> Optional[str]:
+    def _prepare_data(self, data: Any) -> Optional[Union[str, bytes]]:
         if data is None:
             return None
         if isinstance(data, (dict, list)):
             return json.dumps(data)
+        if isinstance(data, (bytes, bytearray)):
+            # 已序列化的请求体（如 BodyTemplate.render 的结果）原样发送
+            return data
         return str(data)
     
+    def set_authenticator(self, authenticator: Any):
+        """登录态管理（见 core.fixtures.LoginFixture）：请求前检查登录是否过期，401 时重新登录并重试一次"""
+        self.authenticator = authenticator
+    
     def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        # authenticate=False 用于登录请求本身，避免递归
+        authenticator = self.authenticator if kwargs.pop('authenticate', True) else None
+        if authenticator is None:
+            return self._request(method, endpoint, kwargs)
+        authenticator.before_request(self)
+        response = self._request(method, endpoint, dict(kwargs))
+        if response.status_code == 401 and authenticator.on_unauthorized(self):
+            response.close()
+            response = self._request(method, endpoint, kwargs)
+        return response
+    
+    def _request(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
         url = self._build_url(endpoint)
         
         # 处理请求数据
@@ -72,11 +144,116 @@ class HTTPClient:
         if 'timeout' not in kwargs:
             kwargs['timeout'] = self.timeout
         
-        try:
-            response = self.session.request(method.upper(), url, **kwargs)
-            return response
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"HTTP请求失败: {str(e)}")
+        method = method.upper()
+        cache = self.cache
+        if cache is None or kwargs.get('stream') or not cache.is_cacheable(method, url):
+            return self._send(method, url, kwargs)
+        
+        # 条件请求缓存：新鲜的缓存直接返回，过期但有验证字段的发起条件请求
+        prepared = self._prepare_cache_request(url, kwargs)
+        key = self._cache_key(method, prepared, kwargs)
+        entry = cache.lookup(key, prepared.headers)
+        if entry is not None and entry.is_fresh():
+            return cache.hit(entry)
+        conditional = entry is not None and entry.has_validators()
+        if conditional:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **cache.conditional_headers(entry))
+        
+        response = self._send(method, url, kwargs)
+        if conditional and response.status_code == 304:
+            return cache.revalidated(key, entry, response)
+        # 条件请求返回了完整响应时同样计为未命中：hits + misses + revalidations 等于可缓存的请求数
+        cache.miss()
+        cache.store(key, response)
+        return response
+    
+    def _prepare_cache_request(self, url: str, kwargs: Dict[str, Any]) -> requests.PreparedRequest:
+        """按会话合并后的 URL、请求头和 Cookie，缓存键和 Vary 匹配都以实际发出的值为准"""
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, kwargs.get('params'))
+        prepared.prepare_headers(merge_setting(kwargs.get('headers'), self.session.headers,
+                                               dict_class=CaseInsensitiveDict))
+        cookies = merge_cookies(merge_cookies(RequestsCookieJar(), self.session.cookies), kwargs.get('cookies'))
+        prepared.prepare_cookies(cookies)
+        return prepared
+    
+    def _cache_key(self, method: str, prepared: requests.PreparedRequest, kwargs: Dict[str, Any]) -> str:
+        body = kwargs.get('json')
+        body = json.dumps(body) if body is not None else kwargs.get('data')
+        return ResponseCache.make_key(method, prepared.url, body, prepared.headers)
+    
+    def enable_cache(self, cache: Optional[ResponseCache] = None) -> ResponseCache:
+        """启用响应缓存（默认关闭），命中/未命中/条件请求次数见 cache.stats()"""
+        self.cache = cache if cache is not None else ResponseCache()
+        return self.cache
+    
+    def disable_cache(self):
+        self.cache = None
+    
+    def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        policy = self.retry_policy
+        headers = dict(self.session.headers)
+        headers.update(kwargs.get('headers') or {})
+        breaker = policy.breakers.get(method, url)
+        policy.budget.deposit()
+        retries: List[RetryRecord] = []
+        attempt = 0
+        delay = 0.0
+        # 套件/用例/步骤的剩余时间预算，每次尝试的超时不超过剩余预算
+        deadline = current_deadline()
+        timeout = kwargs['timeout']
+        
+        while True:
+            # 熔断打开时快速失败，不再发出请求
+            breaker.before_request()
+            if deadline is not None:
+                if deadline.expired():
+                    raise deadline.exceeded(retries)
+                kwargs['timeout'] = budget_timeout(timeout, deadline)
+            
+            # 本地限流排队，重试同样受限
+            queue_wait = self.rate_limiter.acquire(url) if self.rate_limiter is not None else 0.0
+            
+            # 采集 DNS/建连/TLS/首字节/传输各阶段耗时
+            timings = start_recording()
+            timings.queue_wait = queue_wait
+            try:
+                response = self.session.request(method, url, **kwargs)
+                finish_recording(timings, response)
+            except requests.exceptions.RequestException as e:
+                if deadline is not None and deadline.expired():
+                    # 超时是因为预算耗尽，不计入熔断，也不再重试
+                    raise deadline.exceeded(retries) from e
+                breaker.record_failure()
+                if not policy.should_retry_error(method, headers, bool(timings.request_sent), attempt):
+                    raise HTTPRequestError(f"HTTP请求失败: {str(e)}", retries)
+                reason = type(e).__name__
+                status_code = None
+                retry_after = None
+            else:
+                if response.status_code in policy.retry_status_codes:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not policy.should_retry_response(method, headers, response, attempt):
+                    response.timings = timings
+                    response.retries = retries
+                    return response
+                reason = f"HTTP {response.status_code}"
+                status_code = response.status_code
+                retry_after = policy.get_retry_after(response)
+                response.close()
+            finally:
+                stop_recording()
+                if self.rate_limiter is not None:
+                    self.rate_limiter.release(url)
+            
+            attempt += 1
+            delay = retry_after if retry_after is not None else policy.next_delay(delay)
+            retries.append(RetryRecord(attempt, reason, delay, status_code))
+            if deadline is not None and delay >= deadline.remaining():
+                raise deadline.exceeded(retries)
+            time.sleep(delay)
     
     def get(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
         return self.request("GET", endpoint, params=params, **kwargs)
@@ -100,7 +277,9 @@ class HTTPClient:
         return self.request("OPTIONS", endpoint, **kwargs)
     
     def close(self):
-        self.session.close()
+        for prefix, adapter in self.session.adapters.items():
+            if prefix not in self._shared_prefixes:
+                adapter.close()
 
 
 class ResponseWrapper:
@@ -110,17 +289,48 @@ class ResponseWrapper:
         self.headers = response.headers
         self.url = response.url
         self.elapsed = response.elapsed
+        self.timings: Optional[RequestTimings] = getattr(response, "timings", None)
+        self.retries: List[RetryRecord] = getattr(response, "retries", None) or []
+        self.from_cache: bool = getattr(response, "from_cache", False)
+        # 响应体按 bytes -> text -> JSON 逐级解码，每一级只解码一次
+        self._content: Optional[bytes] = None
+        self._text: Optional[str] = None
+        self._json: Any = _UNSET
+        # 由 TestCase 发出的请求关联用例的变量，extract() 可以直接写入
+        self.variables: Optional[Dict[str, Any]] = None
+    
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = self.response.content or b""
+        return self._content
+    
+    @property
+    def body(self) -> memoryview:
+        """原始响应体的只读视图，字节级检查不需要额外拷贝"""
+        return memoryview(self.content)
     
     @property
     def text(self) -> str:
-        return self.response.text
+        if self._text is None:
+            self._text = self.response.text
+        return self._text
     
     @property
     def json(self) -> Any:
-        try:
-            return self.response.json()
-        except json.JSONDecodeError:
+        if self._json is _UNSET:
+            try:
+                encoding = (self.response.encoding or "utf-8").lower().replace("_", "-")
+                if encoding in ("utf-8", "utf8"):
+                    # UTF-8 响应直接从 bytes 解码，省去 text 拷贝
+                    self._json = json_loads(self.content)
+                else:
+                    self._json = json_loads(self.text)
+            except ValueError as e:
+                self._json = e
+        if isinstance(self._json, ValueError):
             raise ValueError("响应内容不是有效的JSON格式")
+        return self._json
     
     def get_header(self, key: str, default: Any = None) -> Any:
         return self.headers.get(key, default)
@@ -128,5 +338,18 @@ class ResponseWrapper:
     def get_cookie(self, name: str) -> Optional[str]:
         return self.response.cookies.get(name)
     
+    def extract(self, path: str, variable: Optional[str] = None, default: Any = MISSING) -> Any:
+        """
+        按路径（core.jsonpath 语法，如 data.fid、data.list[*].fid）从 JSON 响应体取值
+
+        给出 variable 时同时写入所属测试用例的变量；路径不存在且没有给出 default 时抛出 KeyError。
+        """
+        value = compile_path(path).get(self.json, default)
+        if variable is not None:
+            if self.variables is None:
+                raise ValueError("响应没有关联测试用例，无法写入变量")
+            self.variables[variable] = value
+        return value
+    
     def __str__(self) -> str:
         return f"Response(status_code={self.status_code}, url='{self.url}')"
\ No newline at end of file
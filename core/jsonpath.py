@@ -0,0 +1,120 @@
+import functools
+from typing import Any, Callable, List, Tuple, Union
+
+
+# 路径中的通配符，匹配任意下标或键
+WILDCARD = "*"
+PathSegment = Union[str, int]
+# 路径不存在时的返回值，与 JSON 中的 null 区分
+MISSING = object()
+_LOOKUP_ERRORS = (KeyError, IndexError, TypeError)
+
+
+def parse_path(path: str) -> Tuple[PathSegment, ...]:
+    """把 "data.list[*].fid" 解析为 ("data", "list", "*", "fid")，空字符串表示整个文档"""
+    segments: List[PathSegment] = []
+    for part in filter(None, path.split(".")):
+        name, _, rest = part.partition("[")
+        if name:
+            segments.append(name)
+        while rest:
+            index, _, rest = rest.partition("]")
+            segments.append(WILDCARD if index == WILDCARD else int(index))
+            rest = rest[1:] if rest.startswith("[") else rest
+    return tuple(segments)
+
+
+def _compile_lookup(segments: Tuple[PathSegment, ...]) -> Callable[[Any], Any]:
+    """
+    生成与手写下标访问等价的取值函数：document["data"]["list"][0]，路径不存在时返回 MISSING
+
+    键和下标以 repr 形式写入生成的代码（只可能是 str/int），取值时没有逐段的循环开销。
+    """
+    lines = ["def lookup(document):", "    try:", "        value = document"]
+    for segment in segments:
+        if isinstance(segment, int):
+            # 字符串按下标取到的是单个字符，不是 JSON 数组中的元素
+            lines.append("        if isinstance(value, str):")
+            lines.append("            return MISSING")
+            lines.append(f"        value = value[{segment!r}]")
+        else:
+            lines[-1] += f"[{segment!r}]"
+    lines += ["    except _LOOKUP_ERRORS:", "        return MISSING", "    return value"]
+    namespace = {"MISSING": MISSING, "_LOOKUP_ERRORS": _LOOKUP_ERRORS}
+    exec(compile("\n".join(lines), "<jsonpath>", "exec"), namespace)
+    return namespace["lookup"]
+
+
+def _find(value: Any, segments: Tuple[PathSegment, ...], results: List[Any]):
+    """带通配符的路径：按剩余路径收集所有存在的值"""
+    for position, segment in enumerate(segments):
+        if segment == WILDCARD:
+            items = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+            rest = segments[position + 1:]
+            for item in items:
+                _find(item, rest, results)
+            return
+        if isinstance(value, dict) and isinstance(segment, str):
+            if segment not in value:
+                return
+            value = value[segment]
+        elif isinstance(value, list) and isinstance(segment, int) and -len(value) <= segment < len(value):
+            value = value[segment]
+        else:
+            return
+    results.append(value)
+
+
+class JSONPath:
+    """
+    编译后的路径表达式：data.fboxModel.defaultValue、data.list[0].fid、data.list[*].fid
+
+    不含通配符的路径编译为一次性的下标访问，热点循环中可以直接调用 lookup(document)（路径不存在时
+    返回 MISSING）；含通配符的路径的 lookup 返回所有匹配值的列表。
+    """
+
+    __slots__ = ("path", "segments", "wildcard", "lookup")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segments = parse_path(path)
+        self.wildcard = WILDCARD in self.segments
+        self.lookup: Callable[[Any], Any] = self._find_all if self.wildcard else _compile_lookup(self.segments)
+
+    def _find_all(self, document: Any) -> List[Any]:
+        results: List[Any] = []
+        _find(document, self.segments, results)
+        return results
+
+    def find(self, document: Any) -> List[Any]:
+        """所有匹配的值，路径不存在时为空列表"""
+        if self.wildcard:
+            return self._find_all(document)
+        value = self.lookup(document)
+        return [] if value is MISSING else [value]
+
+    def get(self, document: Any, default: Any = MISSING) -> Any:
+        """单个值（含通配符时为匹配值的列表）；路径不存在且没有给出 default 时抛出 KeyError"""
+        value = self.lookup(document)
+        if value is MISSING:
+            if default is MISSING:
+                raise KeyError(f"响应中不存在路径: {self.path}")
+            return default
+        return value
+
+    def exists(self, document: Any) -> bool:
+        value = self.lookup(document)
+        return bool(value) if self.wildcard else value is not MISSING
+
+    def __repr__(self) -> str:
+        return f"JSONPath({self.path!r})"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_path(path: str) -> JSONPath:
+    """编译结果按表达式缓存，同一表达式在所有断言和提取中只编译一次"""
+    return JSONPath(path)
+
+
+def extract(document: Any, path: str, default: Any = MISSING) -> Any:
+    return compile_path(path).get(document, default)
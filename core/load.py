@@ -0,0 +1,590 @@
+import itertools
+import multiprocessing
+import queue
+import random
+import threading
+import time
+import traceback
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union
+from .test_case import TestCase, TestSuite
+from .http_client import HTTPClient
+from .connection_pool import ConnectionPool
+from .sharding import encode_message, decode_message
+from .histogram import LatencyHistogram, PERCENTILES, endpoint_key
+from .slo import LatencySeries, SLOAssertions
+
+
+# 一个压测场景：每次调用返回一个新的测试用例（用例的步骤只执行一次，每轮迭代需要新实例）
+Scenario = Callable[[], TestCase]
+# 压测阶段：(持续秒数, 阶段结束时的虚拟用户数)，阶段内用户数线性变化
+Stage = Tuple[float, int]
+
+
+def build_stages(duration: float, vus: int, ramp_up: float = 0.0) -> List[Stage]:
+    # 没有爬坡时用一个零时长阶段直接达到目标用户数
+    stages = [(min(ramp_up, duration), vus)]
+    if duration > ramp_up:
+        stages.append((duration - ramp_up, vus))
+    return stages
+
+
+def target_vus(stages: List[Stage], elapsed: float) -> int:
+    """elapsed 秒时应处于活动状态的虚拟用户数（从 0 开始按阶段线性插值）"""
+    start_vus = 0
+    for seconds, target in stages:
+        if elapsed < seconds:
+            return int(round(start_vus + (target - start_vus) * elapsed / seconds))
+        elapsed -= seconds
+        start_vus = target
+    return start_vus
+
+
+def arrival_times(stages: List[Tuple[float, float]], share: float = 1.0, offset: float = 0.0):
+    """
+    按阶段到达率 (持续秒数, 每秒迭代数) 生成各次迭代的计划开始时刻（秒），阶段内均匀间隔
+
+    多进程时每个进程取 share 份到达率，offset（0~1）错开各进程的开始时刻。
+    """
+    stage_start = 0.0
+    for seconds, rate in stages:
+        rate *= share
+        if rate > 0:
+            interval = 1.0 / rate
+            k = 0
+            while (k + offset) * interval < seconds:
+                yield stage_start + (k + offset) * interval
+                k += 1
+        stage_start += seconds
+
+
+def empty_snapshot() -> Dict[str, Any]:
+    return {
+        "iterations": 0, "failed_iterations": 0, "dropped_iterations": 0,
+        "total_start_lag": 0.0, "max_start_lag": 0.0, "endpoints": {}
+    }
+
+
+def endpoint_stats(corrected: bool = False) -> Dict[str, Any]:
+    """一个接口的请求数、错误数、延迟和限流排队时间的直方图（纳秒），内存占用与请求数无关"""
+    stats = {"count": 0, "errors": 0, "latency": LatencyHistogram(), "queue_wait": LatencyHistogram()}
+    if corrected:
+        stats["service_latency"] = LatencyHistogram()
+    return stats
+
+
+def merge_snapshot(into: Dict[str, Any], snapshot: Dict[str, Any]):
+    into["iterations"] += snapshot["iterations"]
+    into["failed_iterations"] += snapshot["failed_iterations"]
+    into["dropped_iterations"] += snapshot["dropped_iterations"]
+    into["total_start_lag"] += snapshot["total_start_lag"]
+    into["max_start_lag"] = max(into["max_start_lag"], snapshot["max_start_lag"])
+    for name, stats in snapshot["endpoints"].items():
+        merged = into["endpoints"].get(name)
+        if merged is None:
+            merged = into["endpoints"][name] = endpoint_stats("service_latency" in stats)
+        merged["count"] += stats["count"]
+        merged["errors"] += stats["errors"]
+        merged["latency"].merge(stats["latency"])
+        merged["queue_wait"].merge(stats["queue_wait"])
+        if "service_latency" in stats:
+            merged["service_latency"].merge(stats["service_latency"])
+
+
+def export_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """直方图转为可序列化的快照，用于进程间传递"""
+    exported = dict(snapshot)
+    exported["endpoints"] = {
+        name: {key: value.snapshot() if isinstance(value, LatencyHistogram) else value
+               for key, value in stats.items()}
+        for name, stats in snapshot["endpoints"].items()
+    }
+    return exported
+
+
+def import_snapshot(data: Dict[str, Any]) -> Dict[str, Any]:
+    for stats in data["endpoints"].values():
+        for key in ("latency", "service_latency", "queue_wait"):
+            if key in stats:
+                stats[key] = LatencyHistogram.from_snapshot(stats[key])
+    return data
+
+
+def summarize(snapshot: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+    """按接口统计吞吐、错误率和延迟百分位（毫秒）"""
+    endpoints = {}
+    for name, stats in sorted(snapshot["endpoints"].items()):
+        summary = {
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "error_rate": round(stats["errors"] / stats["count"], 4) if stats["count"] else 0.0,
+            "rps": round(stats["count"] / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        latency = stats["latency"].summary(PERCENTILES)
+        del latency["count"]
+        summary.update(latency)
+        # 在本地限流器中排队的时间单独统计，不计入延迟
+        summary["queue_mean_ms"] = round(stats["queue_wait"].mean / 1e6, 3)
+        summary["queue_max_ms"] = round((stats["queue_wait"].max or 0) / 1e6, 3)
+        if "service_latency" in stats:
+            # 未校正的延迟（从实际发出请求开始计时），与校正后的对比可以看出排队造成的影响
+            service_latency = stats["service_latency"]
+            for q in PERCENTILES:
+                summary[f"service_p{q}_ms"] = round(service_latency.value_at_percentile(q) / 1e6, 3)
+        endpoints[name] = summary
+    requests_count = sum(stats["count"] for stats in endpoints.values())
+    errors = sum(stats["errors"] for stats in endpoints.values())
+    return {
+        "iterations": snapshot["iterations"],
+        "failed_iterations": snapshot["failed_iterations"],
+        "dropped_iterations": snapshot["dropped_iterations"],
+        "mean_start_lag_ms": round(snapshot["total_start_lag"] / snapshot["iterations"] * 1000, 3)
+        if snapshot["iterations"] else 0.0,
+        "max_start_lag_ms": round(snapshot["max_start_lag"] * 1000, 3),
+        "requests": requests_count,
+        "errors": errors,
+        "error_rate": round(errors / requests_count, 4) if requests_count else 0.0,
+        "rps": round(requests_count / elapsed, 1) if elapsed > 0 else 0.0,
+        "endpoints": endpoints
+    }
+
+
+class LoadMetrics:
+    """
+    虚拟用户线程写入、报告线程按时间间隔取走的指标
+
+    请求延迟按接口（方法 + 路径模板）记录在直方图中，长时间压测内存不随请求数增长；
+    在本地限流器中排队的时间不计入延迟，单独记录。
+    corrected=True 时请求延迟加上迭代的启动延迟（实际开始时刻 - 计划开始时刻），
+    同时保留未校正的延迟。
+    """
+
+    def __init__(self, corrected: bool = False):
+        self.corrected = corrected
+        self._lock = threading.Lock()
+        self._current = empty_snapshot()
+
+    def record(self, test_case: TestCase, lag: float = 0.0):
+        samples = []
+        for step in test_case.steps:
+            for request_step in [step] + step.children:
+                if not request_step.is_request or not request_step.executed:
+                    continue
+                # 结果可能已按保留策略替换为 CompactResult，两者都有 status_code
+                status_code = getattr(request_step.result, "status_code", None)
+                error = request_step.error is not None or (status_code is not None and status_code >= 400)
+                samples.append((request_step.endpoint, request_step.service_duration_ns,
+                                request_step.duration_ns - request_step.service_duration_ns, error))
+        lag_ns = int(lag * 1e9)
+        with self._lock:
+            current = self._current
+            current["iterations"] += 1
+            if not test_case.passed:
+                current["failed_iterations"] += 1
+            current["total_start_lag"] += lag
+            if lag > current["max_start_lag"]:
+                current["max_start_lag"] = lag
+            endpoints = current["endpoints"]
+            for name, latency, queue_wait, error in samples:
+                stats = endpoints.get(name)
+                if stats is None:
+                    stats = endpoints[name] = endpoint_stats(self.corrected)
+                stats["count"] += 1
+                stats["errors"] += error
+                stats["latency"].record(latency + lag_ns)
+                stats["queue_wait"].record(queue_wait)
+                if self.corrected:
+                    stats["service_latency"].record(latency)
+
+    def record_failure(self):
+        """场景函数本身抛出异常（没有得到用例）时按失败的迭代计"""
+        with self._lock:
+            self._current["iterations"] += 1
+            self._current["failed_iterations"] += 1
+
+    def record_dropped(self):
+        """到时仍在排队、没有开始执行的迭代"""
+        with self._lock:
+            self._current["dropped_iterations"] += 1
+
+    def drain(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot, self._current = self._current, empty_snapshot()
+        return snapshot
+
+
+class LoadResult:
+    def __init__(self, name: str, vus: int, stages: List[Stage], processes: int = 1,
+                 executor: str = "ramping-vus", trust_env: bool = True):
+        self.name = name
+        self.executor = executor
+        self.trust_env = trust_env
+        self.vus = vus
+        self.stages = stages
+        self.processes = processes
+        self.totals = empty_snapshot()
+        self.timeline: List[Dict[str, Any]] = []
+        self.duration = 0.0
+
+    def add_interval(self, snapshot: Dict[str, Any], elapsed: float, interval: Optional[float],
+                     active_vus: int) -> Optional[Dict[str, Any]]:
+        """interval 为 None 表示到时后才结束的迭代，只计入总计，不单独作为一个报告间隔"""
+        merge_snapshot(self.totals, snapshot)
+        if interval is None:
+            return None
+        report = summarize(snapshot, interval)
+        report["elapsed"] = round(elapsed, 3)
+        report["active_vus"] = active_vus
+        self.timeline.append(report)
+        return report
+
+    def summary(self) -> Dict[str, Any]:
+        return summarize(self.totals, self.duration)
+
+    def latency_series(self, endpoint: Optional[str] = None, corrected: bool = True) -> LatencySeries:
+        """
+        整个压测的样本序列，endpoint 为 None 时合并所有接口
+
+        corrected=False 时使用未校正的延迟（只有 ArrivalRateTest 区分两者）。
+        """
+        if endpoint is not None:
+            endpoint = endpoint_key(*endpoint.split(" ", 1))
+            if endpoint not in self.totals["endpoints"]:
+                raise ValueError(f"压测结果中没有接口: {endpoint}")
+        series = LatencySeries(endpoint or self.name, self.duration)
+        for name, stats in self.totals["endpoints"].items():
+            if endpoint is not None and name != endpoint:
+                continue
+            latency = stats["latency"] if corrected else stats.get("service_latency", stats["latency"])
+            series.latency.merge(latency)
+            series.count += stats["count"]
+            series.errors += stats["errors"]
+        return series
+
+    def slo(self, endpoint: Optional[str] = None, corrected: bool = True) -> SLOAssertions:
+        """压测结束后的 SLO 断言，如 result.slo().p99_less_than(500).error_rate_below(0.01)"""
+        return SLOAssertions(self.latency_series(endpoint, corrected))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.summary()
+        result.update({
+            "name": self.name,
+            "executor": self.executor,
+            "vus": self.vus,
+            "processes": self.processes,
+            "trust_env": self.trust_env,
+            "stages": [list(stage) for stage in self.stages],
+            "duration": round(self.duration, 3),
+            "timeline": self.timeline
+        })
+        return result
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """实时报告的一行摘要：活动用户数、吞吐、错误率和整体延迟百分位"""
+    latencies = [stats for stats in report["endpoints"].values() if stats["count"]]
+    worst = max(latencies, key=lambda s: s["p99_ms"]) if latencies else None
+    line = (f"[{report['elapsed']:7.1f}s] VU {report['active_vus']:4d} | "
+            f"{report['rps']:8.1f} req/s | 错误率 {report['error_rate'] * 100:5.1f}%")
+    if worst is not None:
+        line += f" | p50 {worst['p50_ms']:.1f}ms p90 {worst['p90_ms']:.1f}ms p99 {worst['p99_ms']:.1f}ms"
+    queue_max = max((stats["queue_max_ms"] for stats in latencies), default=0.0)
+    if queue_max >= 1:
+        line += f" | 限流排队 max {queue_max:.1f}ms"
+    if report["max_start_lag_ms"] >= 1:
+        line += f" | 启动延迟 max {report['max_start_lag_ms']:.1f}ms"
+    if report["dropped_iterations"]:
+        line += f" | 丢弃 {report['dropped_iterations']}"
+    return line
+
+
+class LoadTest:
+    """
+    压测模式：把功能测试用例作为虚拟用户场景反复执行
+
+    每个虚拟用户是一个线程，循环地创建场景用例、执行、等待思考时间；同一时刻活动的用户数
+    由 stages（或 vus + ramp_up）决定。请求步骤的耗时按接口（方法 + 路径模板）记入直方图，每隔
+    report_interval 秒输出一次实时吞吐、错误率和 p50/p90/p99 延迟。
+    client="async" 时所有用户共享一个事件循环和连接器，"sync" 时共享 HTTPClient 连接池。
+    trust_env=False 时 sync 客户端不读取环境变量中的代理/netrc/CA 配置，这部分查找是单请求 CPU 开销的大头。
+    processes > 1 时虚拟用户分布到多个进程执行，场景函数需要能被 pickle（模块级函数或 partial）。
+    """
+
+    executor = "ramping-vus"
+
+    def __init__(self, scenarios: Union[Scenario, List[Scenario]], vus: int = 10, duration: float = 30.0,
+                 ramp_up: float = 0.0, stages: Optional[List[Stage]] = None,
+                 think_time: Union[float, Tuple[float, float]] = 0.0, client: str = "async",
+                 processes: int = 1, report_interval: float = 1.0,
+                 on_report: Optional[Callable[[Dict[str, Any]], None]] = None, name: str = "load",
+                 trust_env: bool = True):
+        if client not in ("async", "sync"):
+            raise ValueError(f"不支持的客户端类型: {client}")
+        self.scenarios = scenarios if isinstance(scenarios, list) else [scenarios]
+        self.stages = list(stages) if stages else build_stages(duration, vus, ramp_up)
+        self.vus = max(target for _, target in self.stages)
+        self.duration = sum(seconds for seconds, _ in self.stages)
+        self.think_time = think_time
+        self.client = client
+        self.trust_env = trust_env
+        self.processes = max(1, min(processes, self.vus))
+        self.report_interval = report_interval
+        self.on_report = on_report
+        self.name = name
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 子进程只通过队列发回指标，不需要 on_report（常为 lambda，不能被 pickle）
+        state = self.__dict__.copy()
+        state["on_report"] = None
+        return state
+
+    def _report(self, report: Optional[Dict[str, Any]]):
+        if report is None:
+            return
+        if self.on_report is not None:
+            self.on_report(report)
+        else:
+            print(format_report(report))
+
+    def _think(self):
+        if isinstance(self.think_time, (tuple, list)):
+            delay = random.uniform(*self.think_time)
+        else:
+            delay = self.think_time
+        if delay > 0:
+            time.sleep(delay)
+
+    def _create_suite(self, vus: int) -> TestSuite:
+        if self.client == "async":
+            suite = TestSuite(self.name)
+            suite.use_async_client(limit=max(vus, 1), limit_per_host=max(vus, 1))
+        else:
+            suite = TestSuite(self.name, ConnectionPool(pool_maxsize=max(vus, 1)))
+        return suite
+
+    def _run_iteration(self, iteration: int, suite: TestSuite, metrics: LoadMetrics, lag: float = 0.0):
+        try:
+            test_case = self.scenarios[iteration % len(self.scenarios)]()
+        except Exception:
+            metrics.record_failure()
+            return
+        if not self.trust_env and isinstance(test_case.client, HTTPClient):
+            test_case.client.session.trust_env = False
+        suite.attach(test_case)
+        test_case.run()
+        metrics.record(test_case, lag)
+
+    def _virtual_user(self, index: int, suite: TestSuite, metrics: LoadMetrics, clock_start: float,
+                      stop: threading.Event):
+        iteration = index
+        while not stop.is_set():
+            elapsed = time.perf_counter() - clock_start
+            if elapsed >= self.duration:
+                break
+            if index >= target_vus(self.stages, elapsed):
+                stop.wait(0.05)
+                continue
+            self._run_iteration(iteration, suite, metrics)
+            iteration += 1
+            self._think()
+
+    def _user_indices(self, process_id: int) -> List[int]:
+        """虚拟用户按下标轮流分配到各进程"""
+        return list(range(process_id, self.vus, self.processes))
+
+    def _create_workers(self, process_id: int, suite: TestSuite, metrics: LoadMetrics, clock_start: float,
+                        stop: threading.Event) -> List[threading.Thread]:
+        return [
+            threading.Thread(target=self._virtual_user, args=(index, suite, metrics, clock_start, stop),
+                             name=f"{self.name}-vu{index}", daemon=True)
+            for index in self._user_indices(process_id)
+        ]
+
+    def _active_users(self, process_id: int, elapsed: float) -> int:
+        target = target_vus(self.stages, elapsed)
+        return sum(1 for index in self._user_indices(process_id) if index < target)
+
+    def _create_metrics(self) -> LoadMetrics:
+        return LoadMetrics()
+
+    def _run_users(self, process_id: int, on_interval: Callable[[Dict[str, Any], float, Optional[float], int], None],
+                   clock_start: Optional[float] = None):
+        """在当前进程中运行分到的虚拟用户，每个报告间隔把取走的指标交给 on_interval"""
+        clock_start = clock_start if clock_start is not None else time.perf_counter()
+        suite = self._create_suite(len(self._user_indices(process_id)))
+        metrics = self._create_metrics()
+        stop = threading.Event()
+        threads = self._create_workers(process_id, suite, metrics, clock_start, stop)
+        for thread in threads:
+            thread.start()
+
+        last = clock_start
+        try:
+            while True:
+                now = time.perf_counter()
+                elapsed = now - clock_start
+                if elapsed >= self.duration:
+                    break
+                time.sleep(max(min(last + self.report_interval, clock_start + self.duration) - now, 0.0))
+                now = time.perf_counter()
+                on_interval(metrics.drain(), now - clock_start, now - last,
+                            self._active_users(process_id, now - clock_start))
+                last = now
+        finally:
+            # 到时后不再开始新的迭代，等待正在执行的迭代结束并计入总计
+            stop.set()
+            for thread in threads:
+                thread.join()
+            tail = metrics.drain()
+            if tail["iterations"] or tail["dropped_iterations"]:
+                on_interval(tail, time.perf_counter() - clock_start, None, 0)
+            suite.close()
+
+    def run(self) -> LoadResult:
+        result = LoadResult(self.name, self.vus, self.stages, self.processes, self.executor, self.trust_env)
+        start = time.perf_counter()
+
+        def on_interval(snapshot, elapsed, interval, active_vus):
+            self._report(result.add_interval(snapshot, elapsed, interval, active_vus))
+
+        if self.processes > 1:
+            self._run_processes(result)
+        else:
+            self._run_users(0, on_interval, start)
+        result.duration = time.perf_counter() - start
+        return result
+
+    def _run_processes(self, result: LoadResult):
+        """虚拟用户按下标轮流分配到各进程；子进程按间隔发回指标，主进程合并后输出实时报告"""
+        channel = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_load_worker, args=(self, process_id, channel), daemon=True)
+            for process_id in range(self.processes)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        pending = set(range(len(processes)))
+        interval = empty_snapshot()
+        active: Dict[int, int] = {}
+        last = start
+        while pending:
+            try:
+                kind, process_id, payload = channel.get(timeout=min(self.report_interval, 1.0))
+            except queue.Empty:
+                for process_id in list(pending):
+                    if not processes[process_id].is_alive():
+                        pending.discard(process_id)
+                kind = None
+            if kind == "interval":
+                snapshot = import_snapshot(decode_message(payload))
+                active[process_id] = snapshot.pop("active_vus")
+                merge_snapshot(interval, snapshot)
+            elif kind == "tail":
+                snapshot = import_snapshot(decode_message(payload))
+                snapshot.pop("active_vus")
+                result.add_interval(snapshot, time.perf_counter() - start, None, 0)
+            elif kind == "done":
+                pending.discard(process_id)
+            elif kind == "error":
+                pending.discard(process_id)
+                print(f"错误: 压测进程 {process_id} 执行失败\n{decode_message(payload)}")
+            now = time.perf_counter()
+            if not pending:
+                # 最后不足一个间隔的指标只计入总计
+                result.add_interval(interval, now - start, None, 0)
+            elif now - last >= self.report_interval:
+                self._report(result.add_interval(interval, now - start, now - last, sum(active.values())))
+                interval = empty_snapshot()
+                last = now
+        for process in processes:
+            process.join()
+
+
+class ArrivalRateTest(LoadTest):
+    """
+    开放模型压测：按到达率（每秒开始的迭代数）调度场景，与响应快慢无关
+
+    stages 为 [(持续秒数, 每秒迭代数)]，阶段内到达率不变（阶梯式），不指定时在 duration 内保持 rate。
+    调度线程按计划时刻把迭代放入队列，最多 max_vus 个工作线程执行；服务端变慢、工作线程都在忙时
+    迭代在队列中等待，请求延迟从迭代的计划开始时刻算起（校正协调遗漏），结果中同时给出未校正的
+    service_p50/p90/p99。到时仍未开始的迭代记为丢弃，不再执行。
+    """
+
+    executor = "arrival-rate"
+
+    def __init__(self, scenarios: Union[Scenario, List[Scenario]], rate: float = 10.0, duration: float = 30.0,
+                 stages: Optional[List[Tuple[float, float]]] = None, max_vus: int = 100, client: str = "async",
+                 processes: int = 1, report_interval: float = 1.0,
+                 on_report: Optional[Callable[[Dict[str, Any]], None]] = None, name: str = "arrival",
+                 trust_env: bool = True):
+        super().__init__(scenarios, vus=max_vus, duration=duration, client=client, processes=processes,
+                         report_interval=report_interval, on_report=on_report, name=name, trust_env=trust_env)
+        self.stages = list(stages) if stages else [(duration, rate)]
+        self.duration = sum(seconds for seconds, _ in self.stages)
+        self._busy = 0
+        # 锁不能被 pickle，在执行虚拟用户的进程中创建（见 _create_workers）
+        self._busy_lock: Optional[threading.Lock] = None
+
+    def _create_metrics(self) -> LoadMetrics:
+        return LoadMetrics(corrected=True)
+
+    def _active_users(self, process_id: int, elapsed: float) -> int:
+        return self._busy
+
+    def _create_workers(self, process_id: int, suite: TestSuite, metrics: LoadMetrics, clock_start: float,
+                        stop: threading.Event) -> List[threading.Thread]:
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        backlog: queue.Queue = queue.Queue()
+        iterations = itertools.count(process_id)
+        workers = [
+            threading.Thread(target=self._worker, args=(suite, metrics, backlog, iterations, stop),
+                             name=f"{self.name}-vu{index}", daemon=True)
+            for index in self._user_indices(process_id)
+        ]
+        dispatcher = threading.Thread(target=self._dispatch,
+                                      args=(process_id, backlog, clock_start, stop, len(workers)),
+                                      name=f"{self.name}-dispatcher", daemon=True)
+        return workers + [dispatcher]
+
+    def _dispatch(self, process_id: int, backlog: queue.Queue, clock_start: float, stop: threading.Event,
+                  workers: int):
+        try:
+            for planned in arrival_times(self.stages, 1.0 / self.processes, process_id / self.processes):
+                delay = clock_start + planned - time.perf_counter()
+                if (delay > 0 and stop.wait(delay)) or stop.is_set():
+                    break
+                backlog.put(clock_start + planned)
+        finally:
+            for _ in range(workers):
+                backlog.put(None)
+
+    def _worker(self, suite: TestSuite, metrics: LoadMetrics, backlog: queue.Queue, iterations, stop: threading.Event):
+        while True:
+            planned = backlog.get()
+            if planned is None:
+                return
+            if stop.is_set():
+                metrics.record_dropped()
+                continue
+            with self._busy_lock:
+                self._busy += 1
+            try:
+                self._run_iteration(next(iterations), suite, metrics, max(time.perf_counter() - planned, 0.0))
+            finally:
+                with self._busy_lock:
+                    self._busy -= 1
+
+
+def _load_worker(load_test: LoadTest, process_id: int, channel):
+    try:
+        def on_interval(snapshot, elapsed, interval, active_vus):
+            message = export_snapshot(snapshot)
+            message["active_vus"] = active_vus
+            channel.put(("interval" if interval is not None else "tail", process_id, encode_message(message)))
+
+        load_test._run_users(process_id, on_interval)
+        channel.put(("done", process_id, None))
+    except Exception:
+        channel.put(("error", process_id, encode_message(traceback.format_exc())))
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """令牌桶：按 rate 每秒补充令牌，最多积累 burst 个；预约式取令牌，线程和协程都可以安全使用"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数（令牌可以透支，等待时间按透支量计算）"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class ConcurrencyLimiter:
+    """限制同时在途的请求数，空闲名额按等待顺序直接移交给下一个等待者"""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event.set)
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+
+            def wake():
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+            self._waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                handed_over = wake not in self._waiters
+                if not handed_over:
+                    self._waiters.remove(wake)
+            if handed_over:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                wake = self._waiters.popleft()
+            else:
+                self.in_flight -= 1
+                return
+        wake()
+
+
+# 小于该值的等待视为未排队（获取锁本身的开销）
+QUEUED_THRESHOLD = 0.0005
+
+
+class HostLimit:
+    def __init__(self, rps: Optional[float] = None, burst: int = 1, max_in_flight: Optional[int] = None):
+        self.bucket = TokenBucket(rps, burst) if rps else None
+        self.concurrency = ConcurrencyLimiter(max_in_flight) if max_in_flight else None
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, wait: float):
+        with self._lock:
+            self.requests += 1
+            if wait > QUEUED_THRESHOLD:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "avg_wait_ms": round(self.total_wait / self.requests * 1000, 3) if self.requests else 0.0,
+                "in_flight": self.concurrency.in_flight if self.concurrency else None
+            }
+
+
+class RateLimiter:
+    """
+    按主机限流：每秒请求数（令牌桶）+ 最大在途请求数，可以在线程和 asyncio 任务之间共享
+
+    排队等待时间单独统计并写入 RequestTimings.queue_wait，不计入服务端耗时。
+    """
+
+    def __init__(self):
+        self._hosts: Dict[str, HostLimit] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environments(cls, environments: Dict[str, Any], share: int = 1) -> 'RateLimiter':
+        """
+        根据 config.yaml 中各环境的 rate_limit 配置创建限流器
+
+        多个进程分别创建限流器时传入 share=进程数，每个进程按比例分得速率和在途名额。
+        """
+        limiter = cls()
+        for env_config in (environments or {}).values():
+            rate_limit = (env_config or {}).get('rate_limit')
+            base_url = (env_config or {}).get('base_url')
+            if rate_limit and base_url:
+                rps = rate_limit.get('rps')
+                max_in_flight = rate_limit.get('max_in_flight')
+                limiter.set_limit(
+                    base_url,
+                    rps=rps / share if rps else None,
+                    burst=max(rate_limit.get('burst', 1) // share, 1),
+                    max_in_flight=max(max_in_flight // share, 1) if max_in_flight else None
+                )
+        return limiter
+
+    @staticmethod
+    def _host_of(url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def set_limit(self, url_or_host: str, rps: Optional[float] = None, burst: int = 1,
+                  max_in_flight: Optional[int] = None):
+        host = self._host_of(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        with self._lock:
+            self._hosts[host] = HostLimit(rps, burst, max_in_flight)
+
+    def _limit_for(self, url: str) -> Optional[HostLimit]:
+        return self._hosts.get(self._host_of(url))
+
+    def acquire(self, url: str) -> float:
+        """阻塞直到允许发出请求，返回排队等待的秒数"""
+        limit = self._limit_for(url)
+        if limit is None:
+            return 0.0
+        start = time.perf_counter()
+        if limit.concurrency is not None:
+            limit.concurrency.acquire()
+        if limit.bucket is not None:
+            delay = limit.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+        wait = time.perf_counter() - start
+        limit.record_wait(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        limit = self._limit_for(url)
+        if limit is None:
+            return 0.0
+        start = time.perf_counter()
+        if limit.concurrency is not None:
+            await limit.concurrency.acquire_async()
+        if limit.bucket is not None:
+            delay = limit.bucket.reserve()
+            if delay > 0:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    if limit.concurrency is not None:
+                        limit.concurrency.release()
+                    raise
+        wait = time.perf_counter() - start
+        limit.record_wait(wait)
+        return wait
+
+    def release(self, url: str):
+        limit = self._limit_for(url)
+        if limit is not None and limit.concurrency is not None:
+            limit.concurrency.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limit.stats() for host, limit in hosts.items()}
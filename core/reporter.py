@@ -6,25 +6,8 @@ from typing import Dict, Any, List
 from jinja2 import Template
 
 
-class HTMLReporter:
-    def __init__(self, output_dir: str = "reports"):
-        self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
-    
-    def generate_report(self, test_results: Dict[str, Any]) -> str:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"test_report_{timestamp}.html"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        # HTML模板
-        html_template = """
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>API测试报告 - {{ suite_name }}</title>
-    <style>
+# 功能测试报告和压测报告共用的样式
+_STYLES = """
         body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }
         .container { max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
         .header { text-align: center; margin-bottom: 30px; border-bottom: 2px solid #eee; padding-bottom: 20px; }
@@ -36,15 +19,39 @@ class HTMLReporter:
         .test-case-header { background: #f8f9fa; padding: 15px; cursor: pointer; display: flex; justify-content: between; align-items: center; }
         .test-case-header.passed { background: #d4edda; }
         .test-case-header.failed { background: #f8d7da; }
+        .test-case-header.timed_out { background: #fff3cd; }
         .test-case-content { padding: 0; max-height: 0; overflow: hidden; transition: max-height 0.3s ease; }
         .test-case-content.expanded { max-height: 1000px; padding: 15px; }
         .step { margin-bottom: 10px; padding: 10px; border-left: 4px solid #007bff; background: #f8f9fa; }
         .step.passed { border-left-color: #28a745; }
         .step.failed { border-left-color: #dc3545; }
+        .step.timed_out { border-left-color: #ffc107; }
         .timestamp { color: #6c757d; font-size: 0.9em; }
         .duration { color: #6c757d; font-size: 0.9em; }
+        .timings { color: #495057; font-size: 0.85em; margin-top: 5px; }
         .error { background: #f8d7da; color: #721c24; padding: 10px; border-radius: 4px; margin-top: 10px; }
-    </style>
+"""
+
+
+class HTMLReporter:
+    def __init__(self, output_dir: str = "reports"):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def generate_report(self, test_results: Dict[str, Any]) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"test_report_{timestamp}.html"
+        filepath = os.path.join(self.output_dir, filename)
+        
+        # HTML模板
+        html_template = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>API测试报告 - {{ suite_name }}</title>
+    <style>{{ styles }}</style>
 </head>
 <body>
     <div class="container">
@@ -62,6 +69,12 @@ class HTMLReporter:
                 <h3>失败用例</h3>
                 <p style="font-size: 2em; font-weight: bold;">{{ failed_cases }}</p>
             </div>
+            {% if timed_out_cases > 0 %}
+            <div class="summary-card" style="background: #fff3cd; color: #856404;">
+                <h3>超时用例</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ timed_out_cases }}</p>
+            </div>
+            {% endif %}
             <div class="summary-card">
                 <h3>总用例数</h3>
                 <p style="font-size: 2em; font-weight: bold;">{{ total_cases }}</p>
@@ -74,12 +87,46 @@ class HTMLReporter:
                 <h3>通过率</h3>
                 <p style="font-size: 2em; font-weight: bold;">{{ "%.1f"|format(passed_rate) }}%</p>
             </div>
+            {% if parallel and parallel.workers > 1 %}
+            <div class="summary-card">
+                <h3>并行加速比</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ "%.2f"|format(parallel.speedup) }}x</p>
+            </div>
+            {% endif %}
         </div>
         
+        {% if parallel and parallel.workers > 1 %}
+        <h2>并行执行</h2>
+        <p class="timings">
+            工作线程: {{ parallel.workers }} | 墙钟时间: {{ "%.2f"|format(parallel.wall_time) }}s |
+            用例耗时合计: {{ "%.2f"|format(parallel.case_time) }}s
+        </p>
+        {% for name, worker in parallel.worker_busy.items() %}
+        <div class="timings">{{ name }}: {{ worker.cases }} 个用例, 忙碌 {{ "%.2f"|format(worker.busy_time) }}s ({{ "%.0f"|format(worker.utilization * 100) }}%)</div>
+        {% endfor %}
+        {% endif %}
+        
+        {% if latency %}
+        <h2>接口延迟</h2>
+        <table style="width: 100%; border-collapse: collapse; margin-bottom: 30px;" class="timings">
+            <tr style="text-align: left; border-bottom: 1px solid #ddd;">
+                <th>接口</th><th>请求数</th><th>平均</th><th>p50</th><th>p90</th><th>p99</th><th>最大</th>
+            </tr>
+            {% for endpoint, stats in latency.items() %}
+            <tr>
+                <td>{{ endpoint }}</td><td>{{ stats.count }}</td>
+                <td>{{ "%.1f"|format(stats.mean_ms) }}ms</td><td>{{ "%.1f"|format(stats.p50_ms) }}ms</td>
+                <td>{{ "%.1f"|format(stats.p90_ms) }}ms</td><td>{{ "%.1f"|format(stats.p99_ms) }}ms</td>
+                <td>{{ "%.1f"|format(stats.max_ms) }}ms</td>
+            </tr>
+            {% endfor %}
+        </table>
+        {% endif %}
+        
         <h2>测试用例详情</h2>
         {% for result in results %}
         <div class="test-case">
-            <div class="test-case-header {{ 'passed' if result.passed else 'failed' }}" onclick="toggleTestCase({{ loop.index0 }})">
+            <div class="test-case-header {{ 'passed' if result.passed else 'timed_out' if result.timed_out else 'failed' }}" onclick="toggleTestCase({{ loop.index0 }})">
                 <div>
                     <h3 style="margin: 0;">{{ result.name }}</h3>
                     <p style="margin: 5px 0 0 0;" class="duration">
@@ -87,15 +134,52 @@ class HTMLReporter:
                         步骤: {{ result.steps_passed }}/{{ result.steps_total }}
                     </p>
                 </div>
-                <span style="font-size: 1.5em;">{{ '✅' if result.passed else '❌' }}</span>
+                <span style="font-size: 1.5em;">{{ '✅' if result.passed else '⏱' if result.timed_out else '❌' }}</span>
             </div>
             <div class="test-case-content" id="test-case-{{ loop.index0 }}">
                 {% if result.error %}
                 <div class="error">
-                    <strong>错误信息:</strong><br>
+                    <strong>{{ '超出时间预算:' if result.timed_out else '错误信息:' }}</strong><br>
                     {{ result.error }}
                 </div>
                 {% endif %}
+                {% if result.critical_path and result.critical_path.duration < result.critical_path.serial_duration %}
+                <div class="timings">
+                    关键路径 {{ "%.3f"|format(result.critical_path.duration) }}s
+                    (顺序执行需 {{ "%.3f"|format(result.critical_path.serial_duration) }}s):
+                    {{ result.critical_path.steps|join(' → ') }}
+                </div>
+                {% endif %}
+                {% for step in result.steps %}
+                <div class="step {{ 'passed' if step.passed else 'timed_out' if step.status == 'timed_out' else 'failed' }}"{% if step.parent %} style="margin-left: 24px;"{% endif %}>
+                    <strong>{{ step.name }}</strong>
+                    {% if step.status == 'planned' %}<span class="duration">(未执行)</span>{% endif %}
+                    {% if step.status == 'timed_out' %}<span class="duration">(超时)</span>{% endif %}
+                    <span class="duration">{{ "%.3f"|format(step.duration) }}s</span>
+                    {% if step.timings %}
+                    <div class="timings">
+                        DNS {{ step.timings.dns_ms }}ms |
+                        建连 {{ step.timings.connect_ms }}ms |
+                        TLS {{ step.timings.tls_ms }}ms |
+                        首字节 {{ step.timings.ttfb_ms }}ms |
+                        传输 {{ step.timings.transfer_ms }}ms |
+                        {% if step.timings.queue_ms %}限流排队 {{ step.timings.queue_ms }}ms |{% endif %}
+                        发送 {{ step.timings.bytes_sent }}B |
+                        接收 {{ step.timings.bytes_received }}B
+                        {{ '(新建连接)' if step.timings.new_connection else '(复用连接)' }}
+                    </div>
+                    {% endif %}
+                    {% if step.retries %}
+                    <div class="timings">
+                        重试 {{ step.retries|length }} 次, 等待 {{ "%.3f"|format(step.retry_time) }}s:
+                        {% for retry in step.retries %}{{ retry.reason }}{{ ', ' if not loop.last }}{% endfor %}
+                    </div>
+                    {% endif %}
+                    {% if step.error %}
+                    <div class="error">{{ step.error }}</div>
+                    {% endif %}
+                </div>
+                {% endfor %}
             </div>
         </div>
         {% endfor %}
@@ -119,14 +203,19 @@ class HTMLReporter:
         # 渲染模板
         template = Template(html_template)
         html_content = template.render(
+            styles=_STYLES,
             suite_name=test_results["suite_name"],
             generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             total_cases=total_cases,
             passed_cases=passed_cases,
             failed_cases=test_results["failed_cases"],
+            # 超时用例包含在失败用例中，单独展示
+            timed_out_cases=sum(1 for result in test_results["results"] if result.get("timed_out")),
             duration=test_results["duration"],
             passed_rate=passed_rate,
-            results=test_results["results"]
+            results=test_results["results"],
+            parallel=test_results.get("parallel"),
+            latency=test_results.get("latency")
         )
         
         # 写入文件
@@ -134,6 +223,116 @@ class HTMLReporter:
             f.write(html_content)
         
         return filepath
+    
+    def generate_load_report(self, load_result: Dict[str, Any]) -> str:
+        """压测结果（LoadResult.to_dict()）：总体吞吐和错误率、各接口延迟百分位、按报告间隔的时间线"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"load_report_{timestamp}.html"
+        filepath = os.path.join(self.output_dir, filename)
+        
+        html_template = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>压测报告 - {{ result.name }}</title>
+    <style>{{ styles }}</style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>压测报告</h1>
+            <p class="timestamp">生成时间: {{ generation_time }}</p>
+            <p class="timings">
+                {{ result.name }} | {{ result.executor }} | 虚拟用户 {{ result.vus }} | 进程 {{ result.processes }} |
+                持续 {{ "%.1f"|format(result.duration) }}s
+            </p>
+        </div>
+        
+        <div class="summary">
+            <div class="summary-card {{ 'failed' if result.failed_iterations else 'passed' }}">
+                <h3>迭代</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ result.iterations }}</p>
+                <p class="duration">失败 {{ result.failed_iterations }} | 丢弃 {{ result.dropped_iterations }}</p>
+            </div>
+            <div class="summary-card">
+                <h3>请求数</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ result.requests }}</p>
+            </div>
+            <div class="summary-card">
+                <h3>吞吐</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ "%.1f"|format(result.rps) }} req/s</p>
+            </div>
+            <div class="summary-card {{ 'failed' if result.errors else 'passed' }}">
+                <h3>错误率</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ "%.2f"|format(result.error_rate * 100) }}%</p>
+                <p class="duration">{{ result.errors }} / {{ result.requests }}</p>
+            </div>
+            {% if result.max_start_lag_ms >= 1 %}
+            <div class="summary-card">
+                <h3>启动延迟</h3>
+                <p style="font-size: 2em; font-weight: bold;">{{ "%.1f"|format(result.max_start_lag_ms) }}ms</p>
+                <p class="duration">平均 {{ "%.1f"|format(result.mean_start_lag_ms) }}ms</p>
+            </div>
+            {% endif %}
+        </div>
+        
+        <h2>接口统计</h2>
+        <table style="width: 100%; border-collapse: collapse; margin-bottom: 30px;" class="timings">
+            <tr style="text-align: left; border-bottom: 1px solid #ddd;">
+                <th>接口</th><th>请求数</th><th>吞吐</th><th>错误</th><th>平均</th><th>p50</th><th>p90</th><th>p99</th><th>最大</th><th>限流排队</th>
+            </tr>
+            {% for endpoint, stats in result.endpoints.items() %}
+            <tr>
+                <td>{{ endpoint }}</td><td>{{ stats.count }}</td><td>{{ "%.1f"|format(stats.rps) }} req/s</td>
+                <td>{{ stats.errors }} ({{ "%.2f"|format(stats.error_rate * 100) }}%)</td>
+                <td>{{ "%.1f"|format(stats.mean_ms) }}ms</td><td>{{ "%.1f"|format(stats.p50_ms) }}ms</td>
+                <td>{{ "%.1f"|format(stats.p90_ms) }}ms</td><td>{{ "%.1f"|format(stats.p99_ms) }}ms</td>
+                <td>{{ "%.1f"|format(stats.max_ms) }}ms</td><td>max {{ "%.1f"|format(stats.queue_max_ms) }}ms</td>
+            </tr>
+            {% if stats.service_p99_ms is defined %}
+            <tr class="duration">
+                <td style="padding-left: 24px;">未校正</td><td></td><td></td><td></td><td></td>
+                <td>{{ "%.1f"|format(stats.service_p50_ms) }}ms</td><td>{{ "%.1f"|format(stats.service_p90_ms) }}ms</td>
+                <td>{{ "%.1f"|format(stats.service_p99_ms) }}ms</td><td></td><td></td>
+            </tr>
+            {% endif %}
+            {% endfor %}
+        </table>
+        
+        {% if result.timeline %}
+        <h2>时间线</h2>
+        <table style="width: 100%; border-collapse: collapse;" class="timings">
+            <tr style="text-align: left; border-bottom: 1px solid #ddd;">
+                <th>时刻</th><th>活动用户</th><th>迭代</th><th>吞吐</th><th>错误率</th><th>最慢接口 p99</th><th>丢弃</th>
+            </tr>
+            {% for report in result.timeline %}
+            <tr>
+                <td>{{ "%.1f"|format(report.elapsed) }}s</td><td>{{ report.active_vus }}</td><td>{{ report.iterations }}</td>
+                <td>{{ "%.1f"|format(report.rps) }} req/s</td><td>{{ "%.2f"|format(report.error_rate * 100) }}%</td>
+                <td>{{ "%.1f"|format((report.endpoints.values()|map(attribute='p99_ms')|list or [0])|max) }}ms</td>
+                <td>{{ report.dropped_iterations }}</td>
+            </tr>
+            {% endfor %}
+        </table>
+        {% endif %}
+    </div>
+</body>
+</html>
+        """
+        
+        template = Template(html_template)
+        html_content = template.render(
+            styles=_STYLES,
+            generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            result=load_result
+        )
+        
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(html_content)
+        
+        return filepath
 
 
 class JSONReporter:
@@ -167,4 +366,11 @@ class Reporter:
         return {
             "html": self.html_reporter.generate_report(test_results),
             "json": self.json_reporter.generate_report(test_results)
-        }
\ No newline at end of file
+        }
+    
+    def generate_load_reports(self, load_result: Dict[str, Any]) -> Dict[str, str]:
+        """压测结果的 HTML 和 JSON 报告"""
+        return {
+            "html": self.html_reporter.generate_load_report(load_result),
+            "json": self.json_reporter.generate_report(load_result)
+        }
@@ -0,0 +1,109 @@
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+from .http_client import ResponseWrapper
+from .streaming import StreamingResponseWrapper
+from .retry import RetryRecord
+from .timing import RequestTimings, service_duration_ns
+
+
+# 步骤结果保留策略
+KEEP_ALL = "all"            # 保留完整的响应对象（默认）
+KEEP_FAILURES = "failures"  # 只有失败的用例保留完整结果，通过的用例只保留步骤状态和耗时
+COMPACT = "compact"         # 所有用例都只保留紧凑摘要：状态码、耗时、响应体大小和哈希
+POLICIES = (KEEP_ALL, KEEP_FAILURES, COMPACT)
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class CompactResult:
+    """响应的紧凑摘要，不持有响应对象和响应体"""
+
+    __slots__ = ("status_code", "url", "size", "body_hash")
+
+    def __init__(self, status_code: int, url: str, size: int, body_hash: Optional[str]):
+        self.status_code = status_code
+        self.url = url
+        self.size = size
+        self.body_hash = body_hash
+
+    @classmethod
+    def from_result(cls, result: Any) -> Optional['CompactResult']:
+        if isinstance(result, ResponseWrapper):
+            content = result.content
+            return cls(result.status_code, result.url, len(content), body_hash(content))
+        if isinstance(result, StreamingResponseWrapper):
+            # 流式响应体边读边丢弃，只记录读取的字节数
+            return cls(result.status_code, result.url, result.bytes_read, None)
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status_code": self.status_code, "url": self.url, "size": self.size, "body_hash": self.body_hash}
+
+
+class CompactStep:
+    """
+    已执行步骤的紧凑记录，与 TestStep 的报告字段相同
+
+    不保留步骤函数、响应对象和异常（异常只保留消息），长时间运行时内存占用不随响应体增长。
+    """
+
+    __slots__ = ("name", "status", "sequence", "started_at", "finished_at", "duration_ns", "requires", "provides",
+                 "endpoint", "timings", "retries", "peak_memory_bytes", "error", "result", "children")
+
+    def __init__(self, step: Any, summarize: bool = True):
+        self.name = step.name
+        self.status = step.status
+        self.sequence = step.sequence
+        self.started_at = step.started_at
+        self.finished_at = step.finished_at
+        self.duration_ns = step.duration_ns
+        self.requires: Tuple[str, ...] = tuple(step.requires)
+        self.provides: Tuple[str, ...] = tuple(step.provides)
+        self.endpoint = step.endpoint
+        self.timings: Optional[RequestTimings] = step.timings
+        self.retries: List[RetryRecord] = step.retries
+        self.peak_memory_bytes = step.stream.peak_memory_bytes if step.stream is not None else None
+        self.error = str(step.error) if step.error else None
+        self.result = step.compact_result() if summarize else None
+        self.children = [CompactStep(child, summarize) for child in step.children]
+
+    @property
+    def executed(self) -> bool:
+        return self.status != "planned"
+
+    @property
+    def is_request(self) -> bool:
+        return self.endpoint is not None
+
+    @property
+    def duration(self) -> float:
+        return self.duration_ns / 1e9
+
+    @property
+    def service_duration_ns(self) -> int:
+        return service_duration_ns(self.duration_ns, self.timings)
+
+    @property
+    def retry_time(self) -> float:
+        return sum(record.delay for record in self.retries)
+
+    def to_dict(self, parent: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "passed": self.status == "passed",
+            "status": self.status,
+            "parent": parent,
+            "duration": self.duration,
+            "timings": self.timings.to_dict() if self.timings is not None else None,
+            "retries": [record.to_dict() for record in self.retries],
+            "retry_time": self.retry_time,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "error": self.error,
+            "response": self.result.to_dict() if self.result is not None else None
+        }
+
+
+def compact_steps(steps: List[Any], summarize: bool = True) -> List[CompactStep]:
+    return [step if isinstance(step, CompactStep) else CompactStep(step, summarize) for step in steps]
@@ -0,0 +1,214 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"}
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# 服务端明确表示请求未被处理的状态码，非幂等请求也可以安全重试
+NOT_PROCESSED_STATUS_CODES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"熔断器已打开: {endpoint}，{retry_in:.1f}秒后重试")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class HTTPRequestError(Exception):
+    """请求最终失败，retries 中保留已经进行的重试记录"""
+
+    def __init__(self, message: str, retries: Optional[List['RetryRecord']] = None):
+        super().__init__(message)
+        self.retries = retries or []
+
+
+class RetryRecord:
+    def __init__(self, attempt: int, reason: str, delay: float, status_code: Optional[int] = None):
+        self.attempt = attempt
+        self.reason = reason
+        self.delay = delay
+        self.status_code = status_code
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempt": self.attempt,
+            "reason": self.reason,
+            "delay": round(self.delay, 3),
+            "status_code": self.status_code
+        }
+
+    def __repr__(self) -> str:
+        return f"RetryRecord(attempt={self.attempt}, reason='{self.reason}', delay={self.delay:.3f})"
+
+
+class RetryBudget:
+    """重试预算：每个请求存入 ratio 个令牌，每次重试消耗1个，避免故障时重试放大流量"""
+
+    def __init__(self, ratio: float = 0.2, min_tokens: int = 10, max_tokens: int = 100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """熔断打开期间直接失败；超过恢复时间后放行一个探测请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self.opened_at + self.recovery_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(self.endpoint, max(retry_in, 0))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """按 方法+URL(不含查询参数) 维护熔断器，可在多个客户端之间共享"""
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, method: str, url: str) -> CircuitBreaker:
+        parts = urlsplit(url)
+        endpoint = f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}"
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint, self.failure_threshold, self.recovery_timeout)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return {endpoint: breaker.state for endpoint, breaker in self._breakers.items()}
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.1, max_delay: float = 10,
+                 retry_status_codes: Optional[set] = None, retry_non_idempotent: bool = False,
+                 respect_retry_after: bool = True, max_retry_after: float = 30,
+                 budget: Optional[RetryBudget] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_status_codes = retry_status_codes if retry_status_codes is not None else set(RETRY_STATUS_CODES)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+        self.breakers = breakers if breakers is not None else CircuitBreakerRegistry()
+
+    @classmethod
+    def from_config(cls, framework_config: Optional[Dict[str, Any]] = None,
+                    breakers: Optional[CircuitBreakerRegistry] = None) -> 'RetryPolicy':
+        """根据 config.yaml 中 framework 配置创建重试策略，每个客户端应使用独立实例（独立预算）"""
+        framework_config = framework_config or {}
+        retry_config = framework_config.get('retry') or {}
+        if breakers is None:
+            breakers = CircuitBreakerRegistry(
+                failure_threshold=retry_config.get('failure_threshold', 5),
+                recovery_timeout=retry_config.get('recovery_timeout', 30)
+            )
+        return cls(
+            max_retries=framework_config.get('retries', 3),
+            base_delay=retry_config.get('base_delay', 0.1),
+            max_delay=retry_config.get('max_delay', 10),
+            retry_non_idempotent=retry_config.get('retry_non_idempotent', False),
+            respect_retry_after=retry_config.get('respect_retry_after', True),
+            max_retry_after=retry_config.get('max_retry_after', 30),
+            budget=RetryBudget(
+                ratio=retry_config.get('budget_ratio', 0.2),
+                min_tokens=retry_config.get('budget_min_tokens', 10)
+            ),
+            breakers=breakers
+        )
+
+    def is_idempotent(self, method: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        if method.upper() in IDEMPOTENT_METHODS or self.retry_non_idempotent:
+            return True
+        # 带幂等键的请求由服务端去重，可以重试
+        return bool(headers) and any(k.lower() == "idempotency-key" for k in headers)
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        if not self.respect_retry_after or response.status_code not in NOT_PROCESSED_STATUS_CODES:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+    def next_delay(self, previous_delay: float) -> float:
+        # decorrelated jitter: sleep = min(cap, random(base, prev * 3))，首次重试 prev 按 base 计，同样带抖动
+        upper = max(previous_delay, self.base_delay) * 3
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def should_retry_response(self, method: str, headers: Optional[Dict[str, str]],
+                              response: Any, attempt: int) -> bool:
+        if attempt >= self.max_retries or response.status_code not in self.retry_status_codes:
+            return False
+        if not self.is_idempotent(method, headers) and response.status_code not in NOT_PROCESSED_STATUS_CODES:
+            return False
+        return self.budget.withdraw()
+
+    def should_retry_error(self, method: str, headers: Optional[Dict[str, str]],
+                           request_sent: bool, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        # 请求可能已被服务端处理时，非幂等请求不重试，避免重复下单
+        if request_sent and not self.is_idempotent(method, headers):
+            return False
+        return self.budget.withdraw()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+
+def schema_fingerprint(schema: Any) -> str:
+    """schema 内容的指纹：键排序后的紧凑 JSON 的哈希，内容相同的 schema 共享一个编译结果"""
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CompiledSchema:
+    """已通过元 schema 检查的验证器，可反复验证不同的实例"""
+
+    def __init__(self, schema: Any):
+        cls = validator_for(schema)
+        # schema 本身不合法时抛出 SchemaError，只在编译时检查一次
+        cls.check_schema(schema)
+        self.schema = schema
+        self.validator = cls(schema)
+
+    def first_error(self, instance: Any) -> Optional[ValidationError]:
+        """与 jsonschema.validate 相同的错误选择（best_match），验证通过时返回 None"""
+        return best_match(self.validator.iter_errors(instance))
+
+    def is_valid(self, instance: Any) -> bool:
+        return self.validator.is_valid(instance)
+
+    def validate_many(self, instances: Iterable[Any]) -> List[Tuple[int, ValidationError]]:
+        """逐个验证，返回未通过的 [(下标, 错误)]"""
+        failures = []
+        for index, instance in enumerate(instances):
+            error = self.first_error(instance)
+            if error is not None:
+                failures.append((index, error))
+        return failures
+
+
+class SchemaCache:
+    """
+    按 schema 指纹缓存编译后的验证器（LRU，最多 maxsize 个），多线程共享
+
+    同一个 schema 对象的指纹按 id 记住，反复传入同一对象时不再序列化和计算哈希；
+    因此 schema 传入后应视为不可变，原地修改后需要 clear()。
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._compiled: 'OrderedDict[str, CompiledSchema]' = OrderedDict()
+        # id(schema) -> (schema, 指纹)；保存对象引用，id 不会被其它对象复用，取用时仍核对是否为同一对象
+        self._identities: 'OrderedDict[int, Tuple[Any, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, schema: Any) -> CompiledSchema:
+        schema_id = id(schema)
+        with self._lock:
+            identity = self._identities.get(schema_id)
+            if identity is not None and identity[0] is schema:
+                self._identities.move_to_end(schema_id)
+                compiled = self._lookup(identity[1])
+                if compiled is not None:
+                    return compiled
+                key = identity[1]
+            else:
+                key = None
+        if key is None:
+            key = schema_fingerprint(schema)
+        with self._lock:
+            self._identities[schema_id] = (schema, key)
+            self._identities.move_to_end(schema_id)
+            while len(self._identities) > self.maxsize:
+                self._identities.popitem(last=False)
+            compiled = self._lookup(key)
+            if compiled is not None:
+                return compiled
+            self.misses += 1
+        # 编译（含元 schema 检查）在锁外进行，并发编译同一 schema 时只保留一个结果
+        compiled = CompiledSchema(schema)
+        with self._lock:
+            existing = self._compiled.get(key)
+            if existing is not None:
+                return existing
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def _lookup(self, key: str) -> Optional[CompiledSchema]:
+        """持有锁时调用：命中时更新 LRU 顺序并计数"""
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            self._compiled.move_to_end(key)
+            self.hits += 1
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+            self._identities.clear()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._compiled), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# 进程内默认的验证器缓存，Assertions.json_schema 使用
+default_cache = SchemaCache()
+
+
+def compile_schema(schema: Any) -> CompiledSchema:
+    return default_cache.get(schema)
+
+
+def validate_many(schema: Any, instances: Iterable[Any]) -> List[Tuple[int, ValidationError]]:
+    """用同一个编译后的验证器检查一批实例（如录制下来的响应体），返回未通过的 [(下标, 错误)]"""
+    return compile_schema(schema).validate_many(instances)
@@ -0,0 +1,105 @@
+import json
+import os
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# 分片单位：(套件名, 用例下标, 用例名)
+CaseRef = Tuple[str, int, str]
+
+DURATIONS_FILE = "case_durations.json"
+# 没有历史记录时的默认耗时估计（秒）
+DEFAULT_DURATION = 1.0
+
+
+def encode_message(payload: Any) -> bytes:
+    """进程间传递的消息：紧凑JSON + zlib 压缩"""
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_message(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def duration_key(suite_name: str, case_name: str) -> str:
+    return f"{suite_name}::{case_name}"
+
+
+def load_durations(directory: str) -> Dict[str, float]:
+    path = os.path.join(directory, DURATIONS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(directory: str, durations: Dict[str, float]):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, DURATIONS_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(durations, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def plan_shards(cases: List[CaseRef], durations: Dict[str, float], shards: int) -> List[List[CaseRef]]:
+    """
+    按历史耗时把用例分配到 shards 个分片（最长处理时间优先的贪心算法）
+
+    同样的输入总是得到同样的分片；没有历史记录的用例按已知耗时的平均值估计。
+    分片内的用例保持原有顺序。
+    """
+    known = [durations[duration_key(suite, name)] for suite, _, name in cases
+             if duration_key(suite, name) in durations]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION
+    order = {case: position for position, case in enumerate(cases)}
+
+    def estimate(case: CaseRef) -> float:
+        return durations.get(duration_key(case[0], case[2]), default)
+
+    loads = [0.0] * shards
+    assigned: List[List[CaseRef]] = [[] for _ in range(shards)]
+    for case in sorted(cases, key=lambda c: (-estimate(c), order[c])):
+        target = min(range(shards), key=lambda i: (loads[i], i))
+        loads[target] += estimate(case)
+        assigned[target].append(case)
+    return [sorted(shard, key=order.__getitem__) for shard in assigned if shard]
+
+
+def merge_pool_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    hosts: Dict[str, Dict[str, int]] = {}
+    for item in stats:
+        for host, counters in item["hosts"].items():
+            merged = hosts.setdefault(host, {"new_connections": 0, "requests": 0, "reused": 0})
+            for key in merged:
+                merged[key] += counters[key]
+    return {
+        "hosts": hosts,
+        "new_connections": sum(h["new_connections"] for h in hosts.values()),
+        "requests": sum(h["requests"] for h in hosts.values()),
+        "reused": sum(h["reused"] for h in hosts.values())
+    }
+
+
+def merge_limiter_stats(stats: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for item in stats:
+        for host, counters in item.items():
+            host_stats = merged.setdefault(host, {
+                "requests": 0, "delayed": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0, "in_flight": None
+            })
+            host_stats["requests"] += counters["requests"]
+            host_stats["delayed"] += counters["delayed"]
+            host_stats["total_wait_ms"] += counters["total_wait_ms"]
+            host_stats["max_wait_ms"] = max(host_stats["max_wait_ms"], counters["max_wait_ms"])
+    for host_stats in merged.values():
+        host_stats["total_wait_ms"] = round(host_stats["total_wait_ms"], 3)
+        requests_count = host_stats["requests"]
+        host_stats["avg_wait_ms"] = round(host_stats["total_wait_ms"] / requests_count, 3) if requests_count else 0.0
+    return merged
+
+
+def merge_counter_stats(stats: List[Optional[Dict[str, int]]]) -> Optional[Dict[str, int]]:
+    stats = [item for item in stats if item]
+    if not stats:
+        return None
+    return {key: sum(item.get(key, 0) for item in stats) for key in stats[0]}
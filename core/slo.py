@@ -0,0 +1,185 @@
+import time
+from typing import Any, Iterable, Optional
+from .histogram import LatencyHistogram
+from .assertions import AssertionError
+
+
+class LatencySeries:
+    """
+    一个步骤或接口的样本序列：延迟直方图、请求数、错误数和时间窗口
+
+    样本逐个计入直方图，不保留原始值，数百万个样本也只占用固定的内存；
+    同一接口在多个用例、进程中的序列可以合并后再做 SLO 断言。
+    """
+
+    def __init__(self, name: str = "", elapsed: Optional[float] = None,
+                 histogram: Optional[LatencyHistogram] = None):
+        self.name = name
+        self.latency = histogram if histogram is not None else LatencyHistogram()
+        self.count = 0
+        self.errors = 0
+        # 吞吐的时间窗口（秒）；为 None 时取第一个样本开始到最后一个样本结束
+        self.elapsed = elapsed
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+
+    def record(self, duration_ns: int, error: bool = False, finished_at: Optional[float] = None,
+               timed: bool = True):
+        """
+        finished_at 为样本结束时刻（单调时钟，秒），默认取当前时刻
+
+        timed=False 时样本不参与时间窗口（事后计入已收集的样本），吞吐需要由 elapsed 给出。
+        """
+        self.latency.record(duration_ns)
+        self.count += 1
+        self.errors += bool(error)
+        if not timed:
+            return
+        if finished_at is None:
+            finished_at = time.monotonic()
+        started_at = finished_at - duration_ns / 1e9
+        if self._first is None or started_at < self._first:
+            self._first = started_at
+        if self._last is None or finished_at > self._last:
+            self._last = finished_at
+
+    def record_response(self, response: Any, error: Optional[bool] = None, timed: bool = True):
+        """ResponseWrapper、RecordedResponse 等带 elapsed 和 status_code 的响应，4xx/5xx 计为错误"""
+        if error is None:
+            error = response.status_code >= 400
+        self.record(int(response.elapsed.total_seconds() * 1e9), error, timed=timed)
+
+    def record_step(self, step: Any, offset: float = 0.0):
+        """
+        已执行的请求步骤（TestStep 或 CompactStep），offset 为所属用例的开始时刻
+
+        延迟不含在本地限流器中排队的时间，限流不会让延迟 SLO 失败。
+        """
+        status_code = getattr(step.result, "status_code", None)
+        error = step.error is not None or (status_code is not None and status_code >= 400)
+        self.record(step.service_duration_ns, error, offset + step.finished_at)
+
+    def merge(self, other: 'LatencySeries') -> 'LatencySeries':
+        self.latency.merge(other.latency)
+        self.count += other.count
+        self.errors += other.errors
+        if other._first is not None and (self._first is None or other._first < self._first):
+            self._first = other._first
+        if other._last is not None and (self._last is None or other._last > self._last):
+            self._last = other._last
+        if other.elapsed is not None:
+            self.elapsed = max(self.elapsed or 0.0, other.elapsed)
+        return self
+
+    @property
+    def window(self) -> float:
+        if self.elapsed is not None:
+            return self.elapsed
+        return self._last - self._first if self._first is not None else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    @property
+    def throughput(self) -> float:
+        window = self.window
+        return self.count / window if window > 0 else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        return self.latency.value_at_percentile(q) / 1e6
+
+
+class SLOAssertions:
+    """
+    对样本序列的聚合断言（p95/p99 延迟、错误率、吞吐）
+
+    response_time_less_than 逐个响应判断，单个离群值就会失败；这里按整个序列的分位数判断，
+    失败信息给出实测值和样本数。直方图的相对误差在 1% 以内。
+    """
+
+    def __init__(self, series: LatencySeries):
+        self.series = series
+
+    def _label(self) -> str:
+        return f"{self.series.name} " if self.series.name else ""
+
+    def _require_samples(self):
+        if not self.series.count:
+            raise AssertionError(f"SLO断言失败: {self._label()}没有样本")
+
+    def min_samples(self, minimum: int) -> 'SLOAssertions':
+        """样本太少时分位数没有意义，可以先断言样本数"""
+        if self.series.count < minimum:
+            raise AssertionError(
+                f"SLO断言失败: {self._label()}期望至少 {minimum} 个样本, 实际 {self.series.count}",
+                self.series.count, minimum
+            )
+        return self
+
+    def percentile_less_than(self, q: float, max_time_ms: float) -> 'SLOAssertions':
+        self._require_samples()
+        actual = self.series.percentile_ms(q)
+        if actual >= max_time_ms:
+            raise AssertionError(
+                f"延迟SLO断言失败: {self._label()}期望 p{q:g} < {max_time_ms}ms, "
+                f"实际 p{q:g} {actual:.3f}ms (样本数 {self.series.count})",
+                actual, max_time_ms
+            )
+        return self
+
+    def p50_less_than(self, max_time_ms: float) -> 'SLOAssertions':
+        return self.percentile_less_than(50, max_time_ms)
+
+    def p90_less_than(self, max_time_ms: float) -> 'SLOAssertions':
+        return self.percentile_less_than(90, max_time_ms)
+
+    def p95_less_than(self, max_time_ms: float) -> 'SLOAssertions':
+        return self.percentile_less_than(95, max_time_ms)
+
+    def p99_less_than(self, max_time_ms: float) -> 'SLOAssertions':
+        return self.percentile_less_than(99, max_time_ms)
+
+    def error_rate_below(self, max_rate: float) -> 'SLOAssertions':
+        self._require_samples()
+        actual = self.series.error_rate
+        if actual >= max_rate:
+            raise AssertionError(
+                f"错误率SLO断言失败: {self._label()}期望低于 {max_rate:.2%}, "
+                f"实际 {actual:.2%} ({self.series.errors}/{self.series.count})",
+                actual, max_rate
+            )
+        return self
+
+    def throughput_at_least(self, min_rps: float) -> 'SLOAssertions':
+        self._require_samples()
+        if self.series.window <= 0:
+            raise AssertionError(f"吞吐SLO断言失败: {self._label()}样本没有时间窗口，需要给出 elapsed")
+        actual = self.series.throughput
+        if actual < min_rps:
+            raise AssertionError(
+                f"吞吐SLO断言失败: {self._label()}期望至少 {min_rps} req/s, "
+                f"实际 {actual:.1f} req/s ({self.series.count} 个请求 / {self.series.window:.3f}s)",
+                actual, min_rps
+            )
+        return self
+
+
+def series_from_responses(responses: Iterable[Any], name: str = "",
+                          elapsed: Optional[float] = None) -> LatencySeries:
+    """
+    逐个计入一批响应（可以是生成器），不保留响应列表
+
+    响应没有发出时刻，需要给出 elapsed（秒）才能断言吞吐。
+    """
+    series = LatencySeries(name, elapsed)
+    for response in responses:
+        series.record_response(response, timed=False)
+    return series
+
+
+def assert_slo(source: Any, name: str = "", elapsed: Optional[float] = None) -> SLOAssertions:
+    """source 可以是 LatencySeries 或一批响应"""
+    if not isinstance(source, LatencySeries):
+        source = series_from_responses(source, name, elapsed)
+    return SLOAssertions(source)
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from .jsonpath import WILDCARD, PathSegment, parse_path
+
+
+# 忽略路径中匹配任意层级（包括零层）的段，如 **.uuid、data.**.updateTime
+ANY_DEPTH = "**"
+
+Pattern = Tuple[PathSegment, ...]
+# 匹配状态：(忽略路径, 已匹配到的位置)
+State = Tuple[Pattern, int]
+
+
+class _Ignored:
+    """被忽略的数组元素的占位值，保留元素位置"""
+
+    def __repr__(self) -> str:
+        return "<ignored>"
+
+
+IGNORED = _Ignored()
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=repr).encode("utf-8")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def raw_hash(content: bytes) -> str:
+    """响应体原始字节的哈希：字节相同的响应无需解析即可判定一致"""
+    return _digest(content)
+
+
+def _close(states: Iterable[State]) -> FrozenSet[State]:
+    """** 可以匹配零层：位于 ** 上的状态同时也在它的下一段上"""
+    closed = set()
+    pending = list(states)
+    while pending:
+        state = pending.pop()
+        if state in closed:
+            continue
+        closed.add(state)
+        pattern, position = state
+        if position < len(pattern) and pattern[position] == ANY_DEPTH:
+            pending.append((pattern, position + 1))
+    return frozenset(closed)
+
+
+class Difference:
+    """一处差异：path 为 JSON 路径，kind 为 changed/missing/unexpected"""
+
+    __slots__ = ("path", "kind", "expected", "actual")
+
+    CHANGED = "changed"
+    MISSING = "missing"
+    UNEXPECTED = "unexpected"
+
+    def __init__(self, path: str, kind: str, expected: Any = None, actual: Any = None):
+        self.path = path
+        self.kind = kind
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self) -> str:
+        path = self.path or "$"
+        if self.kind == self.MISSING:
+            return f"{path}: 缺少, 期望 {_short(self.expected)}"
+        if self.kind == self.UNEXPECTED:
+            return f"{path}: 多出 {_short(self.actual)}"
+        return f"{path}: 期望 {_short(self.expected)}, 实际 {_short(self.actual)}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "kind": self.kind, "expected": self.expected, "actual": self.actual}
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=repr)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _child_path(path: str, key: PathSegment) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else key
+
+
+def _diff(expected: Any, actual: Any, path: str, differences: List[Difference], limit: int):
+    """相等的子树整体跳过（== 在 C 中比较），只深入不同的子树"""
+    if expected == actual or len(differences) >= limit:
+        return
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in list(expected) + [key for key in actual if key not in expected]:
+            if len(differences) >= limit:
+                return
+            child_path = _child_path(path, key)
+            if key not in actual:
+                differences.append(Difference(child_path, Difference.MISSING, expected=expected[key]))
+            elif key not in expected:
+                differences.append(Difference(child_path, Difference.UNEXPECTED, actual=actual[key]))
+            else:
+                _diff(expected[key], actual[key], child_path, differences, limit)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        for index in range(max(len(expected), len(actual))):
+            if len(differences) >= limit:
+                return
+            child_path = _child_path(path, index)
+            if index >= len(actual):
+                differences.append(Difference(child_path, Difference.MISSING, expected=expected[index]))
+            elif index >= len(expected):
+                differences.append(Difference(child_path, Difference.UNEXPECTED, actual=actual[index]))
+            else:
+                _diff(expected[index], actual[index], child_path, differences, limit)
+    else:
+        differences.append(Difference(path, Difference.CHANGED, expected, actual))
+
+
+class StructuralHasher:
+    """
+    带忽略路径的结构哈希和差异比较
+
+    忽略路径使用 core.jsonpath 语法，* 匹配任意一个键或下标，** 匹配任意层级。比较前先去掉被忽略的
+    字段（数组元素以占位值保留位置），只复制忽略路径经过的节点，其余子树原样共享；结构哈希是
+    去掉忽略字段后的规范化 JSON（键排序）整体计算的一个 blake2b 哈希，与键顺序和空白无关。
+    不按子树分别计算哈希，差异定位依靠 diff() 中逐层的 == 比较跳过相等的子树。
+    """
+
+    def __init__(self, ignore: Optional[Iterable[str]] = None):
+        self.ignore = sorted(set(ignore or ()))
+        patterns = [parse_path(path) for path in self.ignore]
+        self._root = _close((pattern, 0) for pattern in patterns)
+        # 没有按具体下标忽略时，数组的所有下标转移到相同的状态，按 * 缓存
+        self._indexed = any(isinstance(segment, int) or (isinstance(segment, str) and segment.isdigit())
+                            for pattern in patterns for segment in pattern)
+        self._transitions: Dict[Tuple[FrozenSet[State], PathSegment], Tuple[FrozenSet[State], bool]] = {}
+
+    def _advance(self, states: FrozenSet[State], key: PathSegment) -> Tuple[FrozenSet[State], bool]:
+        """进入子节点 key 后的匹配状态，以及该子节点是否被忽略"""
+        if isinstance(key, int) and not self._indexed:
+            key = WILDCARD
+        cache_key = (states, key)
+        transition = self._transitions.get(cache_key)
+        if transition is None:
+            advanced = []
+            for pattern, position in states:
+                if position == len(pattern):
+                    continue
+                segment = pattern[position]
+                if segment == ANY_DEPTH:
+                    advanced.append((pattern, position))
+                elif segment == WILDCARD or segment == key or (isinstance(key, int) and segment == str(key)):
+                    advanced.append((pattern, position + 1))
+            closed = _close(advanced)
+            transition = self._transitions[cache_key] = (
+                closed, any(position == len(pattern) for pattern, position in closed)
+            )
+        return transition
+
+    def strip(self, document: Any) -> Any:
+        """去掉被忽略的字段，没有忽略路径时原样返回"""
+        if not self._root or not isinstance(document, (dict, list)):
+            return document
+        return self._strip(document, self._root)
+
+    def _strip(self, value: Any, states: FrozenSet[State]) -> Any:
+        if isinstance(value, dict):
+            transitions = self._transitions
+            stripped = {}
+            for key, child in value.items():
+                transition = transitions.get((states, key)) or self._advance(states, key)
+                child_states, ignored = transition
+                if ignored:
+                    continue
+                if child_states and isinstance(child, (dict, list)):
+                    child = self._strip(child, child_states)
+                stripped[key] = child
+            return stripped
+        if not self._indexed:
+            # 所有下标转移到相同的状态
+            child_states, ignored = self._advance(states, WILDCARD)
+            if ignored:
+                return [IGNORED] * len(value)
+            if not child_states:
+                return value
+            return [self._strip(child, child_states) if isinstance(child, (dict, list)) else child
+                    for child in value]
+        items = []
+        for index, child in enumerate(value):
+            child_states, ignored = self._advance(states, index)
+            if ignored:
+                child = IGNORED
+            elif child_states and isinstance(child, (dict, list)):
+                child = self._strip(child, child_states)
+            items.append(child)
+        return items
+
+    def hash(self, document: Any) -> str:
+        return _digest(_canonical(self.strip(document)))
+
+    def equal(self, expected: Any, actual: Any) -> bool:
+        return self.strip(expected) == self.strip(actual)
+
+    def diff(self, expected: Any, actual: Any, limit: int = 20) -> List[Difference]:
+        """
+        最多 limit 处差异（一致时为空列表）
+
+        相等的子树不展开；类型不同或标量不同时整个子树作为一处差异，差异中只保留该子树。
+        """
+        differences: List[Difference] = []
+        _diff(self.strip(expected), self.strip(actual), "", differences, limit)
+        return differences
+
+
+def structural_hash(document: Any, ignore: Optional[Iterable[str]] = None) -> str:
+    return StructuralHasher(ignore).hash(document)
+
+
+def diff(expected: Any, actual: Any, ignore: Optional[Iterable[str]] = None, limit: int = 20) -> List[Difference]:
+    return StructuralHasher(ignore).diff(expected, actual, limit)
+
+
+def format_diff(differences: List[Difference], limit: int = 20) -> str:
+    lines = [f"  {difference}" for difference in differences]
+    if len(differences) >= limit:
+        lines.append(f"  ... 只列出前 {limit} 处差异")
+    return "\n".join(lines)
+
+
+class SnapshotStore:
+    """
+    黄金快照目录：每个快照一个 <name>.snap 文件
+
+    文件第一行是快照头（原始响应体哈希、结构哈希和忽略路径），其余部分是完整文档。比较时只读取
+    第一行：响应体字节相同时无需解析，结构哈希相同时无需加载快照文档；都不同时才加载文档计算差异。
+    快照不存在或 update=True 时写入当前文档。
+    """
+
+    SUFFIX = ".snap"
+
+    def __init__(self, directory: str = "snapshots", update: bool = False):
+        self.directory = directory
+        self.update = update
+        self._headers: Dict[str, Dict[str, Any]] = {}
+        self._hashers: Dict[Tuple[str, ...], StructuralHasher] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}{self.SUFFIX}")
+
+    def hasher(self, ignore: Optional[Iterable[str]] = None) -> StructuralHasher:
+        """同一组忽略路径共享一个 StructuralHasher（及其状态转移缓存）"""
+        key = tuple(sorted(set(ignore or ())))
+        with self._lock:
+            hasher = self._hashers.get(key)
+            if hasher is None:
+                hasher = self._hashers[key] = StructuralHasher(key)
+        return hasher
+
+    def header(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            header = self._headers.get(name)
+        if header is None:
+            path = self.path(name)
+            if not os.path.exists(path):
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+            with self._lock:
+                self._headers[name] = header
+        return header
+
+    def load(self, name: str) -> Any:
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            f.readline()
+            return json.load(f)
+
+    def save(self, name: str, document: Any, ignore: Optional[Iterable[str]] = None,
+             content: Optional[bytes] = None) -> Dict[str, Any]:
+        hasher = self.hasher(ignore)
+        header = {
+            "hash": hasher.hash(document),
+            "raw_hash": raw_hash(content) if content is not None else None,
+            "ignore": hasher.ignore
+        }
+        os.makedirs(os.path.dirname(self.path(name)) or ".", exist_ok=True)
+        temp_path = f"{self.path(name)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            json.dump(document, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path(name))
+        with self._lock:
+            self._headers[name] = header
+        return header
+
+    def matches_content(self, name: str, content: bytes) -> bool:
+        """响应体原始字节与保存快照时完全相同"""
+        header = None if self.update else self.header(name)
+        return header is not None and header.get("raw_hash") is not None and header["raw_hash"] == raw_hash(content)
+
+    def compare(self, name: str, document: Any, ignore: Optional[Iterable[str]] = None,
+                content: Optional[bytes] = None, limit: int = 20) -> List[Difference]:
+        """
+        与快照比较，返回差异（一致时为空列表）；content 为响应体原始字节，新建快照时一并记录其哈希
+
+        ignore 为 None 时使用快照保存时的忽略路径；给出不同的忽略路径时快照头中的结构哈希不再适用，直接比较文档。
+        """
+        header = None if self.update else self.header(name)
+        if header is None:
+            self.save(name, document, ignore, content)
+            return []
+        hasher = self.hasher(header["ignore"] if ignore is None else ignore)
+        if hasher.ignore == header["ignore"] and hasher.hash(document) == header["hash"]:
+            return []
+        return hasher.diff(self.load(name), document, limit)
+
+
+# 进程内默认的快照目录，Assertions.matches_snapshot 使用；run_tests --update-snapshots 时重新生成
+default_store = SnapshotStore()
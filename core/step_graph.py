@@ -0,0 +1,57 @@
+from typing import Dict, Any, List, Set
+
+
+def is_barrier(step: Any) -> bool:
+    """没有声明 requires/provides 的步骤依赖之前所有步骤，之后的步骤也都依赖它（保持顺序执行的语义）"""
+    return not step.requires and not step.provides
+
+
+def build_dependencies(steps: List[Any]) -> Dict[Any, Set[Any]]:
+    """
+    按变量建立步骤依赖：步骤依赖于之前最近一个提供其所需变量的步骤
+
+    所需变量没有任何之前的步骤提供时（例如在前置钩子中设置），不产生依赖。
+    """
+    dependencies: Dict[Any, Set[Any]] = {}
+    providers: Dict[str, Any] = {}
+    barrier = None
+    since_barrier: List[Any] = []
+    for step in steps:
+        if is_barrier(step):
+            deps = set(since_barrier)
+            if barrier is not None:
+                deps.add(barrier)
+            barrier = step
+            since_barrier = []
+        else:
+            deps = {providers[name] for name in step.requires if name in providers}
+            if barrier is not None:
+                deps.add(barrier)
+            since_barrier.append(step)
+        dependencies[step] = deps
+        for name in step.provides:
+            providers[name] = step
+    return dependencies
+
+
+def find_critical_path(steps: List[Any], dependencies: Dict[Any, Set[Any]]) -> Dict[str, Any]:
+    """
+    关键路径：从最后完成的步骤出发，沿最晚完成的依赖回溯
+
+    duration 为路径上各步骤耗时之和，serial_duration 为全部步骤顺序执行所需的时间。
+    """
+    executed = [step for step in steps if step.finished_at is not None]
+    if not executed:
+        return {"steps": [], "duration": 0.0, "serial_duration": 0.0}
+    path = []
+    step = max(executed, key=lambda s: s.finished_at)
+    while step is not None:
+        path.append(step)
+        deps = [dep for dep in dependencies.get(step, ()) if dep.finished_at is not None]
+        step = max(deps, key=lambda s: s.finished_at) if deps else None
+    path.reverse()
+    return {
+        "steps": [step.name for step in path],
+        "duration": sum(step.duration for step in path),
+        "serial_duration": sum(step.duration for step in executed)
+    }
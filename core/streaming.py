@@ -0,0 +1,450 @@
+import abc
+import codecs
+import json
+import re
+import time
+from json.decoder import scanstring
+from typing import Any, Callable, List, Optional, Tuple
+import requests
+from .assertions import AssertionError
+from .deadline import current_deadline
+from .jsonpath import WILDCARD, PathSegment, parse_path
+
+
+NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?')
+# 数字和 true/false/null 的最大可能范围，到达缓冲区末尾时需要等待下一块
+SCALAR_RE = re.compile(r'[-+0-9.eEtruefalsn]+')
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# 跳过子树时一次越过所有非括号、非字符串字符
+SKIP_RE = re.compile(r'[^"{}\[\]]*')
+# 扫描目标元素的字符串内容时跳过非引号、非转义字符
+STRING_BODY_RE = re.compile(r'[^"\\]*')
+LITERALS = {"true": True, "false": False, "null": None}
+
+_DESCEND = object()
+# 流式断言与 core.jsonpath 使用同一种路径语法
+parse_stream_path = parse_path
+
+
+def _matches(path: List[PathSegment], pattern: Tuple[PathSegment, ...], length: int) -> bool:
+    for i in range(length):
+        if pattern[i] != WILDCARD and pattern[i] != path[i]:
+            return False
+    return True
+
+
+def _walk(value: Any, segments: Tuple[PathSegment, ...], path: List[PathSegment]):
+    """在已构造的值上按剩余路径取值，路径不存在时不产生结果"""
+    if not segments:
+        yield path, value
+        return
+    head, rest = segments[0], segments[1:]
+    if head == WILDCARD:
+        items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    elif isinstance(value, dict) and head in value:
+        items = ((head, value[head]),)
+    elif isinstance(value, list) and isinstance(head, int) and -len(value) <= head < len(value):
+        items = ((head, value[head]),)
+    else:
+        items = ()
+    for key, item in items:
+        yield from _walk(item, rest, path + [key])
+
+
+class _Frame:
+    __slots__ = ("is_map", "key", "expecting_key")
+
+    def __init__(self, is_map: bool):
+        self.is_map = is_map
+        # 数组中 key 为当前下标
+        self.key: PathSegment = -1
+        self.expecting_key = is_map
+
+
+class StreamingJSONParser:
+    """
+    增量JSON解析器：只把命中目标路径的值构造成Python对象，其它部分边解析边丢弃
+
+    目标值用标准库的C解码器整体解码，不关心的子树只扫描括号和字符串；
+    内存占用取决于单个目标元素的大小和读取块大小，与整个响应体大小无关。
+    """
+
+    def __init__(self, patterns: List[Tuple[PathSegment, ...]], on_value: Callable[[int, List[PathSegment], Any], None]):
+        self.patterns = patterns
+        self.on_value = on_value
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._frames: List[_Frame] = []
+        # 跳过不关心的子树时的嵌套深度
+        self._skip_depth = 0
+        # 跨块的目标元素：路径和已扫描到的位置（相对元素起点）、括号深度、是否在字符串内
+        self._element_path: Optional[List[PathSegment]] = None
+        self._element_scan = 0
+        self._element_depth = 0
+        self._element_in_string = False
+        self.peak_buffer = 0
+        self.peak_element = 0
+        self.done = False
+
+    def feed(self, chunk: bytes):
+        self._buffer += self._decoder.decode(chunk)
+        self.peak_buffer = max(self.peak_buffer, len(self._buffer))
+        self._parse(final=False)
+
+    def close(self):
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if self._frames or self._skip_depth or self._buffer.strip():
+            raise ValueError("响应内容不是完整的JSON")
+
+    def _parse(self, final: bool):
+        buf = self._buffer
+        pos = 0
+        length = len(buf)
+        while not self.done:
+            if self._element_path is not None:
+                # 目标元素闭合后才整体解码，未闭合时保留扫描状态，下一块从上次的位置继续
+                end = self._scan_element(buf, pos)
+                if end < 0:
+                    if final:
+                        raise ValueError("响应内容不是完整的JSON")
+                    break
+                value, end = self._json_decoder.raw_decode(buf, pos)
+                path = self._element_path
+                self._element_path = None
+                self.peak_element = max(self.peak_element, end - pos)
+                pos = end
+                self._emit(path, value)
+                self._value_end()
+                continue
+            pos = (SKIP_RE if self._skip_depth else WHITESPACE_RE).match(buf, pos).end()
+            if pos >= length:
+                break
+            ch = buf[pos]
+            if ch == '"':
+                end = buf.find('"', pos + 1)
+                if self._skip_depth and end > 0 and buf[end - 1] != "\\":
+                    # 跳过时不需要解码字符串内容
+                    pos = end + 1
+                    continue
+                try:
+                    value, end = scanstring(buf, pos + 1)
+                except ValueError:
+                    if final:
+                        raise
+                    break
+                if not self._skip_depth:
+                    self._value_or_key("string", value)
+                pos = end
+            elif self._skip_depth:
+                self._skip_depth += 1 if ch in "{[" else -1
+                pos += 1
+                if not self._skip_depth:
+                    self._value_end()
+            elif ch in "{[":
+                path = self._value_start()
+                if path is None:
+                    self._skip_depth = 1
+                    pos += 1
+                elif path is _DESCEND:
+                    self._frames.append(_Frame(ch == "{"))
+                    pos += 1
+                else:
+                    # 命中目标路径：先扫描到元素结束，再用C解码器整体解码
+                    self._element_path = path
+                    self._element_scan = 0
+                    self._element_depth = 0
+                    self._element_in_string = False
+            elif ch in "}]":
+                self._frames.pop()
+                pos += 1
+                self._value_end()
+            elif ch == ",":
+                frame = self._frames[-1] if self._frames else None
+                if frame is not None and frame.is_map:
+                    frame.expecting_key = True
+                pos += 1
+            elif ch == ":":
+                pos += 1
+            else:
+                match = SCALAR_RE.match(buf, pos)
+                if match is None:
+                    raise ValueError(f"无效的JSON字符: {ch!r}")
+                if match.end() == length and not final:
+                    break
+                text = match.group()
+                if text in LITERALS:
+                    value = LITERALS[text]
+                elif NUMBER_RE.fullmatch(text):
+                    value = float(text) if any(c in text for c in ".eE") else int(text)
+                else:
+                    raise ValueError(f"无效的JSON值: {text!r}")
+                self._value_or_key("scalar", value)
+                pos = match.end()
+        self._buffer = buf[pos:]
+
+    def _value_or_key(self, kind: str, value: Any):
+        frame = self._frames[-1] if self._frames else None
+        if kind == "string" and frame is not None and frame.is_map and frame.expecting_key:
+            frame.key = value
+            frame.expecting_key = False
+            return
+        path = self._value_start()
+        if path is not None and path is not _DESCEND:
+            self._emit(path, value)
+        self._value_end()
+
+    def _value_start(self) -> Any:
+        """一个值开始：返回其路径（需要构造）、_DESCEND（需要下钻）或 None（跳过）"""
+        frame = self._frames[-1] if self._frames else None
+        if frame is not None and not frame.is_map:
+            frame.key += 1
+        path = [frame.key for frame in self._frames]
+        depth = len(path)
+        descend = False
+        for pattern in self.patterns:
+            if len(pattern) >= depth and _matches(path, pattern, depth):
+                if len(pattern) == depth:
+                    return path
+                descend = True
+        return _DESCEND if descend else None
+
+    def _scan_element(self, buf: str, start: int) -> int:
+        """从上次扫描到的位置继续寻找 start 处目标元素的结束位置，元素尚未闭合时返回 -1"""
+        pos = start + self._element_scan
+        depth = self._element_depth
+        in_string = self._element_in_string
+        length = len(buf)
+        end = -1
+        while pos < length:
+            if in_string:
+                pos = STRING_BODY_RE.match(buf, pos).end()
+                if pos >= length:
+                    break
+                if buf[pos] == "\\":
+                    # 转义序列被分块截断时停在反斜杠处，下一块到达后重新检查
+                    if pos + 1 >= length:
+                        break
+                    pos += 2
+                    continue
+                in_string = False
+                pos += 1
+                continue
+            pos = SKIP_RE.match(buf, pos).end()
+            if pos >= length:
+                break
+            ch = buf[pos]
+            pos += 1
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if not depth:
+                    end = pos
+                    break
+        self._element_scan = pos - start
+        self._element_depth = depth
+        self._element_in_string = in_string
+        return end
+
+    def _value_end(self):
+        if not self._frames and not self._skip_depth:
+            self.done = True
+
+    def _emit(self, path: List[PathSegment], value: Any):
+        # 更深的目标路径在已构造的值上取
+        depth = len(path)
+        for index, pattern in enumerate(self.patterns):
+            if len(pattern) < depth or not _matches(path, pattern, depth):
+                continue
+            if len(pattern) == depth:
+                self.on_value(index, path, value)
+            else:
+                for sub_path, sub_value in _walk(value, pattern[depth:], list(path)):
+                    self.on_value(index, sub_path, sub_value)
+
+
+class _StreamCheck(abc.ABC):
+    def __init__(self, path: str, description: str):
+        self.path = path
+        self.pattern = parse_stream_path(path)
+        self.description = description
+        self.count = 0
+        self.seen = False
+
+    @abc.abstractmethod
+    def check(self, path: List[PathSegment], value: Any):
+        """每个命中路径的值调用一次，不满足时抛出 AssertionError"""
+
+    def finish(self):
+        pass
+
+
+class _EveryItemCheck(_StreamCheck):
+    def __init__(self, path: str, predicate: Callable[[Any], bool], description: str):
+        super().__init__(path, description)
+        self.predicate = predicate
+
+    def check(self, path, value):
+        if not self.predicate(value):
+            location = "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path).lstrip(".")
+            raise AssertionError(f"流式断言失败: {location} 不满足 {self.description}", value, self.description)
+
+
+class _ValueEqualsCheck(_StreamCheck):
+    def __init__(self, path: str, expected: Any):
+        super().__init__(path, f"{path} == {expected!r}")
+        self.expected = expected
+
+    def check(self, path, value):
+        if value != self.expected:
+            raise AssertionError(
+                f"流式断言失败: {self.path} 期望 {self.expected!r}, 实际 {value!r}",
+                value, self.expected
+            )
+
+    def finish(self):
+        if not self.seen:
+            raise AssertionError(f"流式断言失败: 响应中缺少 {self.path}")
+
+
+class _CountCheck(_StreamCheck):
+    def __init__(self, path: str, minimum: Optional[int], maximum: Optional[int]):
+        super().__init__(path, f"{path} 数量")
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def check(self, path, value):
+        if self.maximum is not None and self.count > self.maximum:
+            raise AssertionError(
+                f"流式断言失败: {self.path} 数量超过 {self.maximum}", self.count, self.maximum
+            )
+
+    def finish(self):
+        if self.minimum is not None and self.count < self.minimum:
+            raise AssertionError(
+                f"流式断言失败: {self.path} 数量期望至少 {self.minimum}, 实际 {self.count}",
+                self.count, self.minimum
+            )
+
+
+class StreamingResponseWrapper:
+    """
+    流式响应：响应体按块读取，在流上执行基于路径的断言
+
+        stream = self.stream("POST", product_list_endpoint, json=payload)
+        stream.status_code_is(200)\\
+            .every_item_has_key("data.list[*]", "fid")\\
+            .value_equals("data.total", 10)\\
+            .verify()
+    """
+
+    def __init__(self, response: requests.Response, chunk_size: int = 64 * 1024):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = response.url
+        self.elapsed = response.elapsed
+        self.timings = getattr(response, "timings", None)
+        self.retries = getattr(response, "retries", None) or []
+        self.from_cache = False
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.peak_memory_bytes = 0
+        self.consumed = False
+        self._checks: List[_StreamCheck] = []
+
+    def get_header(self, key: str, default: Any = None) -> Any:
+        return self.headers.get(key, default)
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        return self.response.cookies.get(name)
+
+    def status_code_is(self, expected_code: int) -> 'StreamingResponseWrapper':
+        # 状态码在读取响应体之前就可以判断
+        if self.status_code != expected_code:
+            self.close()
+            raise AssertionError(
+                f"状态码断言失败: 期望 {expected_code}, 实际 {self.status_code}",
+                self.status_code, expected_code
+            )
+        return self
+
+    status_code_equals = status_code_is
+
+    def every_item(self, path: str, predicate: Callable[[Any], bool],
+                   description: str = "自定义条件") -> 'StreamingResponseWrapper':
+        self._checks.append(_EveryItemCheck(path, predicate, description))
+        return self
+
+    def every_item_has_key(self, path: str, key: str) -> 'StreamingResponseWrapper':
+        return self.every_item(
+            path, lambda item: isinstance(item, dict) and key in item, f"包含键 '{key}'"
+        )
+
+    def value_equals(self, path: str, expected: Any) -> 'StreamingResponseWrapper':
+        self._checks.append(_ValueEqualsCheck(path, expected))
+        return self
+
+    def count_between(self, path: str, minimum: Optional[int] = None,
+                      maximum: Optional[int] = None) -> 'StreamingResponseWrapper':
+        self._checks.append(_CountCheck(path, minimum, maximum))
+        return self
+
+    def count_equals(self, path: str, expected: int) -> 'StreamingResponseWrapper':
+        return self.count_between(path, expected, expected)
+
+    def _on_value(self, index: int, path: List[PathSegment], value: Any):
+        check = self._checks[index]
+        check.seen = True
+        check.count += 1
+        check.check(path, value)
+
+    def verify(self) -> 'StreamingResponseWrapper':
+        """读取一次响应流并执行所有已登记的断言，首个失败立即停止读取"""
+        if self.consumed:
+            raise RuntimeError("响应流已经被读取")
+        self.consumed = True
+        parser = StreamingJSONParser([check.pattern for check in self._checks], self._on_value)
+        deadline = current_deadline()
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                self.bytes_read += len(chunk)
+                parser.feed(chunk)
+                if parser.done:
+                    break
+                # 响应流缓慢时在块之间检查时间预算，超出预算即停止读取
+                if deadline is not None:
+                    deadline.check()
+            parser.close()
+            for check in self._checks:
+                check.finish()
+        except ValueError as e:
+            raise AssertionError(f"流式解析失败: {str(e)}")
+        except requests.exceptions.RequestException:
+            if deadline is not None and deadline.expired():
+                raise deadline.exceeded()
+            raise
+        finally:
+            # 峰值内存 ≈ 最大缓冲区 + 最大的单个目标元素（均按字符计）
+            self.peak_memory_bytes = parser.peak_buffer + parser.peak_element
+            self._finish_timings()
+            self.close()
+        return self
+
+    def _finish_timings(self):
+        if self.timings is not None and self.timings.first_byte:
+            end = time.perf_counter()
+            self.timings.transfer = end - self.timings.first_byte
+            self.timings.total = end - self.timings.start
+            header_bytes = sum(len(k) + len(str(v)) + 4 for k, v in self.headers.items())
+            self.timings.bytes_received = 17 + header_bytes + 2 + self.bytes_read
+
+    def close(self):
+        self.response.close()
+
+    def __str__(self) -> str:
+        return f"StreamingResponse(status_code={self.status_code}, url='{self.url}')"
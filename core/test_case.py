@@ -1,33 +1,159 @@
+import contextvars
 import inspect
+import itertools
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Dict, Any, List, Optional, Callable
 from .http_client import HTTPClient, ResponseWrapper
+from .async_http_client import AsyncHTTPClient, EventLoopThread, SyncAsyncHTTPClient
+from .connection_pool import ConnectionPool
+from .retry import RetryRecord
+from .timing import service_duration_ns
+from .cassette import Cassette
+from .streaming import StreamingResponseWrapper
+from .step_graph import build_dependencies, find_critical_path
+from .retention import KEEP_ALL, KEEP_FAILURES, COMPACT, POLICIES, CompactResult, compact_steps
+from .deadline import DeadlineExceeded, deadline_scope, check_deadline, no_deadline
+from .histogram import HistogramSet, endpoint_key
 from .assertions import AssertionChain, AssertionError
+from .slo import LatencySeries, SLOAssertions
 
 
 class TestStep:
-    def __init__(self, name: str, action: Callable, **kwargs):
+    PLANNED = "planned"
+    PASSED = "passed"
+    FAILED = "failed"
+    # 时间预算耗尽，与断言失败分开统计
+    TIMED_OUT = "timed_out"
+    
+    def __init__(self, name: str, action: Callable, requires: Optional[List[str]] = None,
+                 provides: Optional[List[str]] = None, timeout: Optional[float] = None, **kwargs):
         self.name = name
         self.action = action
         self.kwargs = kwargs
+        # 步骤的时间预算（秒），为 None 时使用用例的 step_timeout
+        self.timeout = timeout
+        # 步骤读取/写入的用例变量，用于建立步骤之间的依赖
+        self.requires = list(requires or [])
+        self.provides = list(provides or [])
+        self.status = self.PLANNED
+        # 开始执行的先后次序，报告按实际执行顺序展示步骤
+        self.sequence: Optional[int] = None
+        # 相对用例开始时间的开始/结束时刻（秒）
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
         self.result = None
-        self.duration = 0
+        # 响应的紧凑摘要（core.retention.CompactResult），步骤完成时生成一次，报告和保留策略共用
+        self.summary: Optional[CompactResult] = None
+        # 耗时以 perf_counter_ns 计（单调时钟，纳秒）
+        self.duration_ns = 0
         self.error = None
+        self.timings = None
+        self.retries: List[RetryRecord] = []
+        self.stream: Optional[StreamingResponseWrapper] = None
+        # 由 request()/stream() 创建的请求步骤的接口（方法 + 路径模板），延迟直方图和压测按它统计
+        self.endpoint: Optional[str] = None
+        # 步骤执行过程中发出的请求
+        self.children: List['TestStep'] = []
+    
+    @property
+    def executed(self) -> bool:
+        return self.status != self.PLANNED
+    
+    @property
+    def is_request(self) -> bool:
+        return self.endpoint is not None
+    
+    @property
+    def duration(self) -> float:
+        return self.duration_ns / 1e9
+    
+    @property
+    def service_duration_ns(self) -> int:
+        return service_duration_ns(self.duration_ns, self.timings)
+    
+    def set_result(self, result: Any):
+        self.status = self.PASSED
+        self.result = result
+        # 请求步骤记录各阶段耗时，便于区分服务端耗时和建连开销
+        if isinstance(result, (ResponseWrapper, StreamingResponseWrapper)):
+            self.timings = result.timings
+            self.retries = result.retries
+        if isinstance(result, StreamingResponseWrapper):
+            self.stream = result
+        else:
+            # 步骤直接返回其中某个请求的响应时复用该请求步骤的摘要，响应体只计算一次哈希
+            reused = next((child.summary for child in self.children if child.result is result), None)
+            self.summary = reused if reused is not None else CompactResult.from_result(result)
+    
+    def set_error(self, error: Exception):
+        self.status = self.TIMED_OUT if isinstance(error, DeadlineExceeded) else self.FAILED
+        self.error = error
+        self.retries = getattr(error, "retries", None) or self.retries
+    
+    @property
+    def retry_time(self) -> float:
+        return sum(record.delay for record in self.retries)
+    
+    def to_dict(self, parent: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "passed": self.status == self.PASSED,
+            "status": self.status,
+            "parent": parent,
+            "duration": self.duration,
+            "timings": self.timings.to_dict() if self.timings is not None else None,
+            "retries": [record.to_dict() for record in self.retries],
+            "retry_time": self.retry_time,
+            # 流式步骤在断言执行（读完响应流）后才有峰值内存
+            "peak_memory_bytes": self.stream.peak_memory_bytes if self.stream is not None else None,
+            "error": str(self.error) if self.error else None,
+            # 与 compact 策略下的报告字段相同：状态码、URL、响应体大小和哈希
+            "response": self._response_summary()
+        }
+
+    def compact_result(self) -> Optional[CompactResult]:
+        # 流式响应在 verify() 读完响应流后才知道读取的字节数，每次按当前状态生成
+        if self.stream is not None:
+            return CompactResult.from_result(self.stream)
+        return self.summary
+
+    def _response_summary(self) -> Optional[Dict[str, Any]]:
+        summary = self.compact_result()
+        return summary.to_dict() if summary is not None else None
 
 
 class TestCase:
-    def __init__(self, name: str, base_url: str = ""):
+    def __init__(self, name: str, base_url: str = "", client: Any = None):
         self.name = name
         self.base_url = base_url
-        self.client = HTTPClient(base_url)
+        self.client = client if client is not None else HTTPClient(base_url)
         self.steps: List[TestStep] = []
         self.setup_hooks: List[Callable] = []
         self.teardown_hooks: List[Callable] = []
         self.variables: Dict[str, Any] = {}
+        # start_time/end_time 为墙钟时间戳，仅用于展示；耗时按单调时钟（perf_counter_ns）计
         self.start_time = 0
         self.end_time = 0
+        self.duration_ns = 0
         self.passed = False
         self.error = None
+        # 当前线程正在执行的步骤，其中发出的请求记录为它的子步骤
+        self._local = threading.local()
+        self._sequence = itertools.count()
+        self._clock_start = time.perf_counter_ns()
+        # 所属套件的接口延迟直方图，未加入套件时不统计
+        self.histograms: Optional[HistogramSet] = None
+        # 声明了依赖的步骤最多同时执行的数量
+        self.max_concurrency = 4
+        self.critical_path: Optional[Dict[str, Any]] = None
+        # 步骤结果保留策略，见 core.retention
+        self.retention = KEEP_ALL
+        # 时间预算（秒）：整个用例（不含后置钩子）和未单独设置 timeout 的步骤，None 表示不限制
+        self.timeout: Optional[float] = None
+        self.step_timeout: Optional[float] = None
+        self.timed_out = False
     
     def setup(self, func: Callable = None):
         if func is not None:
@@ -55,10 +181,22 @@ class TestCase:
         step_name = f"{method.upper()} {endpoint}"
         
         def action():
-            response = self.client.request(method, endpoint, **kwargs)
-            return ResponseWrapper(response)
+            response = ResponseWrapper(self.client.request(method, endpoint, **kwargs))
+            response.variables = self.variables
+            return response
         
-        return self._add_step(step_name, action)
+        return self._add_step(step_name, action, endpoint=endpoint_key(method, endpoint))
+    
+    def stream(self, method: str, endpoint: str, chunk_size: int = 64 * 1024,
+               **kwargs) -> StreamingResponseWrapper:
+        """发送请求但不读取响应体，返回可在流上执行路径断言的 StreamingResponseWrapper"""
+        step_name = f"{method.upper()} {endpoint} (stream)"
+        
+        def action():
+            response = self.client.request(method, endpoint, stream=True, **kwargs)
+            return StreamingResponseWrapper(response, chunk_size)
+        
+        return self._add_step(step_name, action, endpoint=endpoint_key(method, endpoint))
     
     def get(self, endpoint: str, **kwargs) -> ResponseWrapper:
         return self.request("GET", endpoint, **kwargs)
@@ -72,62 +210,172 @@ class TestCase:
     def delete(self, endpoint: str, **kwargs) -> ResponseWrapper:
         return self.request("DELETE", endpoint, **kwargs)
     
-    def step(self, name: str) -> Callable:
+    def step(self, name: str, requires: Optional[List[str]] = None,
+             provides: Optional[List[str]] = None, timeout: Optional[float] = None) -> Callable:
+        """
+        把函数登记为一个延迟执行的步骤，run() 时执行且只执行一次
+
+        返回的包装函数也可以直接调用：步骤尚未执行时立即执行它并返回结果，
+        已执行过则作为一个新的步骤再执行一次。
+        requires/provides/timeout 见 plan()。
+        """
         def decorator(func: Callable) -> Callable:
+            planned = self.plan(name, func, requires, provides, timeout)
+            
             def wrapper(*args, **kwargs):
-                return self._add_step(name, lambda: func(*args, **kwargs))
+                if not planned.executed and not args and not kwargs:
+                    return self._execute(planned)
+                return self._add_step(name, lambda: func(*args, **kwargs), timeout=timeout)
+            wrapper.step = planned
             return wrapper
         return decorator
     
-    def _add_step(self, name: str, action: Callable) -> Any:
-        step = TestStep(name, action)
+    def plan(self, name: str, action: Callable, requires: Optional[List[str]] = None,
+             provides: Optional[List[str]] = None, timeout: Optional[float] = None) -> TestStep:
+        """
+        登记一个步骤但不执行，run() 时执行
+
+        requires/provides 声明步骤读取和通过 set_variable 写入的变量：声明了的步骤只等待
+        提供其所需变量的步骤完成，互不依赖的步骤并发执行（最多 max_concurrency 个）。
+        两者都没有声明的步骤按登记顺序执行，与之前的所有步骤串行。
+        timeout 为步骤的时间预算（秒），步骤内的请求超时取剩余预算，超出时步骤记为超时。
+        """
+        step = TestStep(name, action, requires, provides, timeout)
         self.steps.append(step)
-        
-        start_time = time.time()
+        return step
+    
+    def dry_run(self) -> List[Dict[str, Any]]:
+        """列出执行计划（不发出任何请求）"""
+        dependencies = build_dependencies(self.steps)
+        index_of = {step: index for index, step in enumerate(self.steps)}
+        return [
+            {
+                "index": index,
+                "name": step.name,
+                "status": step.status,
+                "depends_on": sorted(index_of[dep] for dep in dependencies[step])
+            }
+            for index, step in enumerate(self.steps)
+        ]
+    
+    def _running_step(self) -> Optional[TestStep]:
+        return getattr(self._local, "step", None)
+    
+    def _add_step(self, name: str, action: Callable, endpoint: Optional[str] = None,
+                  timeout: Optional[float] = None) -> Any:
+        """立即执行一个步骤（调用方需要马上拿到结果），run() 不会再次执行它"""
+        step = TestStep(name, action, timeout=timeout)
+        step.endpoint = endpoint
+        parent = self._running_step()
+        if parent is not None:
+            parent.children.append(step)
+        else:
+            self.steps.append(step)
+        return self._execute(step)
+    
+    def _execute(self, step: TestStep) -> Any:
+        parent = self._running_step()
+        self._local.step = step
+        step.sequence = next(self._sequence)
+        start = time.perf_counter_ns()
+        step.started_at = (start - self._clock_start) / 1e9
+        # 请求步骤在所属步骤的预算内执行，不单独使用 step_timeout
+        timeout = step.timeout if step.timeout is not None or step.is_request else self.step_timeout
         try:
-            result = action()
-            step.duration = time.time() - start_time
-            step.result = result
+            with deadline_scope(timeout, f"步骤 {step.name}"):
+                check_deadline()
+                result = step.action()
+            missing = [name for name in step.provides if name not in self.variables]
+            if missing:
+                raise AssertionError(f"步骤没有设置声明提供的变量: {', '.join(missing)}")
+            step.duration_ns = time.perf_counter_ns() - start
+            step.set_result(result)
             return result
         except Exception as e:
-            step.duration = time.time() - start_time
-            step.error = e
+            step.duration_ns = time.perf_counter_ns() - start
+            step.set_error(e)
             raise
+        finally:
+            step.finished_at = step.started_at + step.duration
+            self._local.step = parent
+            if step.endpoint is not None and self.histograms is not None:
+                self.histograms.record(step.endpoint, step.service_duration_ns)
     
     def assert_that(self, response: ResponseWrapper) -> AssertionChain:
         return AssertionChain(response)
     
+    def latency_series(self, endpoint: Optional[str] = None, step: Optional[str] = None) -> LatencySeries:
+        """
+        用例中已执行的请求步骤组成的样本序列
+
+        endpoint 为接口（"GET /users/{id}"，ID 段会归并为 {id}），step 为发出请求的步骤名，都为 None 时取所有请求。
+        """
+        if endpoint is not None:
+            endpoint = endpoint_key(*endpoint.split(" ", 1))
+        series = LatencySeries(endpoint or step or self.name)
+        offset = self._clock_start / 1e9
+        for parent in self.steps:
+            if step is not None and parent.name != step:
+                continue
+            for request_step in [parent] + parent.children:
+                if not request_step.is_request or not request_step.executed:
+                    continue
+                if endpoint is None or request_step.endpoint == endpoint:
+                    series.record_step(request_step, offset)
+        return series
+    
+    def slo(self, endpoint: Optional[str] = None, step: Optional[str] = None) -> SLOAssertions:
+        """按分位数、错误率和吞吐对一组请求做聚合断言，如 case.slo("GET /items").p95_less_than(800)"""
+        return SLOAssertions(self.latency_series(endpoint, step))
+    
     def run(self) -> bool:
         self.start_time = time.time()
+        start = time.perf_counter_ns()
+        # 在 run() 之前已经立即执行的步骤也计入用例耗时
+        pre_run_duration = sum(step.duration_ns for step in self.steps if step.executed)
         
         try:
-            # 执行前置钩子
-            for hook in self.setup_hooks:
-                hook(self)
+            # 用例的时间预算覆盖前置钩子和步骤；后置钩子不受任何预算限制，预算耗尽后清理动作仍会执行
+            with deadline_scope(self.timeout, f"用例 {self.name}"):
+                check_deadline()
+                
+                # 执行前置钩子
+                for hook in self.setup_hooks:
+                    hook(self)
+                
+                # 执行尚未执行的步骤；已经执行过的（包括前置钩子中发出的请求）不再重复执行
+                if any(step.requires or step.provides for step in self.steps):
+                    self._run_graph()
+                else:
+                    index = 0
+                    while index < len(self.steps):
+                        step = self.steps[index]
+                        index += 1
+                        if step.executed:
+                            continue
+                        try:
+                            self._execute(step)
+                        except Exception:
+                            break
+            self.critical_path = find_critical_path(self.steps, build_dependencies(self.steps))
             
-            # 执行测试步骤
-            for step in self.steps:
-                step_start = time.time()
-                try:
-                    step.result = step.action()
-                    step.duration = time.time() - step_start
-                except Exception as e:
-                    step.duration = time.time() - step_start
-                    step.error = e
-                    self.error = e
-                    self.passed = False
-                    break
+            failed = next((step for step in self.steps
+                           if step.status in (TestStep.FAILED, TestStep.TIMED_OUT)), None)
+            if failed is not None:
+                self.error = failed.error
+                self.passed = False
             else:
                 self.passed = True
             
             # 执行后置钩子
-            for hook in self.teardown_hooks:
-                try:
-                    hook(self)
-                except Exception as e:
-                    if self.passed:
-                        self.error = e
-                        self.passed = False
+            with no_deadline():
+                for hook in self.teardown_hooks:
+                    try:
+                        hook(self)
+                    except Exception as e:
+                        if self.passed:
+                            self.error = e
+                            self.passed = False
         
         except Exception as e:
             self.error = e
@@ -135,16 +383,71 @@ class TestCase:
         
         finally:
             self.end_time = time.time()
+            self.duration_ns = time.perf_counter_ns() - start + pre_run_duration
+            self.timed_out = isinstance(self.error, DeadlineExceeded)
             self.client.close()
+            self._apply_retention()
         
         return self.passed
     
+    def set_retention(self, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的结果保留策略: {policy}")
+        self.retention = policy
+    
+    def _apply_retention(self):
+        """执行结束后按保留策略把步骤替换为紧凑记录，释放响应对象"""
+        if self.retention == KEEP_ALL or (self.retention == KEEP_FAILURES and not self.passed):
+            return
+        self.steps = compact_steps(self.steps, summarize=self.retention == COMPACT)
+        # 异常（及其链上的异常）的 traceback 引用着执行时的栈帧，包括其中的响应对象
+        error = self.error
+        while error is not None:
+            error.__traceback__ = None
+            error = error.__cause__ or error.__context__
+    
+    def _run_graph(self):
+        """依赖满足的步骤并发执行；有步骤失败后不再启动新的步骤，等待已启动的步骤结束"""
+        dependencies = build_dependencies(self.steps)
+        pending = [step for step in self.steps if not step.executed]
+        running = {}
+        failed = False
+        with ThreadPoolExecutor(max_workers=max(self.max_concurrency, 1),
+                                thread_name_prefix=f"{self.name}-step") as executor:
+            while pending or running:
+                if not failed:
+                    ready = [step for step in pending
+                             if all(dep.status == TestStep.PASSED for dep in dependencies[step])]
+                    for step in ready[:max(self.max_concurrency - len(running), 0)]:
+                        pending.remove(step)
+                        # 工作线程继承当前的时间预算
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, self._execute, step)] = step
+                if not running:
+                    # 剩余步骤的依赖失败或未执行，保持未执行状态
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    if future.exception() is not None:
+                        failed = True
+    
     def get_duration(self) -> float:
-        return self.end_time - self.start_time
+        return self.duration_ns / 1e9
+    
+    def _flatten_steps(self) -> List[Dict[str, Any]]:
+        steps = []
+        # 已执行的步骤按执行顺序排列，未执行的步骤按计划顺序排在最后
+        ordered = sorted(self.steps, key=lambda s: (s.sequence is None, s.sequence or 0))
+        for step in ordered:
+            steps.append(step.to_dict())
+            steps.extend(child.to_dict(parent=step.name) for child in step.children)
+        return steps
     
     def get_summary(self) -> Dict[str, Any]:
-        passed_steps = len([s for s in self.steps if s.error is None])
-        total_steps = len(self.steps)
+        steps = self._flatten_steps()
+        passed_steps = len([s for s in steps if s["passed"]])
+        total_steps = len(steps)
         
         return {
             "name": self.name,
@@ -152,20 +455,156 @@ class TestCase:
             "duration": self.get_duration(),
             "steps_passed": passed_steps,
             "steps_total": total_steps,
-            "error": str(self.error) if self.error else None
+            "error": str(self.error) if self.error else None,
+            "timed_out": self.timed_out,
+            "critical_path": self.critical_path,
+            "steps": steps
         }
 
 
 class TestSuite:
-    def __init__(self, name: str):
+    def __init__(self, name: str, pool: Optional[ConnectionPool] = None):
         self.name = name
+        self.pool = pool if pool is not None else ConnectionPool()
         self.test_cases: List[TestCase] = []
         self.setup_hooks: List[Callable] = []
         self.teardown_hooks: List[Callable] = []
+        self._loop_thread: Optional[EventLoopThread] = None
+        self._connector = None
+        self._async_options: Optional[Dict[str, int]] = None
+        self.cassette: Optional[Cassette] = None
+        self.login_fixture = None
+        # 未设置时保留用例自己的策略
+        self.retention: Optional[str] = None
+        # 时间预算（秒）：整个套件、每个用例、每个步骤，None 表示不限制
+        self.timeout: Optional[float] = None
+        self.case_timeout: Optional[float] = None
+        self.step_timeout: Optional[float] = None
+        # 所有用例的请求按接口汇总到同一组延迟直方图
+        self.histograms = HistogramSet()
     
     def add_test_case(self, test_case: TestCase):
+        self.attach(test_case)
         self.test_cases.append(test_case)
     
+    def slo(self, endpoint: Optional[str] = None) -> SLOAssertions:
+        """所有用例中请求的聚合断言（见 TestCase.slo）"""
+        series = LatencySeries(endpoint or self.name)
+        for test_case in self.test_cases:
+            series.merge(test_case.latency_series(endpoint))
+        return SLOAssertions(series)
+    
+    def attach(self, test_case: TestCase):
+        """让用例使用套件的连接池/异步客户端、录制文件和登录夹具，但不加入套件（压测时每轮迭代创建新用例）"""
+        if self._loop_thread is not None:
+            self._attach_async_client(test_case)
+        else:
+            self.pool.attach(test_case.client)
+        if self.cassette is not None:
+            test_case.client.use_cassette(self.cassette)
+        if self.login_fixture is not None:
+            test_case.setup_hooks.insert(0, self.login_fixture.apply)
+        if self.retention is not None:
+            test_case.set_retention(self.retention)
+        self._apply_timeouts(test_case)
+        test_case.histograms = self.histograms
+    
+    def set_timeouts(self, suite: Optional[float] = None, case: Optional[float] = None,
+                     step: Optional[float] = None):
+        """
+        设置时间预算：套件 → 用例 → 步骤 → 请求逐级传递，内层预算不会超过外层剩余的时间
+
+        请求超时取剩余预算，重试等待超出预算时不再重试；超出预算的用例和步骤记为超时
+        （timed_out），与断言失败分开统计。用例/步骤已单独设置的预算保持不变。
+        """
+        self.timeout = suite
+        self.case_timeout = case
+        self.step_timeout = step
+        for test_case in self.test_cases:
+            self._apply_timeouts(test_case)
+    
+    def _apply_timeouts(self, test_case: TestCase):
+        if test_case.timeout is None:
+            test_case.timeout = self.case_timeout
+        if test_case.step_timeout is None:
+            test_case.step_timeout = self.step_timeout
+    
+    def set_retention(self, policy: str):
+        """所有用例的步骤结果保留策略：all（默认）/ failures / compact，长时间运行时避免内存持续增长"""
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的结果保留策略: {policy}")
+        self.retention = policy
+        for test_case in self.test_cases:
+            test_case.set_retention(policy)
+    
+    def use_login(self, fixture: Any):
+        """所有用例在前置钩子之前应用登录夹具（core.fixtures.LoginFixture），同一凭据只登录一次"""
+        self.login_fixture = fixture
+        for test_case in self.test_cases:
+            test_case.setup_hooks.insert(0, fixture.apply)
+    
+    def use_cassette(self, path: str, mode: str = Cassette.REPLAY, speed: str = Cassette.FAST) -> Cassette:
+        """
+        录制真实请求到文件，或从文件回放（不访问网络），运行结束后自动保存录制内容
+
+        录制回放基于 requests 的传输适配器，不能与 use_async_client 同时使用。
+        """
+        if self._loop_thread is not None:
+            raise ValueError("录制回放不支持异步客户端，不能与 use_async_client 同时使用")
+        self.cassette = Cassette(path, mode, speed)
+        for test_case in self.test_cases:
+            test_case.client.use_cassette(self.cassette)
+        return self.cassette
+    
+    def set_connection_pool(self, pool: ConnectionPool):
+        """替换连接池，多个套件可以共享同一个连接池"""
+        self.pool = pool
+        for test_case in self.test_cases:
+            self.pool.attach(test_case.client)
+    
+    def use_async_client(self, limit: int = 100, limit_per_host: int = 10):
+        """所有用例改用共享同一事件循环和连接器的 AsyncHTTPClient，用例代码无需修改（不支持录制回放）"""
+        if self.cassette is not None:
+            raise ValueError("录制回放不支持异步客户端，不能与 use_cassette 同时使用")
+        if self._loop_thread is None:
+            self._loop_thread = EventLoopThread()
+            self._connector = self._loop_thread.create_connector(limit, limit_per_host)
+        self._async_options = {"limit": limit, "limit_per_host": limit_per_host}
+        for test_case in self.test_cases:
+            self._attach_async_client(test_case)
+    
+    def _attach_async_client(self, test_case: TestCase):
+        old_client = test_case.client
+        if isinstance(old_client, SyncAsyncHTTPClient):
+            return
+        async_client = AsyncHTTPClient(
+            test_case.base_url,
+            timeout=getattr(old_client, "timeout", 30),
+            connector=self._connector,
+            retry_policy=getattr(old_client, "retry_policy", None),
+            rate_limiter=getattr(old_client, "rate_limiter", None),
+            **self._async_options
+        )
+        # 保留用例构造时已经设置的请求头和Cookie
+        if isinstance(old_client, HTTPClient):
+            async_client.set_headers(dict(old_client.session.headers))
+            async_client.set_cookies(old_client.get_cookies())
+            old_client.close()
+        test_case.client = SyncAsyncHTTPClient(async_client, self._loop_thread)
+        test_case.client.set_authenticator(getattr(old_client, "authenticator", None))
+    
+    def dry_run(self) -> Dict[str, List[Dict[str, Any]]]:
+        """列出每个用例的执行计划（不发出任何请求）"""
+        return {test_case.name: test_case.dry_run() for test_case in self.test_cases}
+    
+    def close(self):
+        if self._loop_thread is not None:
+            if self._connector is not None:
+                self._loop_thread.run(self._connector.close())
+            self._loop_thread.stop()
+            self._loop_thread = None
+            self._connector = None
+    
     def setup(self, func: Callable) -> Callable:
         self.setup_hooks.append(func)
         return func
@@ -174,39 +613,135 @@ class TestSuite:
         self.teardown_hooks.append(func)
         return func
     
-    def run(self) -> Dict[str, Any]:
+    def _check_isolation(self):
+        clients = {id(test_case.client) for test_case in self.test_cases}
+        if len(clients) != len(self.test_cases):
+            raise ValueError("并行执行要求每个测试用例使用独立的客户端")
+    
+    @staticmethod
+    def _run_case(test_case: TestCase) -> Dict[str, Any]:
+        start = time.perf_counter_ns()
+        passed = test_case.run()
+        return {
+            "passed": passed,
+            "worker": threading.current_thread().name,
+            "busy": (time.perf_counter_ns() - start) / 1e9
+        }
+    
+    def run(self, workers: int = 1,
+            on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        执行所有测试用例
+
+        workers > 1 时用例在线程池中并行执行：每个用例使用自己的客户端（Cookie 独立）和变量，
+        结果按用例添加顺序返回，套件的前置/后置钩子仍只执行一次。
+        on_result(用例下标, 用例结果) 在每个用例完成时立即调用（并行时在工作线程中调用）。
+        套件预算（set_timeouts）耗尽后，尚未开始的用例直接记为超时。
+        """
         results = {
             "suite_name": self.name,
             "total_cases": len(self.test_cases),
             "passed_cases": 0,
             "failed_cases": 0,
+            "timed_out_cases": 0,
             "start_time": time.time(),
             "results": []
         }
-        
-        # 执行套件前置钩子
-        for hook in self.setup_hooks:
-            hook()
+        start = time.perf_counter_ns()
+        workers = max(1, min(workers, len(self.test_cases) or 1))
+        if workers > 1:
+            self._check_isolation()
         
         # 执行测试用例
-        for test_case in self.test_cases:
-            passed = test_case.run()
+        def run_case(index: int) -> Dict[str, Any]:
+            outcome = self._run_case(self.test_cases[index])
+            if on_result is not None:
+                on_result(index, self.test_cases[index].get_summary())
+            return outcome
+        
+        with deadline_scope(self.timeout, f"套件 {self.name}"):
+            # 执行套件前置钩子
+            for hook in self.setup_hooks:
+                hook()
             
-            if passed:
+            wall_start = time.perf_counter_ns()
+            indices = range(len(self.test_cases))
+            if workers > 1:
+                # 每个用例在自己的上下文副本中执行，继承套件的时间预算
+                contexts = [contextvars.copy_context() for _ in indices]
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}-worker") as executor:
+                    outcomes = list(executor.map(lambda index: contexts[index].run(run_case, index), indices))
+            else:
+                outcomes = [run_case(index) for index in indices]
+            wall_time = (time.perf_counter_ns() - wall_start) / 1e9
+        
+        for test_case, outcome in zip(self.test_cases, outcomes):
+            if outcome["passed"]:
                 results["passed_cases"] += 1
             else:
                 results["failed_cases"] += 1
+            if test_case.timed_out:
+                results["timed_out_cases"] += 1
             
             results["results"].append(test_case.get_summary())
         
         # 执行套件后置钩子
-        for hook in self.teardown_hooks:
-            try:
-                hook()
-            except Exception:
-                pass
+        with no_deadline():
+            for hook in self.teardown_hooks:
+                try:
+                    hook()
+                except Exception:
+                    pass
         
         results["end_time"] = time.time()
-        results["duration"] = results["end_time"] - results["start_time"]
+        results["duration"] = (time.perf_counter_ns() - start) / 1e9
+        results["parallel"] = parallel_stats(workers, wall_time, outcomes)
+        results["connection_pool"] = self.pool.stats()
+        results["latency"] = self.histograms.summary()
+        # 可序列化的直方图快照，多进程执行时由父进程合并
+        results["latency_histograms"] = self.histograms.snapshot()
         
-        return results
\ No newline at end of file
+        if self.cassette is not None:
+            self.cassette.save()
+        
+        return results
+
+
+def parallel_stats(workers: int, wall_time: float, outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """并行执行统计：加速比 = 各用例耗时之和 / 实际墙钟时间"""
+    busy: Dict[str, Dict[str, Any]] = {}
+    for outcome in outcomes:
+        worker = busy.setdefault(outcome["worker"], {"cases": 0, "busy_time": 0.0})
+        worker["cases"] += 1
+        worker["busy_time"] += outcome["busy"]
+    for worker in busy.values():
+        worker["utilization"] = round(worker["busy_time"] / wall_time, 3) if wall_time > 0 else 0.0
+    case_time = sum(outcome["busy"] for outcome in outcomes)
+    return {
+        "workers": workers,
+        "wall_time": wall_time,
+        "case_time": case_time,
+        "speedup": round(case_time / wall_time, 2) if wall_time > 0 else 1.0,
+        "worker_busy": busy
+    }
+
+
+def merge_parallel_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个套件的并行执行统计（套件之间顺序执行，墙钟时间相加）"""
+    wall_time = sum(item["wall_time"] for item in stats)
+    case_time = sum(item["case_time"] for item in stats)
+    busy: Dict[str, Dict[str, Any]] = {}
+    for item in stats:
+        for name, worker in item["worker_busy"].items():
+            merged = busy.setdefault(name, {"cases": 0, "busy_time": 0.0})
+            merged["cases"] += worker["cases"]
+            merged["busy_time"] += worker["busy_time"]
+    for worker in busy.values():
+        worker["utilization"] = round(worker["busy_time"] / wall_time, 3) if wall_time > 0 else 0.0
+    return {
+        "workers": max((item["workers"] for item in stats), default=1),
+        "wall_time": wall_time,
+        "case_time": case_time,
+        "speedup": round(case_time / wall_time, 2) if wall_time > 0 else 1.0,
+        "worker_busy": busy
+    }
@@ -0,0 +1,188 @@
+import socket
+import threading
+import time
+from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class RequestTimings:
+    """单个请求的耗时分解（秒）和收发字节数"""
+
+    __slots__ = ("dns", "connect", "tls", "ttfb", "transfer", "total", "bytes_sent", "bytes_received",
+                 "queue_wait", "new_connection", "start", "request_sent", "first_byte")
+
+    def __init__(self):
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.ttfb = 0.0
+        self.transfer = 0.0
+        self.total = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        # 在本地限流器中排队的时间，不属于服务端耗时，也不计入 total
+        self.queue_wait = 0.0
+        # 复用已有连接时 dns/connect/tls 均为 0
+        self.new_connection = False
+        # 各阶段的时间点（perf_counter），仅在采集过程中使用
+        self.start = 0.0
+        self.request_sent = 0.0
+        self.first_byte = 0.0
+
+    @property
+    def connection_setup(self) -> float:
+        return self.dns + self.connect + self.tls
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dns_ms": round(self.dns * 1000, 3),
+            "connect_ms": round(self.connect * 1000, 3),
+            "tls_ms": round(self.tls * 1000, 3),
+            "ttfb_ms": round(self.ttfb * 1000, 3),
+            "transfer_ms": round(self.transfer * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+            "queue_ms": round(self.queue_wait * 1000, 3),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "new_connection": self.new_connection
+        }
+
+    def __repr__(self) -> str:
+        return (f"RequestTimings(dns={self.dns * 1000:.1f}ms, connect={self.connect * 1000:.1f}ms, "
+                f"tls={self.tls * 1000:.1f}ms, ttfb={self.ttfb * 1000:.1f}ms, "
+                f"transfer={self.transfer * 1000:.1f}ms, total={self.total * 1000:.1f}ms)")
+
+
+def service_duration_ns(duration_ns: int, timings: Optional[RequestTimings]) -> int:
+    """请求步骤的耗时减去在本地限流器中排队的时间，延迟直方图、压测和 SLO 按它统计"""
+    if timings is None:
+        return duration_ns
+    return max(duration_ns - int(timings.queue_wait * 1e9), 0)
+
+
+# 当前线程正在采集的请求，连接层通过它回填各阶段耗时
+_local = threading.local()
+
+
+def start_recording() -> RequestTimings:
+    timings = RequestTimings()
+    timings.start = time.perf_counter()
+    _local.timings = timings
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return getattr(_local, "timings", None)
+
+
+def stop_recording():
+    _local.timings = None
+
+
+def _body_length(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return len(body)
+    return 0
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        timings = current_timings()
+        if timings is None:
+            return super()._new_conn()
+
+        # 先单独解析域名以区分 DNS 和 TCP 建连耗时
+        dns_start = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            address = socket.getaddrinfo(dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            address = None
+        connect_start = time.perf_counter()
+        timings.dns = connect_start - dns_start
+
+        if address is not None:
+            self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        timings.connect = time.perf_counter() - connect_start
+        timings.new_connection = True
+        return sock
+
+    def connect(self):
+        timings = current_timings()
+        start = time.perf_counter()
+        super().connect()
+        if timings is not None and isinstance(self, HTTPSConnection):
+            timings.tls = max(time.perf_counter() - start - timings.dns - timings.connect, 0.0)
+
+    def request(self, method, url, body=None, headers=None, **kwargs):
+        super().request(method, url, body=body, headers=headers, **kwargs)
+        timings = current_timings()
+        if timings is not None:
+            timings.request_sent = time.perf_counter()
+            header_bytes = sum(len(k) + len(str(v)) + 4 for k, v in (headers or {}).items())
+            timings.bytes_sent += len(method) + len(url) + 12 + header_bytes + 2 + _body_length(body)
+
+    def getresponse(self):
+        response = super().getresponse()
+        timings = current_timings()
+        if timings is not None:
+            timings.first_byte = time.perf_counter()
+            timings.ttfb = timings.first_byte - (timings.request_sent or timings.start)
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """在 urllib3 连接层采集 DNS/建连/TLS/首字节耗时的适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool
+        }
+
+
+def finish_recording(timings: RequestTimings, response: Any):
+    """请求完成（响应体已读取）后补全传输耗时和接收字节数"""
+    end = time.perf_counter()
+    timings.total = end - timings.start
+    if timings.first_byte:
+        timings.transfer = end - timings.first_byte
+
+    raw = getattr(response, "raw", None)
+    body_bytes = 0
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            body_bytes = raw.tell()
+        except Exception:
+            body_bytes = 0
+    if not body_bytes:
+        body_bytes = len(getattr(response, "_content", None) or b"")
+    header_bytes = sum(len(k) + len(str(v)) + 4 for k, v in response.headers.items())
+    timings.bytes_received = 17 + header_bytes + 2 + body_bytes
@@ -3,13 +3,365 @@
 API测试框架主运行脚本
 """
 import argparse
+import functools
+import importlib
+import multiprocessing
+import queue
 import sys
 import os
+import time
+import traceback
 from core.reporter import Reporter
-from tests.test_user_api import create_user_test_suite
-from tests.test_post_api import create_post_test_suite
-from tests.test_login_api import create_login_test_suite
-from tests.test_dongjing_login_api import run_dongjing_login_tests
+from core.load import LoadTest, ArrivalRateTest
+from core.connection_pool import ConnectionPool
+from core.retry import RetryPolicy, CircuitBreakerRegistry
+from core.cache import ResponseCache
+from core.rate_limiter import RateLimiter
+from core.test_case import merge_parallel_stats, parallel_stats
+from core.histogram import HistogramSet, merge_snapshots
+from core import snapshot
+from core.sharding import (
+    encode_message, decode_message, duration_key, load_durations, save_durations, plan_shards,
+    merge_pool_stats, merge_limiter_stats, merge_counter_stats
+)
+from config.config import config
+
+
+# 套件名 -> (模块, 创建函数)，按需导入，子进程可以按名称重新创建套件
+SUITE_FACTORIES = {
+    'user': ('tests.test_user_api', 'create_user_test_suite'),
+    'post': ('tests.test_post_api', 'create_post_test_suite'),
+    'login': ('tests.test_login_api', 'create_login_test_suite'),
+}
+
+
+def create_suite(key):
+    module_name, factory_name = SUITE_FACTORIES[key]
+    return getattr(importlib.import_module(module_name), factory_name)()
+
+
+def suite_case_scenario(key, index):
+    """压测场景：重新创建套件并取出其中一个用例（套件的其它用例不执行）"""
+    suite = create_suite(key)
+    for position, test_case in enumerate(suite.test_cases):
+        if position != index:
+            test_case.client.close()
+    return suite.test_cases[index]
+
+
+def run_dongjing_suite():
+    # 东经平台测试使用专门的运行函数
+    from tests.test_dongjing_login_api import run_dongjing_login_tests
+    dongjing_results = run_dongjing_login_tests()
+    # 将结果转换为标准格式
+    return {
+        'name': '东经平台登录测试',
+        'total_cases': len(dongjing_results),
+        'passed_cases': sum(1 for r in dongjing_results if r['status'] == 'PASSED'),
+        'failed_cases': sum(1 for r in dongjing_results if r['status'] == 'FAILED'),
+        'duration': 0,  # 东经测试不单独计算时间
+        'results': [{
+            'name': r['test_name'],
+            'passed': r['status'] == 'PASSED',
+            'steps_passed': 1 if r['status'] == 'PASSED' else 0,
+            'steps_total': 1,
+            'duration': 0,
+            'error': r.get('error', '')
+        } for r in dongjing_results]
+    }
+
+
+class RunContext:
+    """一个进程内所有套件共享的连接池、熔断器和限流器"""
+
+    def __init__(self, args, share=1):
+        self.args = args
+        # 所有套件共享一个连接池，同一主机的用例复用连接
+        self.pool = ConnectionPool.from_config(config.get_framework_config())
+        # 熔断器按接口在所有用例间共享，重试预算按客户端独立
+        self.breakers = CircuitBreakerRegistry(
+            failure_threshold=config.get_framework_config('retry.failure_threshold', 5),
+            recovery_timeout=config.get_framework_config('retry.recovery_timeout', 30)
+        )
+        # 快照断言的默认目录，--update-snapshots 时以本次响应重新生成快照
+        snapshot.default_store.directory = config.get_framework_config('snapshot.directory', 'snapshots')
+        snapshot.default_store.update = args.update_snapshots
+        # 限流器按主机在所有客户端之间共享，多进程时每个进程分得一部分配额
+        self.rate_limiter = RateLimiter.from_environments(config.environments, share)
+        self.suites = []
+
+    def configure(self, suite):
+        suite.set_connection_pool(self.pool)
+        suite.set_retention(self.args.retention or config.get_framework_config('retention', 'all'))
+        suite.set_timeouts(
+            suite=self._timeout(self.args.suite_timeout, 'deadline.suite'),
+            case=self._timeout(self.args.case_timeout, 'deadline.case'),
+            step=self._timeout(self.args.step_timeout, 'deadline.step')
+        )
+        for test_case in suite.test_cases:
+            test_case.client.set_retry_policy(
+                RetryPolicy.from_config(config.get_framework_config(), self.breakers)
+            )
+            test_case.client.set_rate_limiter(self.rate_limiter)
+            # 缓存按客户端独立，避免不同登录用户之间共享响应
+            if config.get_framework_config('cache.enabled', False):
+                test_case.client.enable_cache(ResponseCache.from_config(config.get_framework_config()))
+        if self.args.cassette_dir:
+            cassette_path = os.path.join(self.args.cassette_dir, f"{suite.name}.json.gz")
+            suite.use_cassette(cassette_path, self.args.cassette_mode, self.args.replay_speed)
+        self.suites.append(suite)
+
+    @staticmethod
+    def _timeout(value, key):
+        # 命令行参数优先于 framework.deadline 配置，0 表示不限制
+        value = value if value is not None else config.get_framework_config(key)
+        return value or None
+
+    def stats(self):
+        stats = {
+            "connection_pool": self.pool.stats(),
+            "rate_limiter": self.rate_limiter.stats()
+        }
+        cache_stats = [test_case.client.cache.stats() for suite in self.suites
+                       for test_case in suite.test_cases if getattr(test_case.client, 'cache', None) is not None]
+        if cache_stats:
+            stats["response_cache"] = merge_counter_stats([
+                {key: item[key] for key in ("hits", "misses", "revalidations", "stores", "evictions")}
+                for item in cache_stats
+            ])
+        return stats
+
+    def close(self):
+        self.pool.close()
+
+
+def print_suite_result(result):
+    # 打印套件结果
+    print(f"测试用例总数: {result['total_cases']}")
+    print(f"通过用例数: {result['passed_cases']}")
+    print(f"失败用例数: {result['failed_cases']}")
+    if result.get('timed_out_cases'):
+        print(f"  其中超时: {result['timed_out_cases']}")
+    print(f"执行时间: {result['duration']:.2f}秒")
+    
+    # 打印每个用例的详细结果
+    for case_result in result['results']:
+        status = "✅ 通过" if case_result['passed'] else "⏱ 超时" if case_result.get('timed_out') else "❌ 失败"
+        print(f"  {status} - {case_result['name']} "
+              f"({case_result['steps_passed']}/{case_result['steps_total']} 步骤, "
+              f"{case_result['duration']:.2f}秒)")
+        
+        if case_result['error']:
+            print(f"    错误: {case_result['error']}")
+
+
+def print_plan(suite_keys):
+    for key in suite_keys:
+        suite = create_suite(key)
+        print(f"\n测试套件: {suite.name}")
+        for case_name, steps in suite.dry_run().items():
+            print(f"  用例: {case_name}")
+            for step in steps:
+                marker = "" if step['status'] == 'planned' else f" [{step['status']}]"
+                print(f"    {step['index'] + 1}. {step['name']}{marker}")
+        for test_case in suite.test_cases:
+            test_case.client.close()
+
+
+def run_local(args, suite_keys):
+    """在当前进程中依次执行各套件（套件内可按 --workers 并行）"""
+    context = RunContext(args)
+    for key in suite_keys:
+        context.configure(create_suite(key))
+    
+    all_results = []
+    for suite in context.suites:
+        print(f"\n执行测试套件: {suite.name}")
+        print("-" * 40)
+        result = suite.run(workers=args.workers)
+        all_results.append(result)
+        print_suite_result(result)
+    
+    stats = context.stats()
+    context.close()
+    return all_results, stats
+
+
+def _shard_worker(args, shard_id, shard, channel):
+    """子进程：重新创建分到的套件和用例并执行，每完成一个用例立即把结果发回父进程"""
+    try:
+        context = RunContext(args, share=args.processes)
+        cases_by_suite = {}
+        for key, index, _ in shard:
+            cases_by_suite.setdefault(key, []).append(index)
+        
+        for key, indices in cases_by_suite.items():
+            suite = create_suite(key)
+            suite.test_cases = [suite.test_cases[index] for index in indices]
+            context.configure(suite)
+            
+            def on_result(position, summary, key=key, indices=indices):
+                channel.put(("case", shard_id, key, indices[position], encode_message(summary)))
+            
+            result = suite.run(workers=args.workers, on_result=on_result)
+            channel.put(("suite", shard_id, key, None, encode_message({
+                "duration": result["duration"],
+                "parallel": result["parallel"],
+                "latency_histograms": result["latency_histograms"]
+            })))
+        
+        stats = context.stats()
+        context.close()
+        channel.put(("done", shard_id, None, None, encode_message(stats)))
+    except Exception:
+        channel.put(("error", shard_id, None, None, encode_message(traceback.format_exc())))
+
+
+def run_sharded(args, suite_keys):
+    """
+    多进程执行：按历史用例耗时把用例均衡地分配到 --processes 个进程
+
+    套件在每个分到其用例的进程中各创建一次，因此套件的前置/后置钩子按进程执行。
+    """
+    if args.cassette_dir and args.cassette_mode == 'record':
+        print("错误: 录制模式不支持多进程执行")
+        sys.exit(1)
+    
+    # 在父进程中创建一次套件，只用于列出用例
+    suite_names = {}
+    cases = []
+    for key in suite_keys:
+        suite = create_suite(key)
+        suite_names[key] = suite.name
+        for index, test_case in enumerate(suite.test_cases):
+            cases.append((key, index, test_case.name))
+            test_case.client.close()
+    
+    durations = load_durations(args.report_dir)
+    shards = plan_shards(cases, durations, args.processes) if cases else []
+    print(f"多进程执行: {len(shards)} 个进程, {len(cases)} 个用例")
+    
+    channel = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_shard_worker, args=(args, shard_id, shard, channel), daemon=True)
+        for shard_id, shard in enumerate(shards)
+    ]
+    wall_start = time.perf_counter_ns()
+    for process in processes:
+        process.start()
+    
+    case_results = {}
+    suite_runs = {}
+    shard_stats = []
+    pending = set(range(len(processes)))
+    while pending:
+        try:
+            kind, shard_id, key, index, payload = channel.get(timeout=1)
+        except queue.Empty:
+            for shard_id in list(pending):
+                if not processes[shard_id].is_alive():
+                    print(f"错误: 进程 {shard_id} 异常退出 (exitcode={processes[shard_id].exitcode})")
+                    pending.discard(shard_id)
+            continue
+        message = decode_message(payload)
+        if kind == "case":
+            case_results[(key, index)] = (shard_id, message)
+            status = "✅ 通过" if message['passed'] else "❌ 失败"
+            print(f"  [进程{shard_id}] {status} - {message['name']} ({message['duration']:.2f}秒)")
+        elif kind == "suite":
+            suite_runs.setdefault(key, []).append(message)
+        elif kind == "done":
+            shard_stats.append(message)
+            pending.discard(shard_id)
+        else:
+            print(f"错误: 进程 {shard_id} 执行失败\n{message}")
+            pending.discard(shard_id)
+    wall_time = (time.perf_counter_ns() - wall_start) / 1e9
+    for process in processes:
+        process.join()
+    
+    # 按套件和用例原有顺序合并结果
+    all_results = []
+    outcomes = []
+    for key in suite_keys:
+        keyed = sorted((index, shard_id, summary) for (k, index), (shard_id, summary) in case_results.items()
+                       if k == key)
+        results = [summary for _, _, summary in keyed]
+        total = sum(1 for k, _, _ in cases if k == key)
+        passed = sum(1 for r in results if r['passed'])
+        all_results.append({
+            "suite_name": suite_names[key],
+            "total_cases": total,
+            "passed_cases": passed,
+            # 没有返回结果的用例（进程异常退出）按失败计
+            "failed_cases": total - passed,
+            "timed_out_cases": sum(1 for r in results if r.get('timed_out')),
+            "duration": max((run["duration"] for run in suite_runs.get(key, [])), default=0.0),
+            "results": results,
+            "latency_histograms": merge_snapshots(run["latency_histograms"] for run in suite_runs.get(key, []))
+        })
+        outcomes.extend({"worker": f"进程{shard_id}", "busy": summary['duration']} for _, shard_id, summary in keyed)
+        for summary in results:
+            durations[duration_key(key, summary['name'])] = round(summary['duration'], 3)
+    save_durations(args.report_dir, durations)
+    
+    for result in all_results:
+        print(f"\n测试套件: {result['suite_name']}")
+        print("-" * 40)
+        print_suite_result(result)
+    
+    stats = {
+        "connection_pool": merge_pool_stats([item["connection_pool"] for item in shard_stats]),
+        "rate_limiter": merge_limiter_stats([item["rate_limiter"] for item in shard_stats]),
+        "parallel": parallel_stats(len(shards) * args.workers, wall_time, outcomes)
+    }
+    response_cache = merge_counter_stats([item.get("response_cache") for item in shard_stats])
+    if response_cache:
+        stats["response_cache"] = response_cache
+    return all_results, stats
+
+
+def run_load(args, suite_keys):
+    """压测模式：所选套件的每个用例都作为一个场景，虚拟用户轮流执行各场景"""
+    scenarios = []
+    for key in suite_keys:
+        suite = create_suite(key)
+        for index, test_case in enumerate(suite.test_cases):
+            scenarios.append(functools.partial(suite_case_scenario, key, index))
+            test_case.client.close()
+    if not scenarios:
+        print("错误: 没有可用于压测的测试用例")
+        sys.exit(1)
+    
+    if args.arrival_rate > 0:
+        max_vus = args.load_vus or 100
+        print(f"压测模式: 每秒 {args.arrival_rate} 次迭代 (最多 {max_vus} 个虚拟用户), {len(scenarios)} 个场景, "
+              f"持续 {args.load_duration}秒")
+        load_test = ArrivalRateTest(scenarios, rate=args.arrival_rate, duration=args.load_duration,
+                                    max_vus=max_vus, processes=args.processes, name=args.suite)
+    else:
+        print(f"压测模式: {args.load_vus} 个虚拟用户, {len(scenarios)} 个场景, "
+              f"持续 {args.load_duration}秒 (爬坡 {args.load_ramp_up}秒)")
+        load_test = LoadTest(scenarios, vus=args.load_vus, duration=args.load_duration, ramp_up=args.load_ramp_up,
+                             think_time=args.think_time, processes=args.processes, name=args.suite)
+    result = load_test.run().to_dict()
+    
+    print("\n" + "=" * 60)
+    print("压测完成")
+    print("=" * 60)
+    print(f"  迭代: {result['iterations']} (失败 {result['failed_iterations']}, 丢弃 {result['dropped_iterations']})")
+    print(f"  请求: {result['requests']}, 吞吐: {result['rps']} req/s, 错误率: {result['error_rate'] * 100:.2f}%")
+    for name, stats in result['endpoints'].items():
+        print(f"    {name}: {stats['count']} 次, {stats['rps']} req/s, 错误 {stats['errors']}, "
+              f"p50 {stats['p50_ms']}ms, p90 {stats['p90_ms']}ms, p99 {stats['p99_ms']}ms")
+        if 'service_p99_ms' in stats:
+            print(f"      未校正: p50 {stats['service_p50_ms']}ms, p90 {stats['service_p90_ms']}ms, "
+                  f"p99 {stats['service_p99_ms']}ms")
+    report_files = Reporter(args.report_dir).generate_load_reports(result)
+    print(f"\n压测报告已生成:")
+    print(f"  HTML报告: {report_files['html']}")
+    print(f"  JSON报告: {report_files['json']}")
+    sys.exit(0 if result['errors'] == 0 else 1)
 
 
 def main():
@@ -18,6 +370,38 @@ def main():
                        help='选择要运行的测试套件 (user: 用户API, post: 帖子API, login: 登录API, dongjing: 东经平台登录, all: 全部)')
     parser.add_argument('--report-dir', default='reports', 
                        help='测试报告输出目录')
+    parser.add_argument('--cassette-dir', default=None,
+                       help='录制/回放文件目录，每个测试套件对应一个录制文件')
+    parser.add_argument('--cassette-mode', choices=['record', 'replay'], default='replay',
+                       help='record: 录制真实请求, replay: 从录制文件回放，不访问网络')
+    parser.add_argument('--replay-speed', choices=['fast', 'recorded'], default='fast',
+                       help='fast: 尽快回放, recorded: 按录制时的响应耗时回放')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='每个测试套件内并行执行用例的线程数')
+    parser.add_argument('--processes', type=int, default=1,
+                       help='按历史耗时把用例分配到多个进程执行')
+    parser.add_argument('--retention', choices=['all', 'failures', 'compact'], default=None,
+                       help='步骤结果保留策略（默认读取 framework.retention）：长时间运行时用 failures/compact 限制内存')
+    parser.add_argument('--suite-timeout', type=float, default=None,
+                       help='每个测试套件的时间预算(秒)，默认读取 framework.deadline.suite')
+    parser.add_argument('--case-timeout', type=float, default=None,
+                       help='每个用例的时间预算(秒)，默认读取 framework.deadline.case')
+    parser.add_argument('--step-timeout', type=float, default=None,
+                       help='每个步骤的时间预算(秒)，默认读取 framework.deadline.step')
+    parser.add_argument('--update-snapshots', action='store_true',
+                       help='以本次响应重新生成 matches_snapshot 使用的黄金快照')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='只列出各测试套件的执行计划，不发出请求')
+    parser.add_argument('--load-vus', type=int, default=0,
+                       help='压测模式：虚拟用户数（大于 0 时启用压测，所选套件的每个用例作为一个场景）')
+    parser.add_argument('--load-duration', type=float, default=30,
+                       help='压测持续时间(秒)，包含爬坡时间')
+    parser.add_argument('--load-ramp-up', type=float, default=0,
+                       help='虚拟用户数从 0 线性增加到 --load-vus 所用的时间(秒)')
+    parser.add_argument('--arrival-rate', type=float, default=0,
+                       help='开放模型压测：每秒开始的迭代数，与响应快慢无关（--load-vus 为最大虚拟用户数，默认 100）')
+    parser.add_argument('--think-time', type=float, default=0,
+                       help='每个虚拟用户两轮迭代之间的等待时间(秒)')
     parser.add_argument('--env', choices=['dev', 'staging', 'production', 'dongjing'], default='dev',
                        help='选择测试环境')
     
@@ -29,75 +413,31 @@ def main():
     print(f"测试套件: {args.suite}")
     print("=" * 60)
     
-    # 创建测试套件
-    test_suites = []
-    
-    if args.suite in ['user', 'all']:
-        test_suites.append(create_user_test_suite())
-    
-    if args.suite in ['post', 'all']:
-        test_suites.append(create_post_test_suite())
-    
-    if args.suite in ['login', 'all']:
-        test_suites.append(create_login_test_suite())
-    
-    if args.suite in ['dongjing', 'all']:
-        # 东经平台测试使用专门的运行函数
-        dongjing_results = run_dongjing_login_tests()
-        # 将结果转换为标准格式
-        dongjing_suite_result = {
-            'name': '东经平台登录测试',
-            'total_cases': len(dongjing_results),
-            'passed_cases': sum(1 for r in dongjing_results if r['status'] == 'PASSED'),
-            'failed_cases': sum(1 for r in dongjing_results if r['status'] == 'FAILED'),
-            'duration': 0,  # 东经测试不单独计算时间
-            'results': [{
-                'name': r['test_name'],
-                'passed': r['status'] == 'PASSED',
-                'steps_passed': 1 if r['status'] == 'PASSED' else 0,
-                'steps_total': 1,
-                'duration': 0,
-                'error': r.get('error', '')
-            } for r in dongjing_results]
-        }
-        test_suites.append(dongjing_suite_result)
-    
-    if not test_suites:
+    suite_keys = [key for key in SUITE_FACTORIES if args.suite in (key, 'all')]
+    if not suite_keys and args.suite not in ['dongjing', 'all']:
         print("错误: 没有找到可用的测试套件")
         sys.exit(1)
     
+    if args.dry_run:
+        print_plan(suite_keys)
+        return
+    
+    if args.load_vus > 0 or args.arrival_rate > 0:
+        run_load(args, suite_keys)
+        return
+    
     # 运行测试
-    all_results = []
+    if args.processes > 1:
+        all_results, run_stats = run_sharded(args, suite_keys)
+    else:
+        all_results, run_stats = run_local(args, suite_keys)
     
-    for suite in test_suites:
-        print(f"\n执行测试套件: {suite['name'] if isinstance(suite, dict) else suite.name}")
+    if args.suite in ['dongjing', 'all']:
+        dongjing_suite_result = run_dongjing_suite()
+        print(f"\n执行测试套件: {dongjing_suite_result['name']}")
         print("-" * 40)
-        
-        # 处理不同类型的测试套件
-        if isinstance(suite, dict):
-            # 东经平台测试结果已经是字典格式
-            result = suite
-        else:
-            # 标准测试套件需要运行
-            result = suite.run()
-        
-        all_results.append(result)
-        
-        # 打印套件结果
-        print(f"测试用例总数: {result['total_cases']}")
-        print(f"通过用例数: {result['passed_cases']}")
-        print(f"失败用例数: {result['failed_cases']}")
-        print(f"执行时间: {result['duration']:.2f}秒")
-        
-        # 打印每个用例的详细结果
-        for case_result in result['results']:
-            status = "✅ 通过" if case_result['passed'] else "❌ 失败"
-            print(f"  {status} - {case_result['name']} "
-                  f"({case_result['steps_passed']}/{case_result['steps_total']} 步骤, "
-                  f"{case_result['duration']:.2f}秒)")
-            
-            if case_result['error']:
-                print(f"    错误: {case_result['error']}")
+        print_suite_result(dongjing_suite_result)
+        all_results.append(dongjing_suite_result)
     
     # 生成测试报告
     reporter = Reporter(args.report_dir)
@@ -108,10 +448,29 @@ def main():
         "total_cases": sum(r['total_cases'] for r in all_results),
         "passed_cases": sum(r['passed_cases'] for r in all_results),
         "failed_cases": sum(r['failed_cases'] for r in all_results),
+        "timed_out_cases": sum(r.get('timed_out_cases', 0) for r in all_results),
         "duration": sum(r['duration'] for r in all_results),
-        "results": [case for r in all_results for case in r['results']]
+        "results": [case for r in all_results for case in r['results']],
+        "connection_pool": run_stats["connection_pool"],
+        "rate_limiter": run_stats["rate_limiter"]
     }
     
+    if "parallel" in run_stats:
+        combined_result["parallel"] = run_stats["parallel"]
+    else:
+        parallel_results = [r['parallel'] for r in all_results if 'parallel' in r]
+        if parallel_results:
+            combined_result["parallel"] = merge_parallel_stats(parallel_results)
+    
+    if "response_cache" in run_stats:
+        combined_result["response_cache"] = run_stats["response_cache"]
+    
+    # 各套件（及各进程）的接口延迟直方图合并后统计
+    latency_histograms = merge_snapshots(r.get('latency_histograms') for r in all_results)
+    if latency_histograms:
+        combined_result["latency"] = HistogramSet.from_snapshot(latency_histograms).summary()
+        combined_result["latency_histograms"] = latency_histograms
+    
     # 生成报告
     report_files = reporter.generate_reports(combined_result)
     
@@ -129,9 +488,47 @@ def main():
     print(f"  总用例数: {total_cases}")
     print(f"  通过用例: {passed_cases}")
     print(f"  失败用例: {failed_cases}")
+    if combined_result['timed_out_cases']:
+        print(f"  超时用例: {combined_result['timed_out_cases']} (超出时间预算，包含在失败用例中)")
     print(f"  通过率: {passed_rate:.1f}%")
     print(f"  总执行时间: {combined_result['duration']:.2f}秒")
     
+    pool_stats = combined_result['connection_pool']
+    if combined_result.get('parallel', {}).get('workers', 1) > 1:
+        parallel = combined_result['parallel']
+        print(f"并行执行:")
+        print(f"  并行度: {parallel['workers']}, 加速比: {parallel['speedup']}x "
+              f"(用例耗时合计 {parallel['case_time']:.2f}秒 / 墙钟时间 {parallel['wall_time']:.2f}秒)")
+        for name, worker in parallel['worker_busy'].items():
+            print(f"    {name}: {worker['cases']} 个用例, 忙碌 {worker['busy_time']:.2f}秒 "
+                  f"({worker['utilization'] * 100:.0f}%)")
+    
+    if "latency" in combined_result:
+        print(f"接口延迟:")
+        for endpoint, latency in combined_result["latency"].items():
+            print(f"    {endpoint}: {latency['count']} 次, 平均 {latency['mean_ms']:.1f}ms, "
+                  f"p50 {latency['p50_ms']:.1f}ms, p90 {latency['p90_ms']:.1f}ms, "
+                  f"p99 {latency['p99_ms']:.1f}ms, 最大 {latency['max_ms']:.1f}ms")
+    
+    if "response_cache" in combined_result:
+        cache_summary = combined_result["response_cache"]
+        print(f"响应缓存统计:")
+        print(f"  命中: {cache_summary['hits']}, 未命中: {cache_summary['misses']}, "
+              f"条件请求(304): {cache_summary['revalidations']}, 淘汰: {cache_summary['evictions']}")
+    
+    limiter_stats = {host: stats for host, stats in combined_result['rate_limiter'].items() if stats['requests']}
+    if limiter_stats:
+        print(f"限流排队统计:")
+        for host, host_stats in limiter_stats.items():
+            print(f"    {host}: 请求 {host_stats['requests']}, 排队 {host_stats['delayed']}, "
+                  f"平均等待 {host_stats['avg_wait_ms']}ms, 最大等待 {host_stats['max_wait_ms']}ms")
+    
+    print(f"连接池统计:")
+    print(f"  新建连接: {pool_stats['new_connections']}")
+    print(f"  复用连接: {pool_stats['reused']}")
+    for host, host_stats in pool_stats['hosts'].items():
+        print(f"    {host}: 请求 {host_stats['requests']}, 新建 {host_stats['new_connections']}, 复用 {host_stats['reused']}")
+    
     print(f"\n测试报告已生成:")
     for format_name, file_path in report_files.items():
         print(f"  {format_name.upper()}报告: {file_path}")
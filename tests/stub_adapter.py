@@ -0,0 +1,74 @@
+"""单元测试用的传输适配器：由处理函数直接构造响应，不发生网络IO"""
+import io
+import json
+from http.client import HTTPMessage
+from typing import Any, Callable, Dict, List, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+# 处理函数：PreparedRequest -> (状态码, 响应头, 响应体)；响应体可以是 bytes、str 或可 JSON 序列化的对象
+Handler = Callable[[requests.PreparedRequest], Tuple[int, Dict[str, str], Any]]
+
+
+class _OriginalResponse:
+    """提供 requests 提取 Set-Cookie 所需的最小接口"""
+
+    def __init__(self, headers: List[Tuple[str, str]]):
+        self.msg = HTTPMessage()
+        for key, value in headers:
+            self.msg[key] = value
+
+    def isclosed(self) -> bool:
+        return True
+
+
+class StubAdapter(HTTPAdapter):
+    def __init__(self, handler: Handler):
+        super().__init__()
+        self.handler = handler
+        self.requests: List[requests.PreparedRequest] = []
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        self.requests.append(request)
+        status, headers, body = self.handler(request)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        headers = list(headers.items()) + [("Content-Length", str(len(body)))]
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=False,
+            original_response=_OriginalResponse(headers)
+        )
+        return self.build_response(request, raw)
+
+
+def mount_stub(client: Any, handler: Handler) -> StubAdapter:
+    """把 HTTPClient 的所有请求交给 handler 处理"""
+    adapter = StubAdapter(handler)
+    client.session.mount("http://", adapter)
+    client.session.mount("https://", adapter)
+    return adapter
+
+
+class FakeClock:
+    """替换被测模块中的 time 模块：sleep 只推进时钟，不真正等待"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+    time = monotonic
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
@@ -0,0 +1,121 @@
+import base64
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.assertion_plan import AssertionPlan, RecordedResponse
+from core.assertions import AssertionError
+from core.retention import CompactResult
+
+
+def interaction(status=200, body=None, headers=None, elapsed=0.05):
+    text = body if isinstance(body, str) else json.dumps(body if body is not None else {"success": True})
+    return {
+        "status": status,
+        "url": "http://api.test/items",
+        "headers": headers if headers is not None else [["Content-Type", "application/json"]],
+        "elapsed": elapsed,
+        "body": text
+    }
+
+
+LIST_SCHEMA = {"type": "object", "required": ["data"],
+               "properties": {"data": {"type": "object", "required": ["list"]}}}
+
+
+def test_cheap_checks_run_before_body_checks():
+    # 声明顺序是 JSON 断言在前，但状态码先检查：5xx 的非 JSON 响应体不会被解码
+    plan = AssertionPlan().json_path_exists("data.list[0].fid").header_exists("Content-Type").status_code(200)
+    response = RecordedResponse(interaction(status=502, body="<html>bad gateway</html>"))
+    assert plan.check(response) == ("status_code(200)", "状态码断言失败: 期望 200, 实际 502")
+    response = RecordedResponse(interaction(body="<html>", headers=[]))
+    assert plan.check(response)[0] == "header_exists('Content-Type')"
+    response = RecordedResponse(interaction(body="<html>"))
+    assert plan.check(response) == ("json_path_exists('data.list[0].fid')", "响应内容不是有效的JSON格式")
+
+
+def test_same_tier_keeps_declaration_order():
+    plan = AssertionPlan().json_has_key("data").json_path_equals("data.total", 2).json_schema(LIST_SCHEMA)
+    assert plan.check(RecordedResponse(interaction(body={"success": True}))) == (
+        "json_has_key('data')", "响应中缺少键: data")
+    failure = plan.check(RecordedResponse(interaction(body={"data": {"total": 3}})))
+    assert failure == ("json_path_equals('data.total')", "路径 'data.total' 的值不匹配: 期望 2, 实际 3")
+    failure = plan.check(RecordedResponse(interaction(body={"data": {"total": 2}})))
+    assert failure[0] == "json_schema(...)"
+    assert "list" in failure[1]
+
+
+def test_evaluate_over_dict_interactions():
+    plan = AssertionPlan().is_success().response_time_less_than(100).json_path_equals("data.list[*].ok", True)
+    good = interaction(body={"data": {"list": [{"ok": True}, {"ok": True}]}})
+    responses = [good] * 10
+    responses[3] = interaction(status=500)
+    responses[9] = interaction(body={"data": {"list": [{"ok": True}, {"ok": False}]}})
+    responses[10:] = [interaction(elapsed=0.5)]
+    result = plan.evaluate(responses)
+    assert result.total == 11
+    assert result.failed == 3
+    assert not result.all_passed
+    assert result.failed_indices() == [3, 9, 10]
+    assert [result.passed(index) for index in (0, 3, 8, 9)] == [True, False, True, False]
+    assert result.first_failure == {
+        "index": 3,
+        "assertion": "status_code_in([200, 201, 202, 204])",
+        "message": "状态码断言失败: 期望在 [200, 201, 202, 204] 中, 实际 500"
+    }
+    assert result.to_dict() == {"total": 11, "passed": 8, "failed": 3, "first_failure": result.first_failure}
+
+
+def test_all_passed_has_no_first_failure():
+    result = AssertionPlan().status_code(200).text_matches(r'"success":\s*true').evaluate([interaction()] * 3)
+    assert result.all_passed
+    assert result.first_failure is None
+    assert result.failed_indices() == []
+
+
+def test_binary_recorded_body():
+    raw = {"status": 200, "headers": [], "body_b64": base64.b64encode(b'{"a": 1}').decode("ascii")}
+    assert AssertionPlan().json_contains({"a": 1}).check(RecordedResponse(raw)) is None
+
+
+def test_compact_result_supports_status_checks_only():
+    passed = CompactResult(200, "http://api.test/items", 10, "hash")
+    failed = CompactResult(404, "http://api.test/items", 10, "hash")
+    status_only = AssertionPlan().status_code_in([200, 201])
+    assert status_only.evaluate([passed, failed, passed]).failed_indices() == [1]
+
+    plan = AssertionPlan().status_code(200).json_has_key("data")
+    assert plan.check(failed) == ("status_code(200)", "状态码断言失败: 期望 200, 实际 404")
+    assert plan.check(passed) == ("json_has_key('data')", "响应头和响应体未保留，无法执行该断言")
+
+
+def test_json_equals_with_ignored_fields():
+    expected = {"data": {"id": 1, "updated_at": "t0", "items": [{"sku": "a", "ts": 1}]}}
+    plan = AssertionPlan().json_equals(expected, ignore=["data.updated_at", "data.items[*].ts"])
+    same = {"data": {"id": 1, "updated_at": "t9", "items": [{"sku": "a", "ts": 9}]}}
+    assert plan.check(RecordedResponse(interaction(body=same))) is None
+    different = {"data": {"id": 2, "updated_at": "t9", "items": [{"sku": "a", "ts": 9}]}}
+    failure = plan.check(RecordedResponse(interaction(body=different)))
+    assert failure[0] == "json_equals(...)"
+    assert "data.id" in failure[1]
+
+
+def test_adding_assertions_recompiles():
+    plan = AssertionPlan().status_code(200)
+    assert plan.check(RecordedResponse(interaction(body={"success": False}))) is None
+    plan.json_contains({"success": True})
+    assert len(plan) == 2
+    assert plan.check(RecordedResponse(interaction(body={"success": False})))[0] == "json_contains(['success'])"
+
+
+def test_assert_response_raises():
+    plan = AssertionPlan().text_contains("ok")
+    response = RecordedResponse(interaction(body="ok"))
+    assert plan.assert_response(response) is response
+    with pytest.raises(AssertionError, match="期望包含 'ok'"):
+        plan.assert_response(RecordedResponse(interaction(body="fail")))
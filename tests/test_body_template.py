@@ -0,0 +1,103 @@
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from config.config import Config
+from core import body_template
+from core.body_template import BodyTemplate
+
+
+PAYLOAD = {
+    "fuserId": "u-0",
+    "famount": "100",
+    "address": {"fid": "a-0", "tags": ["home", "default"]},
+    "items": [{"sku": "s-0", "count": 1}],
+    "note": "固定备注",
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    # 两种编码后端都要得到合法且一致的 JSON
+    if request.param == "json":
+        monkeypatch.setattr(body_template, "orjson", None)
+    elif body_template.orjson is None:
+        pytest.skip("未安装 orjson")
+    return request.param
+
+
+def expected(**changes):
+    payload = json.loads(json.dumps(PAYLOAD))
+    for path, value in changes.items():
+        container = payload
+        keys = path.split("__")
+        for key in keys[:-1]:
+            container = container[int(key)] if isinstance(container, list) else container[key]
+        last = keys[-1]
+        container[int(last) if isinstance(container, list) else last] = value
+    return payload
+
+
+def test_defaults_reproduce_payload(encoder):
+    template = BodyTemplate(PAYLOAD, slots=["fuserId", "address.fid", "items.0.count"])
+    assert json.loads(template.render()) == PAYLOAD
+
+
+def test_slots_are_replaced(encoder):
+    template = BodyTemplate(PAYLOAD, slots=["fuserId", "address.fid", "items.0.count"])
+    body = template.render({"address.fid": "a-9"}, fuserId="u-9", **{"items.0.count": 3})
+    assert json.loads(body) == expected(fuserId="u-9", address__fid="a-9", items__0__count=3)
+    # 未传入的槽位回到默认值，上一次的值不会残留
+    assert json.loads(template.render(fuserId="u-1")) == expected(fuserId="u-1")
+
+
+@pytest.mark.parametrize("value", [
+    'say "hi"\\n',
+    "换行\n制表\t",
+    "</script> ",
+    None,
+    {"nested": ["a", 1, 2.5, True]},
+])
+def test_slot_values_are_escaped(encoder, value):
+    template = BodyTemplate(PAYLOAD, slots=["note"])
+    assert json.loads(template.render(note=value)) == expected(note=value)
+
+
+def test_payload_is_not_mutated_and_markers_do_not_leak():
+    payload = json.loads(json.dumps(PAYLOAD))
+    template = BodyTemplate(payload, slots=["fuserId", "famount"])
+    assert payload == PAYLOAD
+    assert b"__body_slot_" not in template.render()
+
+
+def test_unknown_slot_raises_value_error():
+    template = BodyTemplate(PAYLOAD, slots=["fuserId"])
+    with pytest.raises(ValueError, match="famount"):
+        template.render(famount="200")
+    with pytest.raises(ValueError, match="fuserid"):
+        template.render({"fuserid": "u-1"})
+
+
+def test_missing_field_at_compile_time():
+    with pytest.raises(KeyError):
+        BodyTemplate(PAYLOAD, slots=["address.missing"])
+
+
+def test_config_compiles_template_once(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(json.dumps({"test_data": {"cart_data": {"valid": PAYLOAD}}}), encoding="utf-8")
+    config = Config(str(config_file))
+    template = config.get_body_template("cart_data.valid", slots=["fuserId"])
+    assert config.get_body_template("cart_data.valid", slots=["fuserId"]) is template
+    assert config.get_body_template("cart_data.valid", slots=["famount"]) is not template
+    assert json.loads(template.render(fuserId="u-2")) == expected(fuserId="u-2")
+    with pytest.raises(KeyError):
+        config.get_body_template("cart_data.absent", slots=["fuserId"])
+    # 重新加载配置后使用新的测试数据重新编译
+    config.load_config()
+    assert config.get_body_template("cart_data.valid", slots=["fuserId"]) is not template
@@ -0,0 +1,225 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import cache as cache_module
+from core.cache import ResponseCache
+from core.http_client import HTTPClient
+from tests.stub_adapter import FakeClock, mount_stub
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class Origin:
+    """按路径返回预设的响应头，记录收到的请求头；not_modified 为 True 时对条件请求返回 304"""
+
+    def __init__(self):
+        self.headers = {}
+        self.not_modified = True
+        self.version = 0
+        self.received = []
+
+    def __call__(self, request):
+        self.received.append(request.headers)
+        path = request.path_url.split("?")[0]
+        conditional = "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        if conditional and self.not_modified:
+            return 304, dict(self.headers.get(path, {})), b""
+        self.version += 1
+        body = {"path": path, "version": self.version, "lang": request.headers.get("X-Lang"),
+                "auth": request.headers.get("Authorization")}
+        return 200, dict(self.headers.get(path, {}), **{"Content-Type": "application/json"}), body
+
+
+def make_client(origin, cache=None, **kwargs):
+    client = HTTPClient("http://api.test")
+    mount_stub(client, origin)
+    client.enable_cache(cache if cache is not None else ResponseCache(**kwargs))
+    return client
+
+
+def requests_accounted(cache):
+    stats = cache.stats()
+    return stats["hits"] + stats["misses"] + stats["revalidations"]
+
+
+def test_fresh_response_served_from_cache(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=60"}
+    client = make_client(origin)
+    first = client.get("/a")
+    second = client.get("/a")
+    assert len(origin.received) == 1
+    assert second.json() == first.json()
+    assert getattr(second, "from_cache", False)
+    assert client.cache.stats()["hits"] == 1
+    assert client.cache.stats()["misses"] == 1
+
+
+def test_expired_response_without_validators_is_refetched(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=10"}
+    client = make_client(origin)
+    client.get("/a")
+    clock.now += 9
+    assert client.get("/a").json()["version"] == 1
+    clock.now += 2
+    assert client.get("/a").json()["version"] == 2
+    assert client.cache.stats()["misses"] == 2
+
+
+def test_etag_revalidation_reuses_cached_body(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=0", "ETag": '"v1"'}
+    client = make_client(origin)
+    client.get("/a")
+    response = client.get("/a")
+    assert origin.received[-1]["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    assert client.cache.stats()["revalidations"] == 1
+
+
+def test_last_modified_revalidation(clock):
+    origin = Origin()
+    stamp = "Wed, 21 Oct 2015 07:28:00 GMT"
+    origin.headers["/a"] = {"Cache-Control": "no-cache", "Last-Modified": stamp}
+    client = make_client(origin)
+    client.get("/a")
+    # no-cache：每次都要条件请求
+    client.get("/a")
+    client.get("/a")
+    assert [headers.get("If-Modified-Since") for headers in origin.received] == [None, stamp, stamp]
+    assert client.cache.stats()["revalidations"] == 2
+
+
+def test_conditional_request_answered_with_full_response_counts_as_miss(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=0", "ETag": '"v1"'}
+    client = make_client(origin)
+    client.get("/a")
+    origin.not_modified = False
+    assert client.get("/a").json()["version"] == 2
+    stats = client.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["revalidations"]) == (0, 2, 0)
+    assert requests_accounted(client.cache) == len(origin.received)
+
+
+def test_stats_account_for_every_cacheable_request(clock):
+    origin = Origin()
+    origin.headers["/fresh"] = {"Cache-Control": "max-age=60"}
+    origin.headers["/etag"] = {"Cache-Control": "max-age=0", "ETag": '"e"'}
+    client = make_client(origin)
+    for step in range(6):
+        origin.not_modified = step % 2 == 0
+        client.get("/fresh")
+        client.get("/etag")
+        client.get("/plain")
+    assert requests_accounted(client.cache) == 18
+
+
+def test_no_store_and_uncacheable_methods(clock):
+    origin = Origin()
+    origin.headers["/secret"] = {"Cache-Control": "no-store, max-age=60"}
+    origin.headers["/list"] = {"Cache-Control": "max-age=60"}
+    client = make_client(origin, cacheable_post=["/list"])
+    client.get("/secret")
+    client.get("/secret")
+    client.post("/other", json={"a": 1})
+    client.post("/other", json={"a": 1})
+    assert len(origin.received) == 4
+    client.post("/list", json={"page": 1})
+    client.post("/list", json={"page": 1})
+    client.post("/list", json={"page": 2})
+    assert len(origin.received) == 6
+
+
+def test_vary_header_selects_entry(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=60", "Vary": "X-Lang"}
+    client = make_client(origin)
+    assert client.get("/a", headers={"X-Lang": "en"}).json()["lang"] == "en"
+    assert client.get("/a", headers={"X-Lang": "zh"}).json()["lang"] == "zh"
+    assert client.get("/a", headers={"X-Lang": "zh"}).json()["lang"] == "zh"
+    assert len(origin.received) == 2
+
+
+def test_vary_star_is_not_cached(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=60", "Vary": "*"}
+    client = make_client(origin)
+    client.get("/a")
+    client.get("/a")
+    assert len(origin.received) == 2
+    assert client.cache.stats()["stores"] == 0
+
+
+def test_credentials_are_part_of_the_key(clock):
+    origin = Origin()
+    origin.headers["/me"] = {"Cache-Control": "max-age=60"}
+    cache = ResponseCache()
+    alice = make_client(origin, cache)
+    alice.set_headers({"Authorization": "Bearer alice"})
+    bob = make_client(origin, cache)
+    bob.set_headers({"Authorization": "Bearer bob"})
+    carol = make_client(origin, cache)
+    carol.set_cookies({"token": "carol"})
+    assert alice.get("/me").json()["auth"] == "Bearer alice"
+    assert bob.get("/me").json()["auth"] == "Bearer bob"
+    assert carol.get("/me").json()["auth"] is None
+    assert alice.get("/me").json()["auth"] == "Bearer alice"
+    assert len(origin.received) == 3
+    # 缓存键中只有摘要，不含 token 原文
+    assert not any("alice" in key for key in cache._entries)
+
+
+def test_lru_eviction_by_entries(clock):
+    origin = Origin()
+    for path in ("/a", "/b", "/c"):
+        origin.headers[path] = {"Cache-Control": "max-age=60"}
+    client = make_client(origin, max_entries=2)
+    client.get("/a")
+    client.get("/b")
+    client.get("/a")
+    client.get("/c")
+    assert client.cache.stats()["evictions"] == 1
+    client.get("/a")
+    assert len(origin.received) == 3
+    client.get("/b")
+    assert len(origin.received) == 4
+
+
+def test_eviction_by_bytes(clock):
+    origin = Origin()
+    for path in ("/a", "/b"):
+        origin.headers[path] = {"Cache-Control": "max-age=60"}
+    client = make_client(origin)
+    size = len(client.get("/a").content)
+    client.enable_cache(ResponseCache(max_bytes=size + 10))
+    client.get("/a")
+    client.get("/b")
+    stats = client.cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] <= size + 10
+
+
+def test_endpoint_ttl_overrides_server_directives(clock):
+    origin = Origin()
+    origin.headers["/a"] = {"Cache-Control": "max-age=0"}
+    client = make_client(origin, endpoint_ttl={"/a": 30})
+    client.get("/a")
+    clock.now += 29
+    client.get("/a")
+    assert len(origin.received) == 1
+    clock.now += 2
+    client.get("/a")
+    assert len(origin.received) == 2
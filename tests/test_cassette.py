@@ -0,0 +1,148 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import cassette as cassette_module
+from core.cassette import Cassette, CassetteMissError
+from core.http_client import HTTPClient
+from tests.stub_adapter import FakeClock, mount_stub
+
+
+def origin(request):
+    path = request.path_url
+    if path.startswith("/counter"):
+        origin.calls += 1
+        return 200, {"Content-Type": "application/json"}, {"calls": origin.calls}
+    if path == "/login":
+        body = json.loads(request.body)
+        return 200, {"Set-Cookie": "sid=abc; Path=/"}, {"user": body["user"]}
+    if path == "/gzip":
+        payload = gzip.compress(json.dumps({"zipped": True}).encode("utf-8"))
+        return 200, {"Content-Type": "application/json", "Content-Encoding": "gzip"}, payload
+    if path == "/binary":
+        return 200, {"Content-Type": "application/octet-stream"}, bytes(range(256))
+    return 404, {}, {"error": "not found"}
+
+
+def record(path, *calls):
+    origin.calls = 0
+    client = HTTPClient("http://api.test")
+    mount_stub(client, origin)
+    cassette = Cassette(str(path), mode=Cassette.RECORD)
+    client.use_cassette(cassette)
+    responses = [getattr(client, method)(url, **kwargs) for method, url, kwargs in calls]
+    cassette.save()
+    return responses
+
+
+def replay_client(path, speed=Cassette.FAST):
+    client = HTTPClient("http://api.test")
+    # 回放时所有请求都不应到达源站
+    stub = mount_stub(client, lambda request: pytest.fail(f"回放时发生了真实请求: {request.url}"))
+    client.use_cassette(Cassette(str(path), speed=speed))
+    return client, stub
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "c.json.gz"
+    recorded = record(path, ("get", "/counter", {}), ("get", "/missing", {}))
+    client, stub = replay_client(path)
+    response = client.get("/counter")
+    assert response.status_code == 200
+    assert response.json() == recorded[0].json()
+    assert response.headers["Content-Type"] == "application/json"
+    assert client.get("/missing").status_code == 404
+    assert stub.requests == []
+
+
+def test_repeated_requests_replay_in_recorded_order(tmp_path):
+    path = tmp_path / "c.json.gz"
+    record(path, ("get", "/counter", {}), ("get", "/counter", {}))
+    client, _ = replay_client(path)
+    assert [client.get("/counter").json()["calls"] for _ in range(3)] == [1, 2, 1]
+
+
+def test_matching_ignores_query_order_and_json_key_order(tmp_path):
+    path = tmp_path / "c.json.gz"
+    record(path,
+           ("get", "/counter?b=2&a=1", {}),
+           ("post", "/login", {"data": '{"user": "u1", "pwd": "p"}'}))
+    client, _ = replay_client(path)
+    assert client.get("/counter", params={"a": 1, "b": 2}).json() == {"calls": 1}
+    response = client.post("/login", data='{"pwd":"p","user":"u1"}')
+    assert response.json() == {"user": "u1"}
+    # Set-Cookie 随回放响应写回会话
+    assert client.session.cookies.get("sid") == "abc"
+
+
+def test_unmatched_request_raises_miss(tmp_path):
+    path = tmp_path / "c.json.gz"
+    record(path, ("post", "/login", {"json": {"user": "u1"}}))
+    client, _ = replay_client(path)
+    with pytest.raises(CassetteMissError) as info:
+        client.post("/login", json={"user": "u2"})
+    assert info.value.method == "POST"
+    with pytest.raises(CassetteMissError):
+        client.get("/login")
+
+
+def test_missing_file_in_replay_mode(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "absent.json.gz"))
+
+
+def test_file_is_gzip_json_and_bodies_round_trip(tmp_path):
+    path = tmp_path / "nested" / "c.json.gz"
+    recorded = record(path, ("get", "/gzip", {}), ("get", "/binary", {}))
+    assert recorded[0].json() == {"zipped": True}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["version"] == 1
+    assert [interaction["url"] for interaction in data["interactions"]] == [
+        "http://api.test/gzip", "http://api.test/binary"]
+    # 保存的是解码后的响应体，Content-Encoding 不再适用
+    header_names = {name.lower() for name, _ in data["interactions"][0]["headers"]}
+    assert "content-encoding" not in header_names
+    assert "body_b64" in data["interactions"][1]
+
+    client, _ = replay_client(path)
+    assert client.get("/gzip").json() == {"zipped": True}
+    assert client.get("/binary").content == bytes(range(256))
+
+
+def test_fast_replay_does_not_sleep(tmp_path, monkeypatch):
+    path = tmp_path / "c.json.gz"
+    record(path, ("get", "/counter", {}))
+    clock = FakeClock()
+    monkeypatch.setattr(cassette_module, "time", clock)
+    client, _ = replay_client(path)
+    client.get("/counter")
+    assert clock.sleeps == []
+
+
+def test_recorded_speed_sleeps_for_recorded_elapsed(tmp_path, monkeypatch):
+    path = tmp_path / "c.json.gz"
+    clock = FakeClock()
+    monkeypatch.setattr(cassette_module, "time", clock)
+    record(path, ("get", "/counter", {}))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    data["interactions"][0]["elapsed"] = 0.25
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+    client, _ = replay_client(path, speed=Cassette.RECORDED)
+    client.get("/counter")
+    assert clock.sleeps == [0.25]
+
+
+def test_invalid_mode_and_speed(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "c.json.gz"), mode="rewind")
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "c.json.gz"), mode=Cassette.RECORD, speed="slow")
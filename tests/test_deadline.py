@@ -0,0 +1,156 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import deadline as deadline_module
+from core.deadline import (DeadlineExceeded, budget_timeout, check_deadline, current_deadline, deadline_scope,
+                           no_deadline)
+from core.http_client import HTTPClient
+from core.retry import CircuitBreakerRegistry, RetryPolicy
+from core.test_case import TestCase, TestStep
+from tests.stub_adapter import FakeClock, StubAdapter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deadline_module, "time", clock)
+    return clock
+
+
+class TimeoutRecorder(StubAdapter):
+    """记录每次发送时传给适配器的超时"""
+
+    def __init__(self, handler):
+        super().__init__(handler)
+        self.timeouts = []
+
+    def send(self, request, **kwargs):
+        self.timeouts.append(kwargs.get("timeout"))
+        return super().send(request, **kwargs)
+
+
+def make_client(handler, timeout=30, **policy):
+    client = HTTPClient("http://api.test", timeout=timeout)
+    client.set_retry_policy(RetryPolicy(breakers=CircuitBreakerRegistry(), **policy))
+    adapter = TimeoutRecorder(handler)
+    client.session.mount("http://", adapter)
+    return client, adapter
+
+
+def ok(request):
+    return 200, {}, {"success": True}
+
+
+def test_budget_timeout_without_deadline():
+    assert current_deadline() is None
+    assert budget_timeout(30) == 30
+    assert budget_timeout((3, 30)) == (3, 30)
+    assert budget_timeout(None) is None
+
+
+def test_budget_timeout_takes_smaller_of_timeout_and_remaining(clock):
+    with deadline_scope(5, "用例 a"):
+        assert budget_timeout(30) == pytest.approx(5)
+        assert budget_timeout(2) == 2
+        assert budget_timeout(None) == pytest.approx(5)
+        clock.now += 4
+        assert budget_timeout((3, 30)) == pytest.approx((1, 1))
+        assert budget_timeout((0.5, None)) == pytest.approx((0.5, 1))
+        clock.now += 1
+        with pytest.raises(DeadlineExceeded, match="用例 a 超出时间预算 5.000秒"):
+            budget_timeout(30)
+
+
+def test_nested_deadline_uses_earliest_expiry(clock):
+    with deadline_scope(10, "用例 outer") as outer:
+        with deadline_scope(60, "步骤 inner") as inner:
+            # 内层预算更长时受外层限制，异常指向外层作用域
+            assert inner.effective() is outer
+            assert inner.remaining() == pytest.approx(10)
+            clock.now += 10
+            with pytest.raises(DeadlineExceeded) as info:
+                check_deadline()
+            assert info.value.scope == "用例 outer"
+        with deadline_scope(None, "继承") as inherited:
+            assert inherited is outer
+    with deadline_scope(10, "用例 outer"):
+        with deadline_scope(2, "步骤 inner"):
+            clock.now += 2
+            with pytest.raises(DeadlineExceeded) as info:
+                check_deadline()
+            assert info.value.scope == "步骤 inner"
+        # 离开内层后恢复外层的剩余时间
+        assert current_deadline().remaining() == pytest.approx(8)
+    assert current_deadline() is None
+
+
+def test_no_deadline_suspends_budget(clock):
+    with deadline_scope(1, "用例 a") as scope:
+        clock.now += 5
+        with no_deadline():
+            assert current_deadline() is None
+            check_deadline()
+            assert budget_timeout(30) == 30
+        assert current_deadline() is scope
+
+
+def test_request_timeout_derived_from_budget(clock):
+    client, adapter = make_client(ok)
+    client.get("/a")
+    with deadline_scope(4, "步骤 a"):
+        client.get("/a")
+        clock.now += 3.5
+        client.get("/a", timeout=(1, 10))
+    assert adapter.timeouts == [30, pytest.approx(4), pytest.approx((0.5, 0.5))]
+
+
+def test_expired_budget_sends_nothing(clock):
+    client, adapter = make_client(ok)
+    with deadline_scope(1, "步骤 a"):
+        clock.now += 1
+        with pytest.raises(DeadlineExceeded):
+            client.get("/a")
+    assert adapter.timeouts == []
+
+
+def test_retry_backoff_beyond_budget_gives_up(clock):
+    client, adapter = make_client(lambda request: (503, {}, b""), base_delay=1.0)
+    with deadline_scope(0.5, "步骤 a"):
+        with pytest.raises(DeadlineExceeded) as info:
+            client.get("/unavailable")
+    # 退避时间超过剩余预算，不再等待重试
+    assert len(adapter.timeouts) == 1
+    assert [record.status_code for record in info.value.retries] == [503]
+
+
+def test_case_timeout_exempts_teardown(clock):
+    case = TestCase("deadline", "http://api.test")
+    adapter = TimeoutRecorder(ok)
+    case.client.session.mount("http://", adapter)
+    case.timeout = 2
+    cleaned = []
+
+    def slow_step():
+        clock.now += 3
+        check_deadline()
+
+    case.plan("slow", slow_step)
+    case.plan("never", lambda: None)
+
+    @case.teardown
+    def cleanup(test_case):
+        cleaned.append(current_deadline())
+        test_case.client.get("/cleanup")
+
+    assert not case.run()
+    assert case.timed_out
+    assert case.steps[0].status == TestStep.TIMED_OUT
+    assert case.steps[1].status == TestStep.PLANNED
+    # 后置钩子在预算耗尽后仍然执行，且不受任何预算限制
+    assert cleaned == [None]
+    assert adapter.timeouts == [30]
@@ -7,9 +7,19 @@ sys.path.insert(0, str(project_root))
 
 from core.test_case import TestCase
 from core.assertions import AssertionChain
+from core.fixtures import LoginFixture
 from config.config import config
 
 
+# 会话级登录夹具：同一进程内所有用例共享一次登录，过期或401时自动重新登录
+DONGJING_GROUP_LOGIN = LoginFixture.from_config(
+    "dongjing_group",
+    "login_data.dongjing_group_valid",
+    extra_payload={"loginType": "WEB"},
+    variables={"fuserId": "data.fid", "fuserBrowseAreaCode": "data.fkeyarea"}
+)
+
+
 class TestDongjingGroupAddToCart(TestCase):
     """东经易网添加购物车测试用例"""
     
@@ -29,42 +39,11 @@ class TestDongjingGroupAddToCart(TestCase):
         print(f"东经易网添加购物车测试完成: {self.name}")
     
     def login(self):
-        login_data = config.get_test_data("login_data.dongjing_group_valid")
-        login_endpoint = config.get_api_endpoint("dongjing_group", "login")
-        
-        if login_data is None:
-            print(f"错误: 无法获取登录数据")
-            return
-        
-        print(f"登录请求数据: username={login_data['username']}, password={login_data['password']}")
-        print(f"登录接口地址: {login_endpoint}")
-        
-        response = self.post(login_endpoint, json={
-            "username": login_data["username"],
-            "password": login_data["password"],
-            "loginType": "WEB"
-        })
-        
-        print(f"登录响应状态码: {response.status_code}")
-        print(f"登录响应内容: {response.text}")
-        
-        if response.status_code == 200:
-            response_data = response.json
-            print(f"登录响应JSON: {response_data}")
-            if response_data.get("success") and "token" in response_data:
-                self.auth_token = response_data["token"]
-                self.client.set_headers({
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.auth_token}"
-                })
-                self.set_variable("auth_token", self.auth_token)
-                print(f"登录成功，获取到token")
-            else:
-                print(f"登录失败: {response_data.get('msg', '未知错误')}")
+        session = DONGJING_GROUP_LOGIN.apply(self)
+        self.auth_token = session.token
+        print(f"登录态已就绪 (登录 {DONGJING_GROUP_LOGIN.stats()['logins']} 次)")
     
     def test_add_to_cart(self):
-        self.login()
-        
         cart_data = config.get_test_data("cart_data.dongjing_group_valid_cart")
         cart_endpoint = config.get_api_endpoint("dongjing_group", "pricing_protocol")
         
@@ -72,10 +51,15 @@ class TestDongjingGroupAddToCart(TestCase):
             print(f"错误: 无法获取购物车数据")
             return
         
-        print(f"添加购物车请求数据: {cart_data}")
+        # 购物车请求体只编译一次，压测的每轮迭代只编码登录夹具提供的用户ID
+        template = config.get_body_template("cart_data.dongjing_group_valid_cart", slots=["fuserId"])
+        user_id = self.get_variable("fuserId")
+        body = template.render(fuserId=user_id) if user_id is not None else template.render()
+        
+        print(f"添加购物车请求数据: {body.decode('utf-8')}")
         print(f"添加购物车接口地址: {cart_endpoint}")
         
-        response = self.post(cart_endpoint, json=cart_data)
+        response = self.post(cart_endpoint, data=body)
         
         print(f"响应状态码: {response.status_code}")
         print(f"响应内容: {response.text}")
@@ -93,6 +77,14 @@ class TestDongjingGroupAddToCart(TestCase):
                 print(f"添加购物车成功")
 
 
+def create_add_to_cart_scenario() -> TestDongjingGroupAddToCart:
+    """压测场景（core.load.ArrivalRateTest）：登录态由夹具共享，每轮迭代只发送添加购物车请求"""
+    test_case = TestDongjingGroupAddToCart()
+    test_case.setup_hooks.append(DONGJING_GROUP_LOGIN.apply)
+    test_case.plan("添加购物车", test_case.test_add_to_cart)
+    return test_case
+
+
 if __name__ == "__main__":
     test_suite = TestDongjingGroupAddToCart()
     test_suite.setup()
@@ -36,15 +36,10 @@ class TestDongjingGroupLoginAPI(TestCase):
         })
         
         if response.status_code == 200:
-            response_data = response.json
-            if response_data.get("success"):
-                data = response_data.get("data", {})
-                self.user_id = data.get("fid")
-                self.fid = data.get("fid")
-                self.user_area_code = data.get("fkeyarea", 330304004)
+            if response.extract("success", default=False):
+                self.user_id = self.fid = response.extract("data.fid", "fid", default=None)
+                self.user_area_code = response.extract("data.fkeyarea", "fuserBrowseAreaCode", default=330304004)
                 self.set_variable("fuserId", self.user_id)
-                self.set_variable("fid", self.fid)
-                self.set_variable("fuserBrowseAreaCode", self.user_area_code)
     
     def test_successful_login(self):
         """测试东经易网成功登录 - 修复TypeError错误"""
@@ -72,8 +67,7 @@ class TestDongjingGroupLoginAPI(TestCase):
             .response_time_less_than(3000)
         
         if response.status_code == 200:
-            response_data = response.json
-            if response_data.get("success"):
+            if response.extract("success", default=False):
                 token_cookie = response.headers.get("Set-Cookie", "")
                 print(f"响应Cookie: {token_cookie}")
                 
@@ -88,13 +82,9 @@ class TestDongjingGroupLoginAPI(TestCase):
                         self.set_variable("auth_token", self.auth_token)
                         print(f"登录成功，从Cookie获取到token: {self.auth_token[:20]}...")
                 
-                data = response_data.get("data", {})
-                self.user_id = data.get("fid")
-                self.fid = data.get("fid")
-                self.user_area_code = data.get("fkeyarea", 330304004)
+                self.user_id = self.fid = response.extract("data.fid", "fid", default=None)
+                self.user_area_code = response.extract("data.fkeyarea", "fuserBrowseAreaCode", default=330304004)
                 self.set_variable("fuserId", self.user_id)
-                self.set_variable("fid", self.fid)
-                self.set_variable("fuserBrowseAreaCode", self.user_area_code)
                 print(f"登录返回用户ID: {self.user_id}")
                 print(f"登录返回FID: {self.fid}")
                 print(f"登录返回用户区域码: {self.user_area_code}")
@@ -0,0 +1,188 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import fixtures
+from core.assertions import AssertionError
+from core.fixtures import LoginFixture
+from core.http_client import HTTPClient
+from tests.stub_adapter import FakeClock, mount_stub
+
+
+class Server:
+    """登录接口签发递增的 token（写入 Cookie），/profile 只接受最近一次签发的 token"""
+
+    def __init__(self, login_delay: float = 0.0):
+        self.login_delay = login_delay
+        self.logins = 0
+        self.valid_token = None
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        path = request.path_url
+        if path == "/login":
+            time.sleep(self.login_delay)
+            with self.lock:
+                self.logins += 1
+                self.valid_token = f"t{self.logins}"
+            headers = {"Set-Cookie": f"token={self.valid_token}; Path=/", "Content-Type": "application/json"}
+            return 200, headers, {"success": True, "data": {"fid": "u-1", "areas": [{"code": "3301"}]}}
+        if path == "/bad-login":
+            return 200, {"Content-Type": "application/json"}, {"success": False, "msg": "密码错误"}
+        token = (request.headers.get("Cookie") or "").replace("token=", "")
+        if token != self.valid_token:
+            return 401, {}, {"success": False}
+        return 200, {"Content-Type": "application/json"}, {"success": True, "token": token}
+
+
+class Case:
+    """LoginFixture.apply 只用到 client 和 set_variable"""
+
+    def __init__(self, server):
+        self.client = HTTPClient("http://api.test")
+        mount_stub(self.client, server)
+        self.variables = {}
+
+    def set_variable(self, key, value):
+        self.variables[key] = value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fixtures, "time", clock)
+    return clock
+
+
+def make_fixture(**kwargs):
+    kwargs.setdefault("scope", "suite")
+    kwargs.setdefault("variables", {"fuserId": "data.fid", "area": "data.areas[0].code", "absent": "data.none.x"})
+    return LoginFixture("/login", {"username": "u", "password": "p"}, **kwargs)
+
+
+def test_login_is_cached_across_clients(clock):
+    server = Server()
+    login = make_fixture()
+    first, second = Case(server), Case(server)
+    session = login.apply(first)
+    assert login.apply(second) is session
+    assert server.logins == 1
+    assert login.stats() == {"logins": 1, "reuses": 1, "refreshes": 0}
+    assert second.client.get("/profile").json()["token"] == "t1"
+    assert second.variables == {"fuserId": "u-1", "area": "3301", "absent": None, "auth_token": "t1"}
+
+
+def test_different_credentials_do_not_share_sessions(clock):
+    server = Server()
+    login = make_fixture()
+    other = LoginFixture("/login", {"username": "u", "password": "other"}, scope="suite")
+    other.cache = login.cache
+    case = Case(server)
+    login.apply(case)
+    other.apply(case)
+    assert server.logins == 2
+
+
+def test_session_scope_shares_cache_between_fixtures(clock):
+    fixtures.SESSION_CACHE.clear()
+    server = Server()
+    try:
+        make_fixture(scope="session").apply(Case(server))
+        make_fixture(scope="session").apply(Case(server))
+        assert server.logins == 1
+    finally:
+        fixtures.SESSION_CACHE.clear()
+
+
+def test_expired_session_relogs_before_request(clock):
+    server = Server()
+    login = make_fixture(ttl=60)
+    case = Case(server)
+    login.apply(case)
+    clock.now += 59
+    assert case.client.get("/profile").json()["token"] == "t1"
+    clock.now += 1
+    assert case.client.get("/profile").json()["token"] == "t2"
+    assert login.stats()["refreshes"] == 1
+    # 过期后 apply 同样重新登录
+    clock.now += 60
+    login.apply(Case(server))
+    assert server.logins == 3
+
+
+def test_concurrent_apply_logs_in_once():
+    server = Server(login_delay=0.05)
+    login = make_fixture()
+    cases = [Case(server) for _ in range(8)]
+    barrier = threading.Barrier(len(cases))
+    sessions = []
+
+    def worker(case):
+        barrier.wait()
+        sessions.append(login.apply(case))
+
+    threads = [threading.Thread(target=worker, args=(case,)) for case in cases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert server.logins == 1
+    assert len(sessions) == len(cases)
+    assert all(session is sessions[0] for session in sessions)
+    assert login.stats() == {"logins": 1, "reuses": 7, "refreshes": 0}
+
+
+def test_unauthorized_relogs_and_retries_once(clock):
+    server = Server()
+    login = make_fixture()
+    case = Case(server)
+    login.apply(case)
+    # 服务端让 token 失效
+    server.valid_token = None
+    response = case.client.get("/profile")
+    assert response.status_code == 200
+    assert response.json()["token"] == "t2"
+    assert login.stats()["refreshes"] == 1
+
+
+def test_unauthorized_reuses_session_refreshed_by_another_client(clock):
+    server = Server()
+    login = make_fixture()
+    first, second = Case(server), Case(server)
+    login.apply(first)
+    login.apply(second)
+    server.valid_token = None
+    assert first.client.get("/profile").status_code == 200
+    # second 仍持有旧登录态：收到 401 后直接换用 first 刷新的结果，不再登录
+    assert second.client.get("/profile").json()["token"] == "t2"
+    assert server.logins == 2
+    assert second.client.login_session is first.client.login_session
+
+
+def test_on_unauthorized_reports_whether_session_changed(clock, monkeypatch):
+    server = Server()
+    login = make_fixture()
+    case = Case(server)
+    session = login.apply(case)
+    assert login.on_unauthorized(case.client)
+    assert case.client.login_session is not session
+    # 拿不到新的登录态时不重试
+    current = case.client.login_session
+    monkeypatch.setattr(login, "session_for", lambda client, stale=None: current)
+    assert not login.on_unauthorized(case.client)
+    assert login.stats()["refreshes"] == 1
+
+
+def test_login_failure_raises(clock):
+    server = Server()
+    login = LoginFixture("/bad-login", {"username": "u", "password": "p"}, scope="suite")
+    with pytest.raises(AssertionError, match="密码错误"):
+        login.apply(Case(server))
+    with pytest.raises(ValueError):
+        LoginFixture("/login", {}, scope="global")
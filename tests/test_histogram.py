@@ -0,0 +1,108 @@
+import math
+import random
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.histogram import HistogramSet, LatencyHistogram, endpoint_key
+
+PERCENTILES = (1, 10, 25, 50, 75, 90, 95, 99, 99.9, 100)
+
+
+def exact_percentile(ordered, q):
+    """与 LatencyHistogram 相同的最近秩定义"""
+    rank = min(max(int(len(ordered) * q / 100.0 + 0.5), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+def latency_samples(seed, count=20000):
+    rng = random.Random(seed)
+    # 对数正态分布：中位数约 20ms，长尾到秒级
+    return [int(rng.lognormvariate(math.log(20e6), 1.2)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("significant_digits, max_error", [(1, 0.1), (2, 0.01), (3, 0.001)])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_percentile_relative_error_bound(seed, significant_digits, max_error):
+    samples = latency_samples(seed)
+    histogram = LatencyHistogram(significant_digits=significant_digits)
+    for value in samples:
+        histogram.record(value)
+    ordered = sorted(samples)
+    for q in PERCENTILES:
+        expected = exact_percentile(ordered, q)
+        actual = histogram.value_at_percentile(q)
+        # 取区间最大值：不会低于真实值，偏高不超过相对误差上限
+        assert expected <= actual
+        assert (actual - expected) / expected <= max_error, (q, expected, actual)
+
+
+def test_extremes_and_mean_are_exact():
+    samples = latency_samples(4, 5000)
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+    assert histogram.count == len(samples)
+    assert histogram.min == min(samples)
+    assert histogram.max == max(samples)
+    assert histogram.value_at_percentile(100) == max(samples)
+    assert histogram.mean == sum(samples) / len(samples)
+
+
+def test_values_below_lowest_stay_within_max():
+    histogram = LatencyHistogram(lowest=1_000)
+    for value in (0, 10, 999):
+        histogram.record(value)
+    # 低于最小可区分值的样本落在第一个区间，结果限制在 [min, max] 内
+    assert histogram.value_at_percentile(50) <= 999
+
+
+def test_values_above_highest_are_clamped():
+    histogram = LatencyHistogram(highest=1_000_000_000)
+    histogram.record(5_000_000_000)
+    histogram.record(1_000)
+    assert histogram.max == 5_000_000_000
+    assert histogram.value_at_percentile(100) == 5_000_000_000
+    # 接近 lowest 的值只能区分到 lowest 量级（绝对误差），相对误差上限不适用
+    assert 1_000 <= histogram.value_at_percentile(50) < 2 * 1_000
+
+
+def test_merge_equals_single_histogram():
+    samples = latency_samples(5, 9000)
+    combined = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(3)]
+    for index, value in enumerate(samples):
+        combined.record(value)
+        parts[index % 3].record(value)
+    merged = LatencyHistogram()
+    for part in parts:
+        merged.merge(part)
+    assert merged.counts == combined.counts
+    assert (merged.count, merged.total, merged.min, merged.max) == \
+        (combined.count, combined.total, combined.min, combined.max)
+
+
+def test_snapshot_round_trip():
+    histogram = LatencyHistogram()
+    for value in latency_samples(6, 2000):
+        histogram.record(value)
+    restored = LatencyHistogram.from_snapshot(histogram.snapshot())
+    for q in PERCENTILES:
+        assert restored.value_at_percentile(q) == histogram.value_at_percentile(q)
+
+
+def test_incompatible_histograms_do_not_merge():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=2).merge(LatencyHistogram(significant_digits=3))
+
+
+def test_histogram_set_groups_by_endpoint_template():
+    histograms = HistogramSet()
+    histograms.record(endpoint_key("get", "/api/orders/123?x=1"), 1_000_000)
+    histograms.record(endpoint_key("GET", "http://api.test/api/orders/456"), 3_000_000)
+    assert histograms.keys() == ["GET /api/orders/{id}"]
+    assert histograms.get("GET /api/orders/{id}").count == 2
@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.jsonpath import MISSING, WILDCARD, compile_path, extract, parse_path
+
+DOCUMENT = {
+    "success": True,
+    "data": {
+        "total": 3,
+        "note": None,
+        "name": "abc",
+        "list": [
+            {"fid": "a", "tags": ["x", "y"]},
+            {"fid": "b", "tags": []},
+            {"tags": ["z"]}
+        ],
+        "map": {"k1": {"v": 1}, "k2": {"v": 2}}
+    }
+}
+
+
+@pytest.mark.parametrize("path, segments", [
+    ("", ()),
+    ("success", ("success",)),
+    ("data.list[0].fid", ("data", "list", 0, "fid")),
+    ("data.list[*].tags[1]", ("data", "list", WILDCARD, "tags", 1)),
+    ("[2]", (2,)),
+    ("matrix[1][-1]", ("matrix", 1, -1)),
+    ("data.map.*.v", ("data", "map", WILDCARD, "v")),
+])
+def test_parse_path(path, segments):
+    assert parse_path(path) == segments
+
+
+def test_compile_path_is_cached():
+    assert compile_path("data.list[0].fid") is compile_path("data.list[0].fid")
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("", DOCUMENT),
+    ("data.total", 3),
+    ("data.list[0].fid", "a"),
+    ("data.list[-1].tags[0]", "z"),
+    # null 是存在的值，与 MISSING 区分
+    ("data.note", None),
+])
+def test_lookup_existing(path, expected):
+    json_path = compile_path(path)
+    assert json_path.lookup(DOCUMENT) == expected
+    assert json_path.exists(DOCUMENT)
+    assert json_path.get(DOCUMENT) == expected
+
+
+@pytest.mark.parametrize("path", [
+    "missing",
+    "data.list[3].fid",
+    "data.list[2].fid",
+    "data.total.value",
+    "data.note.value",
+    # 字符串按下标取到的是字符，不算 JSON 数组元素
+    "data.name[0]",
+    "data.map[0]",
+    "data.list.fid",
+])
+def test_missing_paths(path):
+    json_path = compile_path(path)
+    assert json_path.lookup(DOCUMENT) is MISSING
+    assert not json_path.exists(DOCUMENT)
+    assert json_path.find(DOCUMENT) == []
+    assert json_path.get(DOCUMENT, "默认") == "默认"
+    with pytest.raises(KeyError, match=path.replace("[", r"\[").replace("]", r"\]")):
+        json_path.get(DOCUMENT)
+
+
+def test_wildcard_collects_existing_values():
+    assert compile_path("data.list[*].fid").lookup(DOCUMENT) == ["a", "b"]
+    assert compile_path("data.list[*].tags[*]").find(DOCUMENT) == ["x", "y", "z"]
+    assert compile_path("data.map.*.v").lookup(DOCUMENT) == [1, 2]
+    assert compile_path("data.list[*].tags[0]").lookup(DOCUMENT) == ["x", "z"]
+
+
+def test_wildcard_without_matches():
+    json_path = compile_path("data.list[*].price")
+    assert json_path.lookup(DOCUMENT) == []
+    assert not json_path.exists(DOCUMENT)
+    # 含通配符的路径 get 返回匹配值的列表，没有匹配时为空列表
+    assert json_path.get(DOCUMENT) == []
+    assert compile_path("data.total[*]").find(DOCUMENT) == []
+
+
+def test_extract():
+    assert extract(DOCUMENT, "data.list[1].fid") == "b"
+    assert extract(DOCUMENT, "data.list[9]", None) is None
+    with pytest.raises(KeyError):
+        extract(DOCUMENT, "data.absent")
@@ -0,0 +1,59 @@
+import json
+import pickle
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.load import ArrivalRateTest, LoadTest, arrival_times
+from core.reporter import Reporter
+from core.test_case import TestCase
+from tests.stub_adapter import mount_stub
+
+
+def scenario():
+    raise NotImplementedError
+
+
+@pytest.mark.parametrize("executor", [LoadTest, ArrivalRateTest])
+def test_executor_is_picklable_for_spawned_workers(executor):
+    # spawn/forkserver 启动方式下压测对象需要 pickle 到子进程，on_report 常为 lambda，不随之传递
+    load_test = executor(scenario, processes=2, on_report=lambda report: None)
+    restored = pickle.loads(pickle.dumps(load_test))
+    assert restored.on_report is None
+    assert restored.scenarios == [scenario]
+    assert restored.stages == load_test.stages
+
+
+def test_arrival_times_are_evenly_spaced():
+    assert list(arrival_times([(1.0, 4.0)])) == [0.0, 0.25, 0.5, 0.75]
+    assert list(arrival_times([(1.0, 2.0), (1.0, 0.0), (1.0, 1.0)])) == [0.0, 0.5, 2.0]
+
+
+def test_arrival_times_split_across_processes():
+    shares = [list(arrival_times([(1.0, 8.0)], 1.0 / 2, process_id / 2)) for process_id in range(2)]
+    merged = sorted(shares[0] + shares[1])
+    assert merged == pytest.approx([index / 8 for index in range(8)])
+
+
+def stub_scenario():
+    test_case = TestCase("列表", "http://api.test")
+    mount_stub(test_case.client, lambda request: (500 if request.path_url.endswith("/7") else 200, {}, b"{}"))
+    test_case.plan("查询", lambda: [test_case.get(f"/items/{index}") for index in range(8)])
+    return test_case
+
+
+def test_load_result_rendered_in_html_report(tmp_path):
+    load_test = LoadTest(stub_scenario, vus=2, duration=0.3, client="sync", report_interval=0.1,
+                         on_report=lambda report: None, name="列表压测")
+    result = load_test.run().to_dict()
+    files = Reporter(str(tmp_path)).generate_load_reports(result)
+    html = Path(files["html"]).read_text(encoding="utf-8")
+    assert "压测报告 - 列表压测" in html
+    assert "GET /items/{id}" in html
+    assert f"{result['requests']}" in html
+    assert "时间线" in html
+    assert json.loads(Path(files["json"]).read_text(encoding="utf-8"))["requests"] == result["requests"]
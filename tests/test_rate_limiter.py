@@ -0,0 +1,127 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import rate_limiter
+from core.rate_limiter import ConcurrencyLimiter, RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """替换 core.rate_limiter 中的 time 模块：sleep 只推进时钟，不真正等待"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_burst_is_free_then_spaced_by_rate(clock):
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 令牌透支：第 n 个超出的请求等待 n / rate 秒
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_tokens_refill_over_time(clock):
+    bucket = TokenBucket(rate=4, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 0.25
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.25)
+
+
+def test_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(rate=100, burst=2)
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.01])
+
+
+def test_sustained_rate_matches_configuration(clock):
+    limiter = RateLimiter()
+    limiter.set_limit("http://api.test", rps=20, burst=1)
+    start = clock.now
+    for _ in range(101):
+        limiter.acquire("http://api.test/a")
+    # 第一个请求不等待，之后每个请求间隔 1/20 秒
+    assert clock.now - start == pytest.approx(5.0)
+    assert all(delay == pytest.approx(0.05) for delay in clock.sleeps)
+    stats = limiter.stats()["api.test"]
+    assert stats["requests"] == 101
+    assert stats["delayed"] == 100
+    assert stats["max_wait_ms"] == pytest.approx(50.0)
+
+
+def test_acquire_returns_queue_wait(clock):
+    limiter = RateLimiter()
+    limiter.set_limit("api.test", rps=2, burst=1)
+    assert limiter.acquire("http://api.test/a") == 0.0
+    assert limiter.acquire("http://API.test/b") == pytest.approx(0.5)
+    # 其它主机不受限
+    assert limiter.acquire("http://other.test/a") == 0.0
+    assert clock.sleeps == pytest.approx([0.5])
+
+
+def test_async_acquire_uses_same_bucket(clock, monkeypatch):
+    limiter = RateLimiter()
+    limiter.set_limit("api.test", rps=10, burst=1)
+    waits = []
+
+    async def fake_sleep(seconds):
+        clock.sleep(seconds)
+
+    async def main():
+        for _ in range(3):
+            waits.append(await limiter.acquire_async("http://api.test/a"))
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    asyncio.run(main())
+    assert waits == pytest.approx([0.0, 0.1, 0.1])
+
+
+def test_concurrency_limiter_hands_slots_over_in_order():
+    limiter = ConcurrencyLimiter(max_in_flight=1)
+    limiter.acquire()
+    order = []
+
+    def worker(name):
+        limiter.acquire()
+        order.append(name)
+
+    threads = []
+    for name in ("a", "b"):
+        thread = threading.Thread(target=worker, args=(name,))
+        thread.start()
+        threads.append(thread)
+        # 等待线程进入等待队列后再启动下一个，保证排队顺序
+        while len(limiter._waiters) < len(threads):
+            pass
+    limiter.release()
+    threads[0].join(5)
+    limiter.release()
+    threads[1].join(5)
+    assert order == ["a", "b"]
+    assert limiter.in_flight == 1
+    limiter.release()
+    assert limiter.in_flight == 0
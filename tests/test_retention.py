@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import retention
+from core.assertions import AssertionError
+from core.http_client import ResponseWrapper
+from core.retention import COMPACT, KEEP_ALL, KEEP_FAILURES, CompactResult, CompactStep, body_hash
+from core.test_case import TestCase
+from tests.stub_adapter import mount_stub
+
+BODY = b'{"success": true, "data": {"list": [1, 2, 3]}}'
+
+
+def make_case(policy: str, fail: bool = False) -> TestCase:
+    case = TestCase("retention", "http://api.test")
+    mount_stub(case.client, lambda request: (200, {"Content-Type": "application/json"}, BODY))
+    case.set_retention(policy)
+
+    def fetch():
+        response = case.get("/items")
+        if fail:
+            raise AssertionError("列表为空")
+        return response
+
+    case.plan("fetch", fetch)
+    case.plan("check", lambda: None)
+    case.run()
+    return case
+
+
+def request_step(case):
+    return case.steps[0].children[0]
+
+
+def strip_timing(summary):
+    return [{key: value for key, value in step.items() if key not in ("duration", "timings")}
+            for step in summary["steps"]]
+
+
+def test_keep_all_retains_responses():
+    case = make_case(KEEP_ALL)
+    step = request_step(case)
+    assert isinstance(step.result, ResponseWrapper)
+    assert step.to_dict()["response"] == {
+        "status_code": 200, "url": "http://api.test/items", "size": len(BODY), "body_hash": body_hash(BODY)
+    }
+
+
+def test_compact_keeps_summary_without_response_objects():
+    full = make_case(KEEP_ALL)
+    case = make_case(COMPACT)
+    assert all(isinstance(step, CompactStep) for step in case.steps)
+    step = request_step(case)
+    assert isinstance(step.result, CompactResult)
+    assert step.executed and step.is_request
+    # 报告字段与完整保留时相同
+    assert strip_timing(case.get_summary()) == strip_timing(full.get_summary())
+
+
+def test_keep_failures_compacts_passing_cases_without_summaries():
+    case = make_case(KEEP_FAILURES)
+    assert case.passed
+    assert all(isinstance(step, CompactStep) for step in case.steps)
+    assert request_step(case).result is None
+    steps = case.get_summary()["steps"]
+    assert [step["name"] for step in steps] == ["fetch", "GET /items", "check"]
+    assert all(step["passed"] and step["response"] is None for step in steps)
+
+
+def test_keep_failures_retains_failed_cases():
+    case = make_case(KEEP_FAILURES, fail=True)
+    assert not case.passed
+    assert isinstance(request_step(case).result, ResponseWrapper)
+    assert case.error.__traceback__ is not None
+
+
+def test_compact_failed_case_drops_tracebacks():
+    case = make_case(COMPACT, fail=True)
+    assert not case.passed
+    assert case.steps[0].error == "列表为空"
+    assert case.steps[1].status == "planned"
+    assert case.error.__traceback__ is None
+
+
+def test_response_body_is_hashed_once(monkeypatch):
+    calls = []
+
+    def counting_hash(content):
+        calls.append(len(content))
+        return body_hash(content)
+
+    monkeypatch.setattr(retention, "body_hash", counting_hash)
+    case = make_case(KEEP_ALL)
+    for _ in range(3):
+        case.get_summary()
+    assert calls == [len(BODY)]
+    case.set_retention(COMPACT)
+    case._apply_retention()
+    case.get_summary()
+    assert calls == [len(BODY)]
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        TestCase("retention").set_retention("none")
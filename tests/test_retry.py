@@ -0,0 +1,200 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core import retry
+from core.retry import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, RetryBudget, RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeClock:
+    """替换 core.retry 中的 time 模块，熔断器的恢复时间由测试推进"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry, "time", clock)
+    return clock
+
+
+def make_policy(**kwargs) -> RetryPolicy:
+    # 预算足够大，只验证幂等规则
+    kwargs.setdefault("budget", RetryBudget(min_tokens=100))
+    return RetryPolicy(max_retries=3, **kwargs)
+
+
+@pytest.mark.parametrize("method", ["GET", "HEAD", "PUT", "DELETE", "OPTIONS", "get"])
+def test_idempotent_methods_retry_after_request_sent(method):
+    policy = make_policy()
+    assert policy.should_retry_error(method, None, request_sent=True, attempt=0)
+    assert policy.should_retry_response(method, None, FakeResponse(500), attempt=0)
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH"])
+def test_non_idempotent_not_retried_once_request_sent(method):
+    policy = make_policy()
+    assert not policy.should_retry_error(method, None, request_sent=True, attempt=0)
+    # 请求没有发出（如建连失败）时可以安全重试
+    assert policy.should_retry_error(method, None, request_sent=False, attempt=0)
+
+
+def test_non_idempotent_retried_only_on_not_processed_status():
+    policy = make_policy()
+    assert not policy.should_retry_response("POST", None, FakeResponse(500), attempt=0)
+    assert not policy.should_retry_response("POST", None, FakeResponse(502), attempt=0)
+    assert policy.should_retry_response("POST", None, FakeResponse(503), attempt=0)
+    assert policy.should_retry_response("POST", None, FakeResponse(429), attempt=0)
+
+
+def test_idempotency_key_makes_post_retryable():
+    policy = make_policy()
+    headers = {"Idempotency-Key": "order-1"}
+    assert policy.should_retry_error("POST", headers, request_sent=True, attempt=0)
+    assert policy.should_retry_response("POST", {"idempotency-key": "order-1"}, FakeResponse(500), attempt=0)
+
+
+def test_retry_non_idempotent_option():
+    policy = make_policy(retry_non_idempotent=True)
+    assert policy.should_retry_error("POST", None, request_sent=True, attempt=0)
+    assert policy.should_retry_response("POST", None, FakeResponse(500), attempt=0)
+
+
+def test_no_retry_for_success_or_client_error():
+    policy = make_policy()
+    assert not policy.should_retry_response("GET", None, FakeResponse(200), attempt=0)
+    assert not policy.should_retry_response("GET", None, FakeResponse(404), attempt=0)
+
+
+def test_max_retries_stops_retrying():
+    policy = make_policy()
+    assert policy.should_retry_error("GET", None, request_sent=True, attempt=2)
+    assert not policy.should_retry_error("GET", None, request_sent=True, attempt=3)
+    assert not policy.should_retry_response("GET", None, FakeResponse(503), attempt=3)
+
+
+def test_budget_limits_retries():
+    policy = RetryPolicy(max_retries=10, budget=RetryBudget(ratio=0.5, min_tokens=2))
+    assert policy.should_retry_error("GET", None, True, 0)
+    assert policy.should_retry_error("GET", None, True, 0)
+    assert not policy.should_retry_error("GET", None, True, 0)
+    # 每个请求存入 0.5 个令牌，两个请求后可以再重试一次
+    policy.budget.deposit()
+    policy.budget.deposit()
+    assert policy.should_retry_error("GET", None, True, 0)
+    assert not policy.should_retry_error("GET", None, True, 0)
+
+
+def test_retry_after_only_for_not_processed_status():
+    policy = make_policy(max_retry_after=5)
+    assert policy.get_retry_after(FakeResponse(503, {"Retry-After": "2"})) == 2.0
+    assert policy.get_retry_after(FakeResponse(429, {"Retry-After": "60"})) == 5
+    assert policy.get_retry_after(FakeResponse(500, {"Retry-After": "2"})) is None
+    assert policy.get_retry_after(FakeResponse(503, {"Retry-After": "soon"})) is None
+
+
+def test_next_delay_within_bounds():
+    policy = make_policy(base_delay=0.1, max_delay=1.0)
+    retry.random.seed(7)
+    delay = 0.0
+    for _ in range(50):
+        previous = delay
+        delay = policy.next_delay(previous)
+        assert 0.1 <= delay <= min(1.0, max(previous, 0.1) * 3)
+
+
+def test_first_retry_delay_is_jittered():
+    policy = make_policy(base_delay=0.1, max_delay=1.0)
+    retry.random.seed(7)
+    delays = [policy.next_delay(0.0) for _ in range(200)]
+    assert all(0.1 <= delay <= 0.3 for delay in delays)
+    # 首次重试的等待时间分散在 [base, base * 3]，并发客户端不会同时重试
+    assert max(delays) - min(delays) > 0.1
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("GET /a", failure_threshold=3, recovery_timeout=10)
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.before_request()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_request()
+    assert info.value.retry_in == pytest.approx(10)
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("GET /a", failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_probe_closes_on_success(clock):
+    breaker = CircuitBreaker("GET /a", failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+    clock.now += 9.5
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_request()
+    assert info.value.retry_in == pytest.approx(0.5)
+    clock.now += 0.5
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 探测请求进行中，其它请求仍然快速失败
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+def test_breaker_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("GET /a", failure_threshold=5, recovery_timeout=10)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 半开状态下一次失败就重新打开，恢复时间从此刻重新计算
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock.now
+    clock.now += 5
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_registry_keys_by_method_and_path():
+    registry = CircuitBreakerRegistry()
+    breaker = registry.get("get", "http://api.test/a?x=1")
+    assert registry.get("GET", "http://api.test/a?x=2") is breaker
+    assert registry.get("POST", "http://api.test/a") is not breaker
+    assert registry.get("GET", "http://api.test/b") is not breaker
+    assert registry.states() == {
+        "GET http://api.test/a": "closed",
+        "POST http://api.test/a": "closed",
+        "GET http://api.test/b": "closed"
+    }
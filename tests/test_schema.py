@@ -0,0 +1,112 @@
+import copy
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+from jsonschema import SchemaError
+
+from core import schema as schema_module
+from core.schema import SchemaCache, schema_fingerprint, validate_many
+
+
+def make_schema(required="fid"):
+    return {
+        "type": "object",
+        "required": [required],
+        "properties": {required: {"type": "string"}, "count": {"type": "integer", "minimum": 0}}
+    }
+
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    calls = []
+
+    def counting(schema):
+        calls.append(schema)
+        return schema_fingerprint(schema)
+
+    monkeypatch.setattr(schema_module, "schema_fingerprint", counting)
+    return calls
+
+
+def test_fingerprint_ignores_key_order():
+    schema = make_schema()
+    reordered = {key: schema[key] for key in reversed(list(schema))}
+    assert schema_fingerprint(reordered) == schema_fingerprint(schema)
+    assert schema_fingerprint(make_schema("uid")) != schema_fingerprint(schema)
+
+
+def test_same_object_hits_without_fingerprinting(fingerprints):
+    cache = SchemaCache()
+    schema = make_schema()
+    compiled = cache.get(schema)
+    for _ in range(5):
+        assert cache.get(schema) is compiled
+    assert len(fingerprints) == 1
+    assert cache.stats() == {"size": 1, "hits": 5, "misses": 1, "evictions": 0}
+
+
+def test_equal_content_shares_compiled_validator(fingerprints):
+    cache = SchemaCache()
+    compiled = cache.get(make_schema())
+    # 内容相同的另一个对象需要计算一次指纹，之后同样命中
+    copy_of = make_schema()
+    assert cache.get(copy_of) is compiled
+    assert cache.get(copy_of) is compiled
+    assert len(fingerprints) == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_identity_is_checked_when_ids_are_reused(fingerprints):
+    cache = SchemaCache()
+    schema = make_schema()
+    cache.get(schema)
+    # 模拟 id 被另一个对象复用：记录的对象与传入的对象不同时重新计算指纹
+    other = make_schema("uid")
+    cache._identities[id(other)] = cache._identities.pop(id(schema))
+    assert cache.get(other).schema is other
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction():
+    cache = SchemaCache(maxsize=2)
+    first, second, third = make_schema("a"), make_schema("b"), make_schema("c")
+    compiled_first = cache.get(first)
+    cache.get(second)
+    assert cache.get(first) is compiled_first
+    cache.get(third)
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+    # second 最久未使用，被淘汰
+    assert cache.get(first) is compiled_first
+    cache.get(second)
+    assert cache.stats()["misses"] == 4
+    assert len(cache._identities) <= 2
+
+
+def test_clear_forgets_identities():
+    cache = SchemaCache()
+    schema = make_schema()
+    cache.get(schema)
+    cache.clear()
+    schema["required"] = ["count"]
+    assert cache.get(schema).is_valid({"count": 1})
+    assert len(cache) == 1
+
+
+def test_invalid_schema_raises_once_compiled():
+    cache = SchemaCache()
+    with pytest.raises(SchemaError):
+        cache.get({"type": "no-such-type"})
+    assert len(cache) == 0
+
+
+def test_validate_many_reports_failing_indices():
+    schema = make_schema()
+    instances = [{"fid": "a"}, {"count": 1}, {"fid": "b", "count": -1}, copy.deepcopy({"fid": "c"})]
+    failures = validate_many(schema, instances)
+    assert [index for index, _ in failures] == [1, 2]
+    assert "fid" in failures[0][1].message
@@ -0,0 +1,114 @@
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.assertions import AssertionError
+from core.slo import LatencySeries, SLOAssertions, assert_slo, series_from_responses
+
+MS = 1_000_000
+
+
+class Response:
+    def __init__(self, elapsed_ms: float, status_code: int = 200):
+        self.elapsed = timedelta(milliseconds=elapsed_ms)
+        self.status_code = status_code
+
+
+def series_with(latencies_ms, name="GET /items", start=100.0, spacing=0.1, errors=()):
+    """第 i 个样本在 start + i * spacing 结束"""
+    series = LatencySeries(name)
+    for index, latency in enumerate(latencies_ms):
+        series.record(int(latency * MS), index in errors, start + index * spacing)
+    return series
+
+
+def test_window_spans_first_start_to_last_finish():
+    series = series_with([50, 20, 10], spacing=1.0)
+    # 第一个样本从 99.95 开始，最后一个在 102.0 结束
+    assert series.window == pytest.approx(2.05)
+    assert series.throughput == pytest.approx(3 / 2.05)
+
+
+def test_explicit_elapsed_overrides_window():
+    series = series_with([10] * 30)
+    series.elapsed = 10.0
+    assert series.throughput == pytest.approx(3.0)
+
+
+def test_untimed_samples_have_no_window():
+    series = series_from_responses((Response(10) for _ in range(5)), "batch")
+    assert series.count == 5
+    assert series.window == 0.0
+    assert series.throughput == 0.0
+    assert series_from_responses([Response(10)] * 5, elapsed=2.0).throughput == pytest.approx(2.5)
+
+
+def test_merge_combines_counts_percentiles_and_window():
+    fast = series_with([10] * 90, start=100.0, spacing=0.01)
+    slow = series_with([1000] * 10, start=105.0, spacing=0.01, errors={0, 1})
+    merged = LatencySeries("all").merge(fast).merge(slow)
+    assert merged.count == 100
+    assert merged.errors == 2
+    assert merged.error_rate == pytest.approx(0.02)
+    assert merged.percentile_ms(50) == pytest.approx(10, rel=0.01)
+    assert merged.percentile_ms(95) == pytest.approx(1000, rel=0.01)
+    assert merged.window == pytest.approx(105.09 - (100.0 - 0.01))
+
+
+def test_merge_takes_longest_elapsed():
+    first = LatencySeries("a", elapsed=5.0)
+    second = LatencySeries("b", elapsed=8.0)
+    assert first.merge(second).elapsed == 8.0
+    assert LatencySeries("c").merge(first).elapsed == 8.0
+
+
+def test_record_response_counts_4xx_and_5xx_as_errors():
+    series = LatencySeries()
+    for status in (200, 204, 302, 404, 503):
+        series.record_response(Response(5, status), timed=False)
+    assert series.errors == 2
+    series.record_response(Response(5, 500), error=False, timed=False)
+    assert series.errors == 2
+
+
+def test_passing_assertions_chain():
+    series = series_with([10] * 99 + [200], errors={0})
+    SLOAssertions(series).min_samples(100).p50_less_than(11).p99_less_than(12)\
+        .error_rate_below(0.02).throughput_at_least(5)
+
+
+def test_percentile_failure_message():
+    series = series_with([10] * 90 + [500] * 10)
+    with pytest.raises(AssertionError) as info:
+        SLOAssertions(series).p95_less_than(100)
+    message = str(info.value)
+    assert message.startswith("延迟SLO断言失败: GET /items 期望 p95 < 100ms, 实际 p95 ")
+    assert "(样本数 100)" in message
+    assert info.value.expected == 100
+
+
+def test_error_rate_failure_message():
+    series = series_with([10] * 20, errors={1, 2, 3})
+    with pytest.raises(AssertionError, match=r"错误率SLO断言失败: GET /items 期望低于 10\.00%, 实际 15\.00% \(3/20\)"):
+        SLOAssertions(series).error_rate_below(0.1)
+
+
+def test_throughput_failure_messages():
+    series = series_with([10] * 10, spacing=1.0)
+    with pytest.raises(AssertionError, match=r"期望至少 5 req/s, 实际 1\.1 req/s \(10 个请求 / 9\.010s\)"):
+        SLOAssertions(series).throughput_at_least(5)
+    untimed = series_from_responses([Response(10)] * 3)
+    with pytest.raises(AssertionError, match="样本没有时间窗口"):
+        assert_slo(untimed).throughput_at_least(1)
+
+
+def test_empty_series_and_min_samples():
+    with pytest.raises(AssertionError, match="SLO断言失败: empty 没有样本"):
+        SLOAssertions(LatencySeries("empty")).p99_less_than(100)
+    with pytest.raises(AssertionError, match="期望至少 10 个样本, 实际 3"):
+        assert_slo([Response(10)] * 3).min_samples(10)
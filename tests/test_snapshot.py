@@ -0,0 +1,141 @@
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.snapshot import IGNORED, Difference, SnapshotStore, StructuralHasher, format_diff, raw_hash
+
+DOCUMENT = {
+    "success": True,
+    "updateTime": "t0",
+    "data": {
+        "total": 2,
+        "updateTime": "t1",
+        "list": [
+            {"fid": "a", "uuid": "u1", "detail": {"updateTime": "t2", "price": 1}},
+            {"fid": "b", "uuid": "u2", "detail": {"updateTime": "t3", "price": 2}}
+        ]
+    }
+}
+
+
+def test_strip_any_depth():
+    stripped = StructuralHasher(["**.updateTime"]).strip(DOCUMENT)
+    assert "updateTime" not in stripped
+    assert "updateTime" not in stripped["data"]
+    assert all("updateTime" not in item["detail"] for item in stripped["data"]["list"])
+    assert stripped["data"]["list"][0]["detail"] == {"price": 1}
+
+
+def test_strip_any_depth_in_the_middle():
+    stripped = StructuralHasher(["data.**.updateTime"]).strip(DOCUMENT)
+    # ** 之前的前缀限定了范围：根上的 updateTime 保留
+    assert stripped["updateTime"] == "t0"
+    assert "updateTime" not in stripped["data"]
+    assert stripped["data"]["list"][1]["detail"] == {"price": 2}
+
+
+def test_strip_wildcard_and_indexed_ignores():
+    stripped = StructuralHasher(["data.list[*].uuid", "data.list[1]"]).strip(DOCUMENT)
+    assert stripped["data"]["list"][0] == {"fid": "a", "detail": DOCUMENT["data"]["list"][0]["detail"]}
+    # 被忽略的数组元素以占位值保留位置
+    assert stripped["data"]["list"][1] is IGNORED
+    assert StructuralHasher(["data.list.0.uuid"]).strip(DOCUMENT)["data"]["list"][0] == {
+        "fid": "a", "detail": DOCUMENT["data"]["list"][0]["detail"]}
+
+
+def test_strip_shares_untouched_subtrees_and_keeps_input():
+    original = json.loads(json.dumps(DOCUMENT))
+    stripped = StructuralHasher(["data.list[*].uuid"]).strip(DOCUMENT)
+    assert DOCUMENT == original
+    assert stripped["data"]["list"][0]["detail"] is DOCUMENT["data"]["list"][0]["detail"]
+    assert StructuralHasher().strip(DOCUMENT) is DOCUMENT
+
+
+def test_hash_ignores_key_order_and_ignored_fields():
+    hasher = StructuralHasher(["**.updateTime", "data.list[*].uuid"])
+    changed = json.loads(json.dumps(DOCUMENT))
+    changed["updateTime"] = "later"
+    changed["data"]["list"][1]["uuid"] = "u9"
+    reordered = {key: changed[key] for key in reversed(list(changed))}
+    assert hasher.hash(reordered) == hasher.hash(DOCUMENT)
+    changed["data"]["list"][1]["detail"]["price"] = 3
+    assert hasher.hash(changed) != hasher.hash(DOCUMENT)
+
+
+def test_diff_kinds_and_paths():
+    actual = json.loads(json.dumps(DOCUMENT))
+    actual["data"]["total"] = 3
+    del actual["data"]["list"][0]["uuid"]
+    actual["data"]["extra"] = True
+    actual["data"]["list"].append({"fid": "c"})
+    differences = StructuralHasher().diff(DOCUMENT, actual)
+    assert [(d.path, d.kind) for d in differences] == [
+        ("data.total", Difference.CHANGED),
+        ("data.list[0].uuid", Difference.MISSING),
+        ("data.list[2]", Difference.UNEXPECTED),
+        ("data.extra", Difference.UNEXPECTED),
+    ]
+    assert str(differences[0]) == "data.total: 期望 2, 实际 3"
+    assert str(differences[1]) == 'data.list[0].uuid: 缺少, 期望 "u1"'
+
+
+def test_diff_limit_and_format():
+    expected = {"items": list(range(100))}
+    actual = {"items": [value + 1 for value in range(100)]}
+    differences = StructuralHasher().diff(expected, actual, limit=5)
+    assert [d.path for d in differences] == [f"items[{index}]" for index in range(5)]
+    text = format_diff(differences, limit=5)
+    assert text.splitlines()[-1] == "  ... 只列出前 5 处差异"
+    assert StructuralHasher().diff(expected, expected) == []
+    # 类型不同时整个子树作为一处差异
+    assert [d.kind for d in StructuralHasher().diff({"a": [1]}, {"a": {"0": 1}})] == [Difference.CHANGED]
+
+
+def test_store_header_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    content = json.dumps(DOCUMENT).encode("utf-8")
+    header = store.save("list", DOCUMENT, ignore=["**.updateTime", "**.updateTime"], content=content)
+    assert header == {
+        "hash": StructuralHasher(["**.updateTime"]).hash(DOCUMENT),
+        "raw_hash": raw_hash(content),
+        "ignore": ["**.updateTime"]
+    }
+    # 新的实例从文件第一行读取快照头，其余部分是完整文档
+    reopened = SnapshotStore(str(tmp_path))
+    assert reopened.header("list") == header
+    assert reopened.load("list") == DOCUMENT
+    assert reopened.matches_content("list", content)
+    assert not reopened.matches_content("list", content + b" ")
+    assert reopened.header("absent") is None
+
+
+def test_store_compare_uses_saved_ignores(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.compare("list", DOCUMENT, ignore=["**.updateTime"]) == []
+    assert (tmp_path / "list.snap").exists()
+    changed = json.loads(json.dumps(DOCUMENT))
+    changed["data"]["updateTime"] = "later"
+    assert store.compare("list", changed) == []
+    changed["data"]["total"] = 5
+    assert [d.path for d in store.compare("list", changed)] == ["data.total"]
+    # 给出不同的忽略路径时直接比较文档
+    assert [d.path for d in store.compare("list", changed, ignore=[])] == ["data.total", "data.updateTime"]
+
+
+def test_store_update_rewrites_snapshot(tmp_path):
+    SnapshotStore(str(tmp_path)).compare("list", DOCUMENT)
+    changed = dict(DOCUMENT, success=False)
+    assert SnapshotStore(str(tmp_path), update=True).compare("list", changed) == []
+    assert SnapshotStore(str(tmp_path)).load("list") == changed
+
+
+def test_hasher_shared_per_ignore_set(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.hasher(["b", "a"]) is store.hasher(["a", "b", "a"])
+    with pytest.raises(FileNotFoundError):
+        store.load("absent")
@@ -0,0 +1,147 @@
+import sys
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.step_graph import build_dependencies, find_critical_path
+from core.test_case import TestCase, TestStep
+
+
+def make_step(name, requires=None, provides=None):
+    return TestStep(name, lambda: None, requires, provides)
+
+
+def finish(step, started_at, finished_at):
+    step.started_at = started_at
+    step.finished_at = finished_at
+    step.duration_ns = int(round((finished_at - started_at) * 1e9))
+
+
+def names(steps):
+    return sorted(step.name for step in steps)
+
+
+def test_steps_depend_on_latest_provider():
+    login = make_step("login", provides=["token"])
+    refresh = make_step("refresh", requires=["token"], provides=["token"])
+    query = make_step("query", requires=["token"])
+    dependencies = build_dependencies([login, refresh, query])
+    assert dependencies[login] == set()
+    assert dependencies[refresh] == {login}
+    assert dependencies[query] == {refresh}
+
+
+def test_variables_without_provider_create_no_dependency():
+    # 变量在前置钩子中设置时没有提供它的步骤
+    first = make_step("first", requires=["fuserId"])
+    second = make_step("second", requires=["fuserId"])
+    dependencies = build_dependencies([first, second])
+    assert dependencies[first] == set()
+    assert dependencies[second] == set()
+
+
+def test_barrier_orders_undeclared_steps():
+    a = make_step("a", provides=["x"])
+    b = make_step("b", requires=["y"])
+    barrier = make_step("barrier")
+    c = make_step("c", requires=["x"])
+    d = make_step("d")
+    dependencies = build_dependencies([a, b, barrier, c, d])
+    # 屏障依赖之前的所有步骤，之后的步骤都依赖屏障
+    assert names(dependencies[barrier]) == ["a", "b"]
+    assert dependencies[c] == {a, barrier}
+    assert dependencies[d] == {barrier, c}
+
+
+def test_critical_path_follows_latest_dependency():
+    login = make_step("login", provides=["token"])
+    profile = make_step("profile", requires=["token"], provides=["fid"])
+    products = make_step("products", requires=["token"])
+    orders = make_step("orders", requires=["fid"])
+    steps = [login, profile, products, orders]
+    finish(login, 0.0, 1.0)
+    finish(profile, 1.0, 1.5)
+    finish(products, 1.0, 3.0)
+    finish(orders, 1.5, 4.0)
+    critical = find_critical_path(steps, build_dependencies(steps))
+    assert critical["steps"] == ["login", "profile", "orders"]
+    assert abs(critical["duration"] - 4.0) < 1e-9
+    assert abs(critical["serial_duration"] - 6.0) < 1e-9
+
+
+def test_critical_path_switches_to_slower_branch():
+    login = make_step("login", provides=["token"])
+    fast = make_step("fast", requires=["token"], provides=["a"])
+    slow = make_step("slow", requires=["token"], provides=["b"])
+    merge = make_step("merge", requires=["a", "b"])
+    steps = [login, fast, slow, merge]
+    finish(login, 0.0, 1.0)
+    finish(fast, 1.0, 1.2)
+    finish(slow, 1.0, 2.5)
+    finish(merge, 2.5, 3.0)
+    critical = find_critical_path(steps, build_dependencies(steps))
+    assert critical["steps"] == ["login", "slow", "merge"]
+
+
+def test_critical_path_ignores_unexecuted_steps():
+    executed = make_step("executed")
+    skipped = make_step("skipped")
+    finish(executed, 0.0, 0.5)
+    steps = [executed, skipped]
+    assert find_critical_path(steps, build_dependencies(steps))["steps"] == ["executed"]
+    assert find_critical_path([skipped], {skipped: set()}) == {"steps": [], "duration": 0.0, "serial_duration": 0.0}
+
+
+def test_run_respects_dependencies():
+    case = TestCase("步骤依赖")
+    order = []
+    lock = threading.Lock()
+    released = threading.Event()
+
+    def record(name):
+        with lock:
+            order.append(name)
+
+    @case.step("login", provides=["token"])
+    def login():
+        record("login")
+        case.set_variable("token", "t")
+
+    @case.step("profile", requires=["token"], provides=["fid"])
+    def profile():
+        # 与 products 并发执行：等待 products 开始后才结束
+        released.wait(5)
+        record("profile")
+        case.set_variable("fid", 1)
+
+    @case.step("products", requires=["token"])
+    def products():
+        record("products")
+        released.set()
+
+    @case.step("orders", requires=["fid"])
+    def orders():
+        record("orders")
+
+    assert case.run()
+    assert order == ["login", "products", "profile", "orders"]
+    assert case.critical_path["steps"][0] == "login"
+    assert case.critical_path["steps"][-1] == "orders"
+
+
+def test_failed_dependency_leaves_dependents_unexecuted():
+    case = TestCase("依赖失败")
+
+    @case.step("login", provides=["token"])
+    def login():
+        raise RuntimeError("登录失败")
+
+    @case.step("query", requires=["token"])
+    def query():
+        pass
+
+    assert not case.run()
+    statuses = {step.name: step.status for step in case.steps}
+    assert statuses == {"login": TestStep.FAILED, "query": TestStep.PLANNED}
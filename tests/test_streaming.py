@@ -0,0 +1,134 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from core.jsonpath import WILDCARD
+from core.streaming import StreamingJSONParser, _StreamCheck, parse_stream_path
+
+
+def make_document(rng):
+    """带转义、非 ASCII、科学计数法和深层嵌套的列表响应"""
+    items = []
+    for index in range(rng.randint(20, 60)):
+        items.append({
+            "fid": index,
+            "name": rng.choice(["商品", "团购 \"特价\"", "a\\b", "emoji 😀", "tab\there", "/路径/"]) + str(index),
+            "price": rng.choice([0, -1.5, 12.25, 1e-3, 3.5e10, 99]),
+            "tags": [rng.choice(["x", "y", "中"]) for _ in range(rng.randint(0, 4))],
+            "flags": {"hot": rng.random() < 0.5, "stock": None, "nested": {"deep": [[index], {"k": "}]"}]}}
+        })
+    return {
+        "success": True,
+        "msg": "ok \\\" 转义",
+        "meta": {"ignored": [{"a": "[{"}, "}]"], "total": len(items)},
+        "data": {"list": items, "total": len(items)}
+    }
+
+
+def chunks(data, rng, max_size):
+    pos = 0
+    while pos < len(data):
+        size = rng.randint(1, max_size)
+        yield data[pos:pos + size]
+        pos += size
+
+
+def parse(body, paths, rng, max_size):
+    patterns = [parse_stream_path(path) for path in paths]
+    found = {index: [] for index in range(len(patterns))}
+    parser = StreamingJSONParser(patterns, lambda index, path, value: found[index].append((tuple(path), value)))
+    for chunk in chunks(body, rng, max_size):
+        parser.feed(chunk)
+    parser.close()
+    return found
+
+
+def expected_values(document, pattern):
+    """在 json.loads 的结果上按路径取值"""
+    results = [((), document)]
+    for segment in pattern:
+        advanced = []
+        for path, value in results:
+            if segment == WILDCARD:
+                items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+            elif isinstance(value, dict) and segment in value:
+                items = [(segment, value[segment])]
+            elif isinstance(value, list) and isinstance(segment, int) and 0 <= segment < len(value):
+                items = [(segment, value[segment])]
+            else:
+                items = []
+            advanced.extend((path + (key,), item) for key, item in items)
+        results = advanced
+    return results
+
+
+PATHS = [
+    "data.list[*]",
+    "data.list[*].name",
+    "data.list[*].flags.nested.deep",
+    "data.total",
+    "msg",
+    "success",
+    "data.list[3].price",
+    "missing.path"
+]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("indent", [None, 2])
+def test_matches_json_loads_over_random_chunks(seed, indent):
+    rng = random.Random(seed)
+    document = make_document(rng)
+    body = json.dumps(document, ensure_ascii=False, indent=indent).encode("utf-8")
+    # 小块会把多字节字符、转义序列、数字和字面量切开
+    for max_size in (1, 3, 7, 64, len(body)):
+        found = parse(body, PATHS, rng, max_size)
+        loaded = json.loads(body)
+        for index, path in enumerate(PATHS):
+            assert found[index] == expected_values(loaded, parse_stream_path(path)), (path, max_size)
+
+
+@pytest.mark.parametrize("text", ["0", "-12.5e3", "true", "null", '"字符串"', "[]", "{}", "[1, [2, [3]]]"])
+def test_root_values(text):
+    body = text.encode("utf-8")
+    for max_size in (1, 2, len(body)):
+        found = parse(body, [""], random.Random(0), max_size)
+        assert found[0] == [((), json.loads(text))]
+
+
+@pytest.mark.parametrize("body", [b'{"a": [1, 2}', b'{"a": 1', b'{"a": tru}', b'[1, 2] 3'])
+def test_invalid_json_raises(body):
+    with pytest.raises(ValueError):
+        parse(body, ["a"], random.Random(0), 2)
+
+
+def test_partial_element_is_decoded_once():
+    # 跨块的目标元素从上次扫描的位置继续，闭合后只解码一次
+    items = [{"fid": index, "name": "a\\\"}]" * 50, "tags": [[index], {"k": "{"}]} for index in range(20)]
+    body = json.dumps({"data": {"list": items}}).encode("utf-8")
+    found = []
+    parser = StreamingJSONParser([parse_stream_path("data.list[*]")], lambda index, path, value: found.append(value))
+    decode = parser._json_decoder.raw_decode
+    calls = []
+
+    def counting_decode(text, pos):
+        calls.append(pos)
+        return decode(text, pos)
+
+    parser._json_decoder.raw_decode = counting_decode
+    for chunk in chunks(body, random.Random(1), 5):
+        parser.feed(chunk)
+    parser.close()
+    assert found == items
+    assert len(calls) == len(items)
+
+
+def test_stream_check_is_abstract():
+    with pytest.raises(TypeError):
+        _StreamCheck("data.total", "总数")